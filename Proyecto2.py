@@ -1,411 +1,2708 @@
+import bisect
+import cProfile
+import csv
+import functools
+import heapq
+import io
+import math
+import mmap
+import os
+import pstats
+import random
+import struct
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
 import networkx as nx
 
+INF = float('inf')
+# Radio medio de la Tierra y velocidad de crucero usada para estimar tiempos de vuelo
+EARTH_RADIUS_KM = 6371.0
+CRUISE_SPEED_KMH = 800.0
+# Velocidad máxima de crucero: cota para la heurística de A* por tiempo de vuelo
+MAX_CRUISE_SPEED_KMH = 1000.0
+
+# Instantánea binaria: cabecera fija seguida de secciones alineadas a 8 bytes en little-endian
+SNAPSHOT_MAGIC = b'PRY2RUTA'
+SNAPSHOT_VERSION = 2
+# magia, versión, reservado, airport_counter, aeropuertos, medias aristas, bytes de texto, crc32, reservado
+SNAPSHOT_HEADER = struct.Struct('<8sIIqqqqII')
+# Fichero de landmarks (ALT) que acompaña a la instantánea con el sufijo '.alt':
+# magia, versión, landmarks, aeropuertos, pesos incluidos (bits), crc32 de la instantánea
+LANDMARKS_MAGIC = b'PRY2ALT\x00'
+LANDMARKS_VERSION = 1
+LANDMARKS_HEADER = struct.Struct('<8sIIqII')
+WEIGHTS = ('distance', 'flight_time')
+# Tamaño máximo de red para refinar con spring_layout la posición de los aeropuertos nuevos
+SPRING_LAYOUT_MAX_NODES = 300
+# Iteraciones de spring_layout al reajustar una disposición ya calculada tras cambiar las rutas
+SPRING_LAYOUT_ITERATIONS = 15
+# Límites superiores (s) de los cubos de los histogramas de latencia de la instrumentación
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+# Operaciones de consulta que el perfilador por muestreo puede capturar
+QUERY_OPS = ('get_shortest_path_dis', 'get_shortest_path', 'batch_shortest_paths', 'get_pareto_routes',
+             'get_k_shortest_paths')
+# Etiquetas no dominadas que la búsqueda de Pareto conserva como máximo por aeropuerto
+PARETO_MAX_LABELS = 64
+# Tiempo mínimo de conexión (minutos) entre vuelos en los aeropuertos que no definen el suyo
+MIN_CONNECTION_MINUTES = 30
+# Nodos (o etiquetas) asentados entre dos llamadas a la comprobación de cancelación de una búsqueda
+CANCEL_CHECK_INTERVAL = 1024
+
+
+def _dijkstra_csr(offsets, targets, weights, source, target=-1, check=None):
+    # Dijkstra con montículo binario sobre arreglos CSR; se detiene al asentar el destino si se indica.
+    # check, si se da, se llama cada CANCEL_CHECK_INTERVAL nodos y puede abortar lanzando una excepción
+    n = len(offsets) - 1
+    dist = [INF] * n
+    pred = [-1] * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    countdown = CANCEL_CHECK_INTERVAL
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if u == target:
+            break
+        if check is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = CANCEL_CHECK_INTERVAL
+                check()
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, pred
+
+
+def _dijkstra_csr_many(offsets, targets, weights, source, wanted):
+    # Dijkstra de un origen que se detiene cuando se han asentado todos los destinos pedidos
+    n = len(offsets) - 1
+    dist = [INF] * n
+    pred = [-1] * n
+    dist[source] = 0.0
+    remaining = set(wanted)
+    heap = [(0.0, source)]
+    while heap and remaining:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        remaining.discard(u)
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, pred
+
+
+def _astar_csr(offsets, targets, weights, source, target, heuristic, check=None):
+    # A* sobre arreglos CSR. Con una heurística admisible devuelve el mismo costo que Dijkstra
+    # (un nodo se reabre si se mejora su distancia). Devuelve además los nodos asentados
+    n = len(offsets) - 1
+    dist = [INF] * n
+    pred = [-1] * n
+    dist[source] = 0.0
+    heap = [(heuristic(source), 0.0, source)]
+    settled = 0
+    countdown = CANCEL_CHECK_INTERVAL
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if u == target:
+            break
+        if check is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = CANCEL_CHECK_INTERVAL
+                check()
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd + heuristic(v), nd, v))
+    return dist, pred, settled
+
+
+def _dijkstra_csr_radius(offsets, targets, weights, source, radius, stop=-1, state=None, check=None):
+    # Dijkstra que asienta los nodos a distancia no mayor que radius (y al menos el nodo stop, si
+    # se indica). Devuelve el estado (dist, pred, heap, done) para continuarlo con un radio mayor;
+    # un nodo sin asentar está al menos a la distancia de la cima del montículo
+    if state is None:
+        n = len(offsets) - 1
+        dist = [INF] * n
+        pred = [-1] * n
+        dist[source] = 0.0
+        state = (dist, pred, [(0.0, source)], bytearray(n))
+    dist, pred, heap, done = state
+    countdown = CANCEL_CHECK_INTERVAL
+    while heap and (heap[0][0] <= radius or (stop >= 0 and not done[stop])):
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        if check is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = CANCEL_CHECK_INTERVAL
+                check()
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return state
+
+
+def _lower_bounds(state):
+    # Cotas inferiores de la distancia al origen de una búsqueda de _dijkstra_csr_radius
+    dist, _, heap, done = state
+    frontier = heap[0][0] if heap else INF
+    return [d if settled else frontier for d, settled in zip(dist, done)]
+
+
+def _tree_path(pred, source):
+    # Ruta desde source hasta la raíz de un árbol de predecesores (el origen de la búsqueda)
+    path = [source]
+    while pred[path[-1]] != -1:
+        path.append(pred[path[-1]])
+    return path
+
+
+def _position(offsets, targets, u, v):
+    # Posición CSR de la ruta u -> v, o -1 si no existe
+    for k in range(offsets[u], offsets[u + 1]):
+        if targets[k] == v:
+            return k
+    return -1
+
+
+def _path_cost(offsets, targets, weights, path):
+    return sum(weights[_position(offsets, targets, u, v)] for u, v in zip(path, path[1:]))
+
+
+def _pareto_csr(offsets, targets, distances, flight_times, source, target, max_labels=None, check=None):
+    # Búsqueda multicriterio por etiquetas (Martins): las etiquetas (distancia, tiempo) salen del
+    # montículo en orden lexicográfico y cada aeropuerto guarda solo las no dominadas. Devuelve
+    # (frente de Pareto como [(ruta, distancia, tiempo)] por distancia, etiquetas asentadas,
+    # etiquetas descartadas por max_labels); sin descartes el frente es exacto.
+    # La red es no dirigida, así que las búsquedas desde el destino dan cotas inferiores del costo
+    # restante. La ruta más corta y la más rápida son los extremos del frente: ninguna etiqueta
+    # cuya cota alcance la distancia de la más rápida, o el tiempo de la mejor ruta encontrada
+    # hasta el momento, puede dar una ruta nueva
+    if source == target:
+        return [([source], 0.0, 0.0)], 0, 0
+    by_distance = _dijkstra_csr_radius(offsets, targets, distances, target, INF, stop=source, check=check)
+    if by_distance[0][source] == INF:
+        return [], 0, 0
+    shortest = _tree_path(by_distance[1], source)
+    shortest_time = _path_cost(offsets, targets, flight_times, shortest)
+    by_time = _dijkstra_csr_radius(offsets, targets, flight_times, target, shortest_time, stop=source,
+                                   check=check)
+    fastest = _tree_path(by_time[1], source)
+    fastest_distance = _path_cost(offsets, targets, distances, fastest)
+    _dijkstra_csr_radius(offsets, targets, distances, target, fastest_distance, state=by_distance, check=check)
+    bound_d, bound_t = _lower_bounds(by_distance), _lower_bounds(by_time)
+
+    node, parent, label_d, label_t, alive = [source], [-1], [0.0], [0.0], [True]
+    labels = {source: [0]}
+    heap = [(0.0, 0.0, 0)]
+    best_t = shortest_time
+    found = []
+    settled = dropped = 0
+    countdown = CANCEL_CHECK_INTERVAL
+    while heap:
+        d, t, label = heapq.heappop(heap)
+        if not alive[label]:
+            continue
+        u = node[label]
+        # best_t puede haber bajado desde que se creó la etiqueta
+        if t + bound_t[u] >= best_t:
+            continue
+        settled += 1
+        if check is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = CANCEL_CHECK_INTERVAL
+                check()
+        if u == target:
+            found.append(label)
+            best_t = t
+            continue
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + distances[k]
+            nt = t + flight_times[k]
+            if nt + bound_t[v] >= best_t or nd + bound_d[v] >= fastest_distance:
+                continue
+            bucket = labels.get(v)
+            if bucket is None:
+                bucket = labels[v] = []
+            else:
+                if any(label_d[m] <= nd and label_t[m] <= nt for m in bucket):
+                    continue
+                kept = []
+                for m in bucket:
+                    if nd <= label_d[m] and nt <= label_t[m]:
+                        alive[m] = False
+                    else:
+                        kept.append(m)
+                bucket[:] = kept
+                if max_labels is not None and len(bucket) >= max_labels:
+                    dropped += 1
+                    continue
+            bucket.append(len(node))
+            heapq.heappush(heap, (nd, nt, len(node)))
+            node.append(v)
+            parent.append(label)
+            label_d.append(nd)
+            label_t.append(nt)
+            alive.append(True)
+
+    front = [(shortest, by_distance[0][source], shortest_time),
+             (fastest, fastest_distance, by_time[0][source])]
+    for label in found:
+        end = label
+        path = []
+        while label != -1:
+            path.append(node[label])
+            label = parent[label]
+        front.append((path[::-1], label_d[end], label_t[end]))
+    # Quitar duplicados y rutas dominadas (por ejemplo, cuando la más corta es también la más rápida)
+    front.sort(key=lambda entry: (entry[1], entry[2]))
+    result = []
+    for entry in front:
+        if not result or entry[2] < result[-1][2]:
+            result.append(entry)
+    return result, settled, dropped
+
+
+def _spur_search(offsets, targets, weights, source, target, bound, blocked, banned, limit=INF, check=None):
+    # A* desde source que evita los nodos marcados en blocked y las posiciones CSR de banned.
+    # bound son las distancias exactas al destino en la red completa: quitar nodos y rutas solo
+    # alarga los caminos, así que siguen siendo una cota admisible. Se abandona la búsqueda en
+    # cuanto ninguna ruta puede costar menos que limit. Devuelve (costo, ruta) o None
+    dist = {source: 0.0}
+    pred = {source: -1}
+    heap = [(bound[source], 0.0, source)]
+    countdown = CANCEL_CHECK_INTERVAL
+    while heap:
+        f, d, u = heapq.heappop(heap)
+        if f >= limit:
+            return None
+        if d > dist[u]:
+            continue
+        if u == target:
+            return d, _rebuild_path(pred, target)
+        if check is not None:
+            countdown -= 1
+            if not countdown:
+                countdown = CANCEL_CHECK_INTERVAL
+                check()
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if blocked[v] or k in banned:
+                continue
+            nd = d + weights[k]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd + bound[v], nd, v))
+    return None
+
+
+def _yen_csr(offsets, targets, weights, source, target, k, check=None):
+    # Las k rutas sin ciclos más cortas (Yen con la mejora de Lawler: cada ruta solo se desvía a
+    # partir del punto en que se separó de su antecesora). Las búsquedas de desvío usan A* con el
+    # árbol desde el destino y se cortan con el costo del peor candidato que aún puede entrar.
+    # Devuelve ([(costo, ruta)], búsquedas de desvío realizadas)
+    bound = _dijkstra_csr(offsets, targets, weights, target, check=check)[0]
+    if bound[source] == INF or k < 1:
+        return [], 0
+    n = len(offsets) - 1
+    first = _spur_search(offsets, targets, weights, source, target, bound, bytearray(n), (), check=check)
+    accepted = [first]
+    deviations = [0]
+    candidates = []
+    seen = {tuple(first[1])}
+    searches = 1
+    while len(accepted) < k:
+        _, previous = accepted[-1]
+        blocked = bytearray(n)
+        root_cost = 0.0
+        for i in range(len(previous) - 1):
+            spur = previous[i]
+            if i >= deviations[-1]:
+                root = previous[:i + 1]
+                banned = {_position(offsets, targets, spur, path[i + 1])
+                          for _, path in accepted if len(path) > i + 1 and path[:i + 1] == root}
+                # Solo hacen falta k - len(accepted) candidatos; el peor de ellos acota el desvío
+                needed = k - len(accepted)
+                limit = heapq.nsmallest(needed, candidates)[-1][0] if len(candidates) >= needed else INF
+                if root_cost + bound[spur] < limit:
+                    searches += 1
+                    found = _spur_search(offsets, targets, weights, spur, target, bound, blocked, banned,
+                                         limit - root_cost, check)
+                    if found is not None:
+                        path = root[:-1] + found[1]
+                        key = tuple(path)
+                        if key not in seen:
+                            seen.add(key)
+                            heapq.heappush(candidates, (root_cost + found[0], path, i))
+            blocked[spur] = 1
+            root_cost += weights[_position(offsets, targets, spur, previous[i + 1])]
+        if not candidates:
+            break
+        cost, path, deviation = heapq.heappop(candidates)
+        accepted.append((cost, path))
+        deviations.append(deviation)
+    return accepted, searches
+
+
+def _rebuild_path(pred, target):
+    # Reconstruir la secuencia de índices desde el origen hasta el destino
+    path = [target]
+    while pred[path[-1]] != -1:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+
+class PathCache:
+    # Caché LRU acotada de resultados de rutas y de árboles de caminos mínimos por origen.
+    # Cada entrada guarda la versión del grafo con la que se calculó; una entrada es válida
+    # mientras su versión no sea anterior a la época de invalidación de su peso.
+    def __init__(self, maxsize=1024, max_trees=32):
+        self.maxsize = maxsize
+        self.max_trees = max_trees
+        self.paths = OrderedDict()
+        self.trees = OrderedDict()
+        self.epochs = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, entries, key, weight):
+        entry = entries.get(key)
+        if entry is not None:
+            version, value = entry
+            if version >= self.epochs.get(weight, 0):
+                entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            # Entrada obsoleta: se descarta al encontrarla
+            del entries[key]
+            self.invalidations += 1
+        self.misses += 1
+        return False, None
+
+    def _store(self, entries, limit, key, version, value):
+        entries[key] = (version, value)
+        entries.move_to_end(key)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_path(self, source, destination, weight, method=None):
+        # method separa las entradas de búsquedas que pueden no ser exactas (A* geográfico)
+        key = (source, destination, weight) if method is None else (source, destination, weight, method)
+        return self._lookup(self.paths, key, weight)
+
+    def has_path(self, source, destination, weight):
+        # Consulta sin efectos: no cuenta aciertos ni fallos ni altera el orden LRU
+        entry = self.paths.get((source, destination, weight))
+        return entry is not None and entry[0] >= self.epochs.get(weight, 0)
+
+    def put_path(self, source, destination, weight, version, result, method=None):
+        key = (source, destination, weight) if method is None else (source, destination, weight, method)
+        self._store(self.paths, self.maxsize, key, version, result)
+
+    def get_tree(self, source, weight):
+        # Consultar un árbol no cuenta como acierto ni fallo: es un recurso auxiliar de get_path
+        entry = self.trees.get((source, weight))
+        if entry is None or entry[0] < self.epochs.get(weight, 0):
+            return None
+        self.trees.move_to_end((source, weight))
+        return entry[1]
+
+    def put_tree(self, source, weight, version, tree):
+        self._store(self.trees, self.max_trees, (source, weight), version, tree)
+
+    def invalidate_weight(self, weight, version):
+        # Invalidar todas las entradas de un peso (inserciones o reducciones de peso)
+        self.epochs[weight] = version
+
+    def invalidate_route(self, source, destination, weight):
+        # Un aumento de peso solo afecta a los resultados cuya ruta usa ese tramo
+        edge = {source, destination}
+        for key in [key for key, (_, result) in self.paths.items()
+                    if key[2] == weight and result is not None
+                    and any({u, v} == edge for u, v in zip(result[0], result[0][1:]))]:
+            del self.paths[key]
+            self.invalidations += 1
+        for key in [key for key, (_, (_, pred)) in self.trees.items()
+                    if key[1] == weight
+                    and (pred.get(destination) == source or pred.get(source) == destination)]:
+            del self.trees[key]
+            self.invalidations += 1
+
+    def clear(self):
+        self.paths.clear()
+        self.trees.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'paths': len(self.paths),
+            'trees': len(self.trees),
+            'maxsize': self.maxsize,
+            'max_trees': self.max_trees,
+        }
+
+
+class Metrics:
+    # Instrumentación opcional de un grafo (ver Graph.enable_metrics): número de llamadas,
+    # histogramas de latencia por operación y contadores de trabajo de las búsquedas (nodos
+    # asentados, aristas examinadas, aciertos de la caché). Los sinks son funciones que reciben
+    # (operación, segundos) tras cada operación medida; profiler es un QueryProfiler opcional.
+    def __init__(self, buckets=LATENCY_BUCKETS, profiler=None, prefix='proyecto2_'):
+        self.buckets = tuple(buckets)
+        self.profiler = profiler
+        self.prefix = prefix
+        self.sinks = []
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # Conteo por cubo (el último es +Inf), suma y número de observaciones
+                histogram = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def record(self, op, seconds):
+        self.count('calls', op=op)
+        self.observe('latency_seconds', seconds, op=op)
+        for sink in self.sinks:
+            sink(op, seconds)
+
+    def timed(self, op, function, *args, **kwargs):
+        # Ejecutar una operación midiendo su latencia; si el perfilador la elige, bajo cProfile
+        profile = self.profiler.start(op) if self.profiler is not None else None
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            self.count('errors', op=op)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                self.profiler.stop(op, profile, elapsed, args[1:])
+            self.record(op, elapsed)
+
+    def quantile(self, fraction, name='latency_seconds', **labels):
+        # Estimación de un cuantil a partir de los cubos: el límite superior del cubo que lo
+        # contiene (inf si cae en el último)
+        histogram = self.histograms.get((name, tuple(sorted(labels.items()))))
+        if histogram is None or not histogram[2]:
+            return None
+        rank = fraction * histogram[2]
+        seen = 0
+        for bound, count in zip(self.buckets + (INF,), histogram[0]):
+            seen += count
+            if seen >= rank:
+                return bound
+        return INF
+
+    def snapshot(self):
+        # Copia en memoria: {nombre: [{'labels': ..., 'value': ...}]} para los contadores y
+        # {nombre: [{'labels': ..., 'count', 'sum', 'buckets': [[límite, acumulado], ...]}]}.
+        # El límite del último cubo es la cadena '+Inf', como en Prometheus, para que la copia
+        # se pueda escribir como JSON válido
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), (buckets, total, count) in sorted(self.histograms.items()):
+                cumulative, seen = [], 0
+                for bound, value in zip(self.buckets + ('+Inf',), buckets):
+                    seen += value
+                    cumulative.append([bound, seen])
+                histograms.setdefault(name, []).append({'labels': dict(labels), 'count': count, 'sum': total,
+                                                        'buckets': cumulative})
+        return {'counters': counters, 'histograms': histograms}
+
+    def prometheus(self):
+        # Volcado en el formato de texto de Prometheus
+        snapshot = self.snapshot()
+        lines = []
+        for name, entries in snapshot['counters'].items():
+            metric = f"{self.prefix}{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{_prometheus_labels(entry['labels'])} {entry['value']}" for entry in entries)
+        for name, entries in snapshot['histograms'].items():
+            metric = self.prefix + name
+            lines.append(f"# TYPE {metric} histogram")
+            for entry in entries:
+                for bound, value in entry['buckets']:
+                    le = bound if isinstance(bound, str) else repr(bound)
+                    lines.append(f"{metric}_bucket{_prometheus_labels(entry['labels'], le=le)} {value}")
+                lines.append(f"{metric}_sum{_prometheus_labels(entry['labels'])} {entry['sum']!r}")
+                lines.append(f"{metric}_count{_prometheus_labels(entry['labels'])} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def _prometheus_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+class QueryProfiler:
+    # Perfilado por muestreo de las consultas: una de cada `every` se ejecuta bajo cProfile y,
+    # si tarda al menos `threshold` segundos, se guardan las `keep` capturas más recientes con
+    # el informe de pstats (y el fichero .prof en `directory`, si se indica)
+    def __init__(self, threshold=0.1, every=10, keep=10, ops=QUERY_OPS, directory=None):
+        self.threshold = threshold
+        self.every = every
+        self.ops = ops
+        self.directory = directory
+        self.captures = deque(maxlen=keep)
+        self._calls = 0
+
+    def start(self, op):
+        if op not in self.ops:
+            return None
+        self._calls += 1
+        if self._calls % self.every:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Ya hay otro perfilador activo en este hilo
+            return None
+        return profile
+
+    def stop(self, op, profile, elapsed, args):
+        profile.disable()
+        if elapsed < self.threshold:
+            return
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(25)
+        capture = {'op': op, 'args': repr(args)[:200], 'seconds': elapsed, 'time': time.time(),
+                   'stats': report.getvalue()}
+        if self.directory is not None:
+            capture['path'] = os.path.join(self.directory, f"{op}-{time.strftime('%Y%m%d-%H%M%S')}-{self._calls}.prof")
+            profile.dump_stats(capture['path'])
+        self.captures.append(capture)
+
+
+def _instrumented(op):
+    # Medir el método con la instrumentación del grafo; sin ella solo cuesta una comprobación
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.metrics is None:
+                return method(self, *args, **kwargs)
+            return self.metrics.timed(op, method, self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
 class Graph:
-    def __init__(self):
+    def __init__(self, cache_size=1024):
         # Inicialización de un grafo no dirigido utilizando NetworkX
         self.graph = nx.Graph()
         # Contador para asignar códigos a los aeropuertos
         self.airport_counter = 1
-
-    def add_airport(self, airport, location):
-        # Añadir un aeropuerto al grafo con un código único y atributos de nombre y ubicación
+        # Versión del grafo: aumenta con cada cambio en aeropuertos o rutas
+        self.version = 0
+        # Caché de resultados de rutas ligada a la versión del grafo
+        self.path_cache = PathCache(cache_size)
+        # Índices de aeropuertos: nombre -> código y lista ordenada de (clave, código) para
+        # búsquedas por prefijo de nombre o ubicación; se construyen en el primer uso
+        self._name_index = None
+        self._prefix_entries = []
+        self._prefix_pending = []
+        # Lista de aeropuertos materializada; se reconstruye solo cuando cambian los aeropuertos
+        self._airports_list = None
+        # Cota superior de velocidad usada por la heurística de A* para el tiempo de vuelo
+        self.max_cruise_speed = MAX_CRUISE_SPEED_KMH
+        # Réplica compacta (CSR) para las búsquedas que la usan; se crea en el primer uso
+        self._compact = None
+        # Preprocesamiento ALT opcional (ver preprocess_landmarks)
+        self.landmarks = None
+        # Posiciones de dibujo en caché por código de aeropuerto y aeropuertos dibujados cuyas
+        # rutas cambiaron desde entonces (ver get_layout)
+        self._positions = {}
+        self._layout_changed = set()
+        # Instrumentación opcional (ver enable_metrics); None la desactiva
+        self.metrics = None
+        # Árboles de caminos mínimos que se reparan con cada cambio de ruta (ver track_hubs)
+        self.hub_trees = None
+        # Horario de vuelos sobre las rutas para buscar itinerarios con horas de salida
+        self.timetable = Timetable(self)
+
+    def enable_metrics(self, metrics=None):
+        # Activar la instrumentación con un Metrics nuevo o uno compartido con otros grafos
+        self.metrics = metrics or Metrics()
+        if self._compact is not None:
+            self._compact.metrics = self.metrics
+        return self.metrics
+
+    def disable_metrics(self):
+        self.metrics = None
+        if self._compact is not None:
+            self._compact.metrics = None
+
+    @_instrumented('add_airport')
+    def add_airport(self, airport, location, latitude=None, longitude=None):
+        # Añadir un aeropuerto al grafo con un código único y atributos de nombre y ubicación;
+        # las coordenadas en grados son opcionales y permiten las búsquedas A*
         airport_code = self.airport_counter
-        self.graph.add_node(airport_code, name=airport, location=location)
+        self._append_airport(airport_code, airport, location, latitude, longitude)
+        self._airport_added(airport_code, airport, location)
         self.airport_counter += 1
+        # Un aeropuerto nuevo está aislado y no cambia ninguna ruta ya calculada
+        self.version += 1
         return airport_code
 
-    def get_airports_list(self):
-        # Obtener una lista de diccionarios con información de los aeropuertos en el grafo
-        airports_list = []
+    @_instrumented('add_airports')
+    def add_airports(self, airports):
+        # Inserción masiva de (nombre, ubicación) o (nombre, ubicación, latitud, longitud);
+        # devuelve los códigos asignados en orden
+        rows = []
+        for airport, location, *coordinates in airports:
+            latitude, longitude = coordinates or (None, None)
+            rows.append((self.airport_counter + len(rows), airport, location, latitude, longitude))
+        self._append_airports(rows)
+        for row in rows:
+            self._airport_added(*row[:3])
+        self.airport_counter += len(rows)
+        self.version += 1
+        return [row[0] for row in rows]
+
+    def _append_airport(self, airport_code, airport, location, latitude=None, longitude=None):
+        self._append_airports([(airport_code, airport, location, latitude, longitude)])
+
+    def _append_airports(self, rows):
+        rows = list(rows)
+        self.graph.add_nodes_from((code, _airport_attributes(airport, location, latitude, longitude))
+                                  for code, airport, location, latitude, longitude in rows)
+        if self._compact is not None:
+            self._compact._append_airports(rows)
+
+    def _airport_added(self, airport_code, airport, location):
+        # Mantener los índices al día si ya se construyeron
+        self._airports_list = None
+        if self._name_index is not None:
+            self._name_index.setdefault(airport, airport_code)
+            self._prefix_pending.append((_search_key(airport), airport_code))
+            if location:
+                self._prefix_pending.append((_search_key(location), airport_code))
+
+    def _build_airport_indexes(self):
+        if self._name_index is None:
+            self._name_index = {}
+            entries = []
+            for code, name, location, _, _ in self._iter_airports():
+                self._name_index.setdefault(name, code)
+                entries.append((_search_key(name), code))
+                if location:
+                    entries.append((_search_key(location), code))
+            entries.sort()
+            self._prefix_entries = entries
+            self._prefix_pending = []
+        elif self._prefix_pending:
+            # Las claves nuevas se ordenan y se mezclan con la lista ya ordenada
+            self._prefix_entries = sorted(self._prefix_entries + self._prefix_pending)
+            self._prefix_pending = []
+
+    def has_airport(self, airport_code):
+        return airport_code in self.graph
+
+    def has_airport_name(self, airport):
+        # Comprobación de nombre duplicado en O(1)
+        return self.find_airport(airport) is not None
+
+    def find_airport(self, airport):
+        # Código del aeropuerto con ese nombre exacto, o None
+        if self._name_index is None:
+            self._build_airport_indexes()
+        return self._name_index.get(airport)
+
+    def search_airports(self, prefix, limit=10):
+        # Códigos de los aeropuertos cuyo nombre o ubicación empieza por el prefijo (sin distinguir
+        # mayúsculas ni tildes), en orden alfabético de la clave que coincide
+        self._build_airport_indexes()
+        prefix = _search_key(prefix)
+        entries = self._prefix_entries
+        codes = []
+        for i in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, code = entries[i]
+            if not key.startswith(prefix) or len(codes) >= limit:
+                break
+            if code not in codes:
+                codes.append(code)
+        return codes
+
+    def get_airport(self, airport_code):
+        # Diccionario con código, nombre, ubicación y coordenadas (None si no tiene) de un aeropuerto
+        data = self.graph.nodes[airport_code]
+        return {'code': airport_code, 'name': data.get('name', 'No Name'),
+                'location': data.get('location', 'No Location'),
+                'latitude': data.get('latitude'), 'longitude': data.get('longitude')}
+
+    def get_coordinates(self, airport_code):
+        # (latitud, longitud) del aeropuerto, o None si no se registraron
+        data = self.graph.nodes[airport_code]
+        if data.get('latitude') is None:
+            return None
+        return data['latitude'], data['longitude']
+
+    def _iter_airports(self):
         for node, data in self.graph.nodes(data=True):
-            airport_info = {
-                'code': node,
-                'name': data.get('name', 'No Name'),
-                'location': data.get('location', 'No Location')
-            }
-            airports_list.append(airport_info)
-        return airports_list
+            yield (node, data.get('name', 'No Name'), data.get('location', 'No Location'),
+                   data.get('latitude'), data.get('longitude'))
 
+    def get_airports_list(self):
+        # Obtener una lista de diccionarios con información de los aeropuertos en el grafo;
+        # se materializa una sola vez mientras no se registren aeropuertos nuevos
+        if self._airports_list is None:
+            self._airports_list = [{'code': code, 'name': name, 'location': location,
+                                    'latitude': latitude, 'longitude': longitude}
+                                   for code, name, location, latitude, longitude in self._iter_airports()]
+        return list(self._airports_list)
+
+    @_instrumented('add_route')
     def add_route(self, source, destination, distance, flight_time):
+        # Los dos aeropuertos deben estar registrados antes de crear la ruta
+        for airport_code in (source, destination):
+            if not self.has_airport(airport_code):
+                raise nx.NodeNotFound(f"Aeropuerto {airport_code} no encontrado.")
+        if self.get_route(source, destination) is not None:
+            # Volver a añadir una ruta existente solo cambia sus pesos (sin medir la llamada otra vez)
+            self._update_route(source, destination, distance, flight_time)
+            return
         # Añadir una ruta al grafo con atributos de distancia y tiempo de vuelo
-        self.graph.add_edge(source, destination, distance=distance, flight_time=flight_time)
+        self._set_route(source, destination, distance, flight_time)
+        self.version += 1
+        if self._positions:
+            self._layout_changed.update((source, destination))
+        # Una ruta nueva puede acortar cualquier camino con cualquiera de los dos pesos
+        for weight in WEIGHTS:
+            self._weight_decreased(weight)
+        if self.hub_trees is not None:
+            self._repair_hub_trees([(source, destination, None)])
+
+    @_instrumented('add_routes')
+    def add_routes(self, routes):
+        # Inserción masiva de (origen, destino, distancia, tiempo de vuelo) con una sola invalidación
+        routes = list(routes)
+        for source, destination, _, _ in routes:
+            for airport_code in (source, destination):
+                if not self.has_airport(airport_code):
+                    raise nx.NodeNotFound(f"Aeropuerto {airport_code} no encontrado.")
+        if self.hub_trees is not None:
+            changes = [(source, destination, self.get_route(source, destination))
+                       for source, destination, _, _ in routes]
+        if self._positions:
+            # Solo los aeropuertos ya dibujados que ganan una ruta cambian de vecinos
+            self._layout_changed.update(airport_code for source, destination, _, _ in routes
+                                        if self.get_route(source, destination) is None
+                                        for airport_code in (source, destination))
+        self._set_routes(routes)
+        self.version += 1
+        for weight in WEIGHTS:
+            self._weight_decreased(weight)
+        if self.hub_trees is not None:
+            self._repair_hub_trees(changes)
+
+    @_instrumented('update_route')
+    def update_route(self, source, destination, distance, flight_time):
+        # Cambiar los pesos de una ruta existente; devuelve False si la ruta no existe
+        return self._update_route(source, destination, distance, flight_time)
+
+    def _update_route(self, source, destination, distance, flight_time):
+        old = self.get_route(source, destination)
+        if old is None:
+            return False
+        self._set_route(source, destination, distance, flight_time)
+        self.version += 1
+        for weight, old_value, new_value in (('distance', old[0], distance),
+                                             ('flight_time', old[1], flight_time)):
+            if new_value < old_value:
+                self._weight_decreased(weight)
+            elif new_value > old_value:
+                # Un aumento solo empeora los caminos que pasan por esta ruta; las cotas de
+                # los landmarks siguen siendo cotas inferiores válidas
+                self.path_cache.invalidate_route(source, destination, weight)
+        if self.hub_trees is not None:
+            self._repair_hub_trees([(source, destination, old)])
+        return True
+
+    def _weight_decreased(self, weight):
+        # Una ruta nueva o una reducción de peso puede mejorar cualquier camino de ese peso
+        self.path_cache.invalidate_weight(weight, self.version)
+        if self.landmarks is not None:
+            # Las distancias de los landmarks de ese peso se recalculan en la siguiente consulta ALT
+            self.landmarks.stale.add(weight)
+
+    def track_hubs(self, hubs, weights=WEIGHTS):
+        # Mantener árboles de caminos mínimos desde estos aeropuertos: cada cambio de ruta repara
+        # solo la parte afectada y las consultas desde o hacia un hub se responden con su árbol
+        compact = self.to_compact()
+        if self.hub_trees is None:
+            self.hub_trees = HubTrees()
+        for hub in hubs:
+            i = compact._node_index(hub)
+            for weight in weights:
+                self.hub_trees.track(compact, i, weight)
+        return self.hub_trees
+
+    def untrack_hubs(self, hubs=None):
+        # Dejar de mantener los árboles de estos hubs (de todos si no se indican)
+        if self.hub_trees is None:
+            return
+        if hubs is None:
+            self.hub_trees = None
+            return
+        for hub in hubs:
+            i = self.to_compact().index.get(hub)
+            if i is not None:
+                self.hub_trees.untrack(i)
+
+    def has_hub_tree(self, source, weight):
+        if self.hub_trees is None:
+            return False
+        i = self.to_compact().index.get(source)
+        return (i, weight) in self.hub_trees.trees
+
+    def _repair_hub_trees(self, changes):
+        # changes: [(origen, destino, pesos anteriores o None)] ya aplicados al grafo. La
+        # reparación lee las rutas nuevas de la lista pendiente sin fusionarla con el CSR, que
+        # costaría O(V + E) en cada inserción; la fusión se hace en la siguiente consulta
+        compact = self.to_compact(build=False)
+        touched = self.hub_trees.apply(compact, [(compact.index[source], compact.index[destination], old)
+                                                 for source, destination, old in changes])
+        if self.metrics is not None:
+            for weight, count in touched.items():
+                self.metrics.count('tree_repairs', weight=weight)
+                self.metrics.count('tree_nodes_touched', count, weight=weight)
+
+    def has_route(self, source, destination):
+        return self.get_route(source, destination) is not None
+
+    def number_of_airports(self):
+        return self.graph.number_of_nodes()
+
+    def number_of_routes(self):
+        return self.graph.number_of_edges()
+
+    def neighbors(self, airport_code):
+        # Códigos de los aeropuertos conectados por una ruta directa
+        return list(self.graph.adj[airport_code])
+
+    def iter_routes(self):
+        # Recorrer cada ruta una vez como (origen, destino, distancia, tiempo de vuelo)
+        for source, destination, data in self.graph.edges(data=True):
+            yield source, destination, data['distance'], data['flight_time']
+
+    def get_layout(self, seed=0):
+        # Posiciones (x, y) para dibujar la red, en caché entre llamadas y usadas como semilla de
+        # cada actualización. Con coordenadas se usa (longitud, latitud); sin ellas, un aeropuerto
+        # nuevo se coloca junto a sus vecinos ya dibujados y, si cambian sus rutas, se vuelve a
+        # colocar junto a ellos. Las redes pequeñas sin coordenadas se refinan con spring_layout
+        positions = self._positions
+        new = [code for code, *_ in self._iter_airports() if code not in positions]
+        changed = self._layout_changed
+        if not new and not changed:
+            return positions
+        self._layout_changed = set()
+        geographic = False
+        for code in new:
+            coordinates = self.get_coordinates(code)
+            if coordinates is not None:
+                positions[code] = (coordinates[1], coordinates[0])
+                geographic = True
+        pending = [code for code in new if code not in positions]
+        moved = [code for code in changed if code in positions and self.get_coordinates(code) is None]
+        if not pending and not moved:
+            return positions
+        fixed = [code for code in positions if code not in changed]
+        if positions:
+            xs = [x for x, _ in positions.values()]
+            ys = [y for _, y in positions.values()]
+            box = (min(xs), max(xs), min(ys), max(ys))
+        else:
+            box = (-1.0, 1.0, -1.0, 1.0)
+        spread = max(box[1] - box[0], box[3] - box[2], 1e-3)
+        rng = random.Random(seed + len(positions))
+        for code in pending + moved:
+            placed = [positions[v] for v in self.neighbors(code) if v in positions and v != code]
+            if placed:
+                x = sum(p[0] for p in placed) / len(placed)
+                y = sum(p[1] for p in placed) / len(placed)
+                positions[code] = (x + rng.uniform(-0.05, 0.05) * spread, y + rng.uniform(-0.05, 0.05) * spread)
+            elif code not in positions:
+                positions[code] = (rng.uniform(box[0], box[1]), rng.uniform(box[2], box[3]))
+        if (self.graph is not None and not geographic and len(positions) <= SPRING_LAYOUT_MAX_NODES
+                and all(self.get_coordinates(code) is None for code in fixed)):
+            if moved:
+                # Cambiaron rutas: unas pocas iteraciones sobre toda la red partiendo de lo dibujado
+                refined = nx.spring_layout(self.graph, pos=positions, iterations=SPRING_LAYOUT_ITERATIONS,
+                                           seed=seed)
+                updated = positions
+            else:
+                # Solo hay aeropuertos nuevos: se refinan ellos con los demás fijos
+                refined = nx.spring_layout(self.graph, pos=positions, fixed=fixed or None, seed=seed)
+                updated = pending
+            positions.update((code, (float(refined[code][0]), float(refined[code][1]))) for code in list(updated))
+        return positions
+
+    def get_route(self, source, destination):
+        # Devolver (distancia, tiempo de vuelo) de la ruta o None si no existe
+        data = self.graph.get_edge_data(source, destination)
+        if data is None:
+            return None
+        return data['distance'], data['flight_time']
 
-    def get_shortest_path_dis(self, source, destination):
+    def _set_route(self, source, destination, distance, flight_time):
+        self.graph.add_edge(source, destination, distance=distance, flight_time=flight_time)
+        if self._compact is not None:
+            self._compact._set_route(source, destination, distance, flight_time)
+
+    def _set_routes(self, routes):
+        routes = list(routes)
+        self.graph.add_edges_from((source, destination, {'distance': distance, 'flight_time': flight_time})
+                                  for source, destination, distance, flight_time in routes)
+        if self._compact is not None:
+            self._compact._set_routes(routes)
+
+    @_instrumented('get_shortest_path_dis')
+    def get_shortest_path_dis(self, source, destination, method='dijkstra', check=None):
+        # method='astar' usa la distancia ortodrómica al destino como heurística admisible
+        # (requiere que ninguna ruta sea más corta que la distancia ortodrómica entre sus extremos);
+        # method='alt' usa las cotas de los landmarks y siempre da el mismo costo que Dijkstra.
+        # check se llama periódicamente durante la búsqueda y puede cancelarla lanzando una excepción
+        return self._shortest_path(source, destination, 'distance', method, check)
+
+    @_instrumented('get_shortest_path')
+    def get_shortest_path(self, source, destination, method='dijkstra', check=None):
+        # method='astar' usa la distancia ortodrómica dividida por max_cruise_speed como heurística
+        return self._shortest_path(source, destination, 'flight_time', method, check)
+
+    @_instrumented('get_pareto_routes')
+    def get_pareto_routes(self, source, destination, max_labels=PARETO_MAX_LABELS, check=None):
+        # Todas las rutas no dominadas por distancia y tiempo de vuelo en una sola búsqueda:
+        # lista de (ruta, distancia, tiempo) de la más corta a la más rápida. max_labels acota
+        # las etiquetas por aeropuerto; con None el frente es exacto
+        return self.to_compact()._pareto_search(source, destination, max_labels, check)
+
+    @_instrumented('get_k_shortest_paths')
+    def get_k_shortest_paths(self, source, destination, k=3, weight='distance', check=None):
+        # Las k rutas sin ciclos más cortas según weight: lista de (ruta, costo) ordenada por costo
+        return self.to_compact()._k_shortest_search(source, destination, k, weight, check)
+
+    def preprocess_landmarks(self, count=8, weights=WEIGHTS):
+        # Preprocesamiento ALT: elegir landmarks y calcular sus distancias para cada peso
+        self.landmarks = LandmarkIndex.build(self.to_compact(), count, weights)
+        return self.landmarks
+
+    def get_shortest_path_tree(self, source, weight='distance'):
+        # Árbol de caminos mínimos desde un origen: (distancias, predecesores) por código
+        if not self.has_airport(source):
+            raise nx.NodeNotFound(f"Aeropuerto {source} no encontrado.")
+        if self.hub_trees is not None:
+            compact = self.to_compact()
+            hub_tree = self.hub_trees.get(compact, compact.index[source], weight)
+            if hub_tree is not None:
+                return _tree_dicts(compact.codes, hub_tree.dist, hub_tree.pred)
+        tree = self.path_cache.get_tree(source, weight)
+        if tree is None:
+            tree = self._compute_shortest_path_tree(source, weight)
+            self.path_cache.put_tree(source, weight, self.version, tree)
+        return tree
+
+    def _shortest_path(self, source, destination, weight, method='dijkstra', check=None):
+        if method not in ('dijkstra', 'astar', 'alt'):
+            raise ValueError(f"Método de búsqueda desconocido: {method}")
+        # Dijkstra y ALT son exactos y comparten las entradas de la caché. La heurística
+        # geográfica de A* deja de ser admisible si una distancia introducida es menor que la
+        # del círculo máximo, así que sus resultados se guardan aparte y no contaminan al resto.
+        variant = 'astar' if method == 'astar' else None
+        found, result = self.path_cache.get_path(source, destination, weight, variant)
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.count('cache_hits' if found else 'cache_misses', weight=weight)
+        if not found and self.hub_trees is not None:
+            # Los árboles de los hubs siempre están al día
+            found, result = self.hub_trees.path(self.to_compact(), source, destination, weight)
+            if found:
+                if metrics is not None:
+                    metrics.count('hub_tree_hits', weight=weight)
+                self.path_cache.put_path(source, destination, weight, self.version, result, variant)
+        if not found:
+            tree = self.path_cache.get_tree(source, weight)
+            if tree is not None:
+                result = _path_from_tree(tree, destination)
+                if metrics is not None:
+                    metrics.count('tree_hits', weight=weight)
+            elif method in ('astar', 'alt'):
+                if method == 'astar':
+                    result, settled = self.to_compact()._astar_search(source, destination, weight, 'geo',
+                                                                      check=check)
+                else:
+                    result, settled = self._alt_search(source, destination, weight, check)
+                if metrics is not None:
+                    metrics.count('nodes_settled', settled, algorithm=method, weight=weight)
+            else:
+                result = self._compute_shortest_path(source, destination, weight, check)
+            self.path_cache.put_path(source, destination, weight, self.version, result, variant)
+        # Se devuelve una copia de la ruta para que el llamador no altere la caché
+        return None if result is None else (list(result[0]), result[1])
+
+    def _alt_search(self, source, destination, weight, check=None):
+        # A* con cotas de landmarks; preprocesa con los valores por defecto si hace falta
+        compact = self.to_compact()
+        if self.landmarks is None:
+            self.preprocess_landmarks()
+        self.landmarks.refresh(compact, weight)
+        return compact._astar_search(source, destination, weight, 'alt', self.landmarks, check)
+
+    def to_compact(self, build=True):
+        # Réplica compacta de la red; se crea una vez y después se actualiza con cada cambio.
+        # Con build=False las rutas nuevas se quedan pendientes de fusionar con el CSR
+        if self._compact is None:
+            self._compact = CompactGraph.from_graph(self)
+        self._compact.max_cruise_speed = self.max_cruise_speed
+        self._compact.metrics = self.metrics
+        if build:
+            self._compact._build_csr()
+        return self._compact
+
+    @_instrumented('batch_shortest_paths')
+    def batch_shortest_paths(self, pairs=None, origins=None, destinations=None, weight='distance',
+                             processes=1, keep_paths=False, min_parallel=32):
+        # Resolver muchas consultas origen-destino con una sola búsqueda por origen distinto.
+        # Se indican pares (origen, destino) o bien listas de orígenes y destinos (matriz completa).
+        # Con pares, cada origen solo busca sus propios destinos y el resultado guarda solo los
+        # pares pedidos, no el producto cruzado de todos los orígenes por todos los destinos.
+        # El reparto entre procesos es opcional: processes=None usa todos los núcleos
+        compact = self.to_compact()
+        if pairs is not None:
+            by_origin = {}
+            for source, destination in pairs:
+                by_origin.setdefault(source, {})[destination] = None
+            origins = list(by_origin)
+            columns = [list(destinations) for destinations in by_origin.values()]
+            # Un destino desconocido se trata como inalcanzable, igual que en las consultas individuales
+            wanted = None
+            jobs = [[compact.index.get(destination, -1) for destination in destinations] for destinations in columns]
+        elif origins is None or destinations is None:
+            raise ValueError("Se requieren pares o listas de orígenes y destinos.")
+        else:
+            origins = list(dict.fromkeys(origins))
+            destinations = list(dict.fromkeys(destinations))
+            # Todos los orígenes comparten los mismos destinos, que cada proceso recibe una sola vez
+            columns = [destinations] * len(origins)
+            wanted = [compact.index.get(destination, -1) for destination in destinations]
+            jobs = [None] * len(origins)
+
+        source_indices = [compact._node_index(source) for source in origins]
+        jobs = list(zip(source_indices, jobs))
+        # Los pesos se copian para que la matriz no cambie si luego se edita una ruta en el mismo lugar
+        snapshot = (compact.offsets, compact.targets, array('d', compact._weight_array(weight)))
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if processes > 1 and len(source_indices) >= min_parallel:
+            # Cada proceso recibe una sola vez la instantánea de la red al iniciarse;
+            # las vistas sobre un mmap no se pueden serializar y se copian a arreglos
+            snapshot = (_as_array('q', snapshot[0]), _as_array('i', snapshot[1]), snapshot[2])
+            with ProcessPoolExecutor(max_workers=processes, initializer=_batch_worker_init,
+                                     initargs=(snapshot, wanted, keep_paths)) as executor:
+                chunksize = max(1, len(jobs) // (processes * 4))
+                rows = list(executor.map(_batch_worker_run, jobs, chunksize=chunksize))
+        else:
+            rows = [_batch_row(snapshot, wanted, keep_paths, job) for job in jobs]
+        return RouteMatrix(compact.codes, compact.index, snapshot, origins, columns, rows)
+
+    def save_snapshot(self, path):
+        # Guardar la red en el formato binario compacto; el preprocesamiento ALT, si existe,
+        # se guarda al lado en path + '.alt' ligado a la suma de comprobación de la instantánea
+        compact = self.to_compact()
+        checksum = _write_snapshot(compact, path)
+        if self.landmarks is not None:
+            for weight in list(self.landmarks.tables):
+                self.landmarks.refresh(compact, weight)
+            self.landmarks.save(path + '.alt', checksum)
+
+    @classmethod
+    def load_snapshot(cls, path, verify=True):
+        # Cargar una instantánea en un Graph de NetworkX (se copian todos los datos)
+        snapshot = _read_snapshot(path, verify)
+        graph = cls()
+        codes, names, locations = snapshot['codes'], snapshot['names'], snapshot['locations']
+        graph._append_airports((code, name, location, *_coordinates_or_none(latitude, longitude))
+                               for code, name, location, latitude, longitude
+                               in zip(codes, names, locations, snapshot['latitudes'], snapshot['longitudes']))
+        offsets, targets = snapshot['offsets'], snapshot['targets']
+        distances, flight_times = snapshot['distances'], snapshot['flight_times']
+        graph._set_routes((codes[i], codes[targets[k]], distances[k], flight_times[k])
+                          for i in range(len(codes))
+                          for k in range(offsets[i], offsets[i + 1]) if targets[k] >= i)
+        graph.airport_counter = snapshot['airport_counter']
+        graph.landmarks = LandmarkIndex.load(path + '.alt', snapshot['checksum'])
+        return graph
+
+    def _compute_shortest_path(self, source, destination, weight, check=None):
+        metrics = self.metrics
+        attribute = weight
+        if metrics is not None:
+            # Con instrumentación, una función de peso cuenta las aristas examinadas y los
+            # aeropuertos desde los que se examinan (los asentados)
+            relaxed, settled = [0], set()
+
+            def weight(u, v, data):
+                relaxed[0] += 1
+                settled.add(u)
+                return data[attribute]
+        if check is not None:
+            # NetworkX no admite interrupciones: la función de peso comprueba la cancelación
+            # cada CANCEL_CHECK_INTERVAL aristas examinadas
+            inner, examined = weight, [0]
+
+            def weight(u, v, data):
+                examined[0] += 1
+                if examined[0] % CANCEL_CHECK_INTERVAL == 0:
+                    check()
+                return data[attribute] if inner is attribute else inner(u, v, data)
         try:
-            # Calcular la ruta más corta y su longitud utilizando el algoritmo de Dijkstra
-            path = nx.dijkstra_path(self.graph, source, destination, weight='distance')
-            distance = nx.dijkstra_path_length(self.graph, source, destination, weight='distance')
-            return path, distance
+            # Una sola ejecución de Dijkstra devuelve a la vez la longitud y la ruta más corta
+            length, path = nx.single_source_dijkstra(self.graph, source, destination, weight=weight)
+            return path, length
         except nx.NetworkXNoPath:
             # Manejar la excepción si no hay ruta disponible
             return None
-        
-    def get_shortest_path(self, source, destination):
-        try:
-            # Calcular la ruta más corta y su longitud utilizando el algoritmo de Dijkstra
-            path = nx.dijkstra_path(self.graph, source, destination, weight='flight_time')
-            flight_time = nx.dijkstra_path_length(self.graph, source, destination, weight='flight_time')
-            return path, flight_time
-        except nx.NetworkXNoPath:
-            # Manejar la excepción si no hay ruta disponible
+        finally:
+            if metrics is not None:
+                metrics.count('nodes_settled', len(settled), algorithm='dijkstra', weight=attribute)
+                metrics.count('edges_relaxed', relaxed[0], algorithm='dijkstra', weight=attribute)
+
+    def _compute_shortest_path_tree(self, source, weight):
+        pred, dist = nx.dijkstra_predecessor_and_distance(self.graph, source, weight=weight)
+        return dist, {node: parents[0] for node, parents in pred.items() if parents}
+
+
+def _airport_attributes(airport, location, latitude, longitude):
+    # Atributos de nodo; las coordenadas solo se guardan si se conocen
+    attributes = {'name': airport, 'location': location}
+    if latitude is not None and longitude is not None:
+        attributes['latitude'] = latitude
+        attributes['longitude'] = longitude
+    return attributes
+
+
+def _coordinates_or_none(latitude, longitude):
+    # En los arreglos compactos las coordenadas desconocidas se guardan como NaN
+    if math.isnan(latitude):
+        return None, None
+    return latitude, longitude
+
+
+def _search_key(text):
+    # Clave de búsqueda: sin tildes ni distinción de mayúsculas ("Málaga" -> "malaga")
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _tree_dicts(codes, dist, pred):
+    # Árbol sobre índices del motor compacto como (distancias, predecesores) por código
+    return ({codes[i]: d for i, d in enumerate(dist) if d != INF},
+            {codes[i]: codes[p] for i, p in enumerate(pred) if p != -1})
+
+
+def _path_from_tree(tree, destination):
+    # Reconstruir ruta y costo a partir de un árbol de caminos mínimos por código
+    dist, pred = tree
+    if destination not in dist:
+        return None
+    path = [destination]
+    while path[-1] in pred:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path, dist[destination]
+
+
+class CompactGraph(Graph):
+    # Motor compacto: aeropuertos con índices enteros densos y rutas en arreglos CSR.
+    # Expone la misma interfaz que Graph sin crear un diccionario de atributos por ruta.
+    def __init__(self, cache_size=1024):
+        super().__init__(cache_size)
+        # El motor compacto no usa NetworkX para almacenar la red
+        self.graph = None
+        # Código de aeropuerto por índice denso y mapa inverso código -> índice
+        self.codes = array('q')
+        self.index = {}
+        self.names = []
+        self.locations = []
+        # Coordenadas en grados por índice; NaN si el aeropuerto no las tiene
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        # CSR: los vecinos del índice i están en targets[offsets[i]:offsets[i + 1]];
+        # cada ruta no dirigida se guarda como dos medias aristas
+        self.offsets = array('q', [0])
+        self.targets = array('i')
+        self.distances = array('d')
+        self.flight_times = array('d')
+        # Rutas nuevas que se incorporan al CSR en la siguiente consulta
+        self._pending_src = array('i')
+        self._pending_dst = array('i')
+        self._pending_distances = array('d')
+        self._pending_flight_times = array('d')
+        self._pending_index = {}
+        # Adyacencia de las rutas pendientes: índice -> [(vecino, posición en la lista pendiente)]
+        self._pending_adjacency = {}
+
+    @classmethod
+    def from_graph(cls, graph):
+        # Construir el motor compacto a partir de un Graph basado en NetworkX
+        compact = cls(graph.path_cache.maxsize)
+        compact.max_cruise_speed = graph.max_cruise_speed
+        compact._append_airports(graph._iter_airports())
+        for source, destination, data in graph.graph.edges(data=True):
+            compact._set_route(source, destination, data['distance'], data['flight_time'])
+        compact.airport_counter = graph.airport_counter
+        return compact
+
+    def to_compact(self, build=True):
+        if build:
+            self._build_csr()
+        return self
+
+    def number_of_airports(self):
+        return len(self.codes)
+
+    def number_of_routes(self):
+        self._build_csr()
+        loops = sum(1 for i in range(len(self.codes))
+                    for k in range(self.offsets[i], self.offsets[i + 1]) if self.targets[k] == i)
+        return (len(self.targets) + loops) // 2
+
+    @classmethod
+    def load_snapshot(cls, path, verify=False):
+        # Cargar una instantánea proyectando el fichero en memoria: los arreglos son vistas
+        # sobre el mmap y solo se leen las páginas que las consultas tocan. El mapeo es
+        # copy-on-write, así que editar pesos no modifica el fichero.
+        snapshot = _read_snapshot(path, verify, mapped=True)
+        graph = cls()
+        graph._mmap = snapshot['mmap']
+        graph.codes = snapshot['codes']
+        graph.names = snapshot['names']
+        graph.locations = snapshot['locations']
+        graph.offsets = snapshot['offsets']
+        graph.targets = snapshot['targets']
+        graph.distances = snapshot['distances']
+        graph.flight_times = snapshot['flight_times']
+        graph.latitudes = snapshot['latitudes']
+        graph.longitudes = snapshot['longitudes']
+        graph.index = {code: i for i, code in enumerate(graph.codes)}
+        graph.airport_counter = snapshot['airport_counter']
+        graph.landmarks = LandmarkIndex.load(path + '.alt', snapshot['checksum'])
+        return graph
+
+    def _append_airport(self, airport_code, airport, location, latitude=None, longitude=None):
+        # Una red cargada desde una instantánea se copia a arreglos propios al crecer
+        if not isinstance(self.codes, array):
+            self.codes = _as_array('q', self.codes)
+            self.names = list(self.names)
+            self.locations = list(self.locations)
+            self.latitudes = _as_array('d', self.latitudes)
+            self.longitudes = _as_array('d', self.longitudes)
+        if not isinstance(self.offsets, array):
+            self.offsets = _as_array('q', self.offsets)
+        self.index[airport_code] = len(self.codes)
+        self.codes.append(airport_code)
+        self.names.append(airport)
+        self.locations.append(location)
+        has_coordinates = latitude is not None and longitude is not None
+        self.latitudes.append(latitude if has_coordinates else math.nan)
+        self.longitudes.append(longitude if has_coordinates else math.nan)
+        # El nuevo índice es el último, así que basta con cerrar su fila vacía
+        self.offsets.append(self.offsets[-1])
+
+    def _append_airports(self, rows):
+        for row in rows:
+            self._append_airport(*row)
+
+    def has_airport(self, airport_code):
+        return airport_code in self.index
+
+    def _iter_airports(self):
+        for code, name, location, latitude, longitude in zip(self.codes, self.names, self.locations,
+                                                             self.latitudes, self.longitudes):
+            yield (code, name, location, *_coordinates_or_none(latitude, longitude))
+
+    def get_airport(self, airport_code):
+        i = self._node_index(airport_code)
+        latitude, longitude = _coordinates_or_none(self.latitudes[i], self.longitudes[i])
+        return {'code': airport_code, 'name': self.names[i], 'location': self.locations[i],
+                'latitude': latitude, 'longitude': longitude}
+
+    def get_coordinates(self, airport_code):
+        i = self._node_index(airport_code)
+        if math.isnan(self.latitudes[i]):
             return None
+        return self.latitudes[i], self.longitudes[i]
 
-import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-class Application(tk.Tk):
-    def __init__(self):
-        # Inicialización de la aplicación y configuración de la ventana principal
-        super().__init__()
-
-        self.title("Gestión de Rutas Aéreas")
-        self.geometry("800x580")
-        self.configure(bg="#FFFFFF")
-
-        # Inicialización de la instancia de la clase Graph
-        self.graph = Graph()
-
-        # Creación de widgets en la ventana principal
-        self.create_widgets()
-
-        # Configuración del lienzo para visualizar el grafo
-        self.figure = plt.figure(figsize=(10, 6))
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
-
-    def create_widgets(self):
-        # Creación de widgets en la ventana principal
-
-        # Título
-        title_label = tk.Label(self, text="      RUTAS AÉREAS      ", bg="#E4F4FD", fg="black", font=("Helvetica", 16, "bold"))
-        title_label.pack(pady=10)
-
-        # Cuadro de color azul claro
-        frame = tk.Frame(self, bg="lightblue", bd=1, relief="solid", padx=25, pady=25)
-        frame.pack()
-
-        # Botones dentro del cuadro
-        button_width = 20  # Ancho deseado para los botones
-
-        airport_button = tk.Button(frame, text="Registrar Aeropuerto", bg="#E4F4FD", command=self.register_airport, width=button_width)
-        airport_button.pack(pady=5)
-
-        route_button = tk.Button(frame, text="Crear Ruta", bg="#E4F4FD", command=self.create_route, width=button_width)
-        route_button.pack(pady=5)
-
-        edit_button = tk.Button(frame, text="Editar Ruta", bg="#E4F4FD", command=self.edit_route, width=button_width)
-        edit_button.pack(pady=5)
-
-        visualize_button = tk.Button(frame, text="Visualizar Rutas por Distancia", bg="#E4F4FD", command=self.visualize_routes, width=button_width)
-        visualize_button.pack(pady=5)
-
-        visualize_time_routes_button = tk.Button(frame, text="Visualizar Rutas por Tiempo", bg="#E4F4FD", command=self.visualize_time_routes, width=button_width)
-        visualize_time_routes_button.pack(pady=5)
-
-
-        airports_button = tk.Button(frame, text="Lista de Aeropuertos", bg="#E4F4FD", command=self.display_airports, width=button_width)
-        airports_button.pack(pady=5)
-
-        # Título
-        title_label = tk.Label(self, text=" BÚSQUEDA DE RUTAS ", bg="#E4F4FD", fg="black", font=("Helvetica", 16, "bold"))
-        title_label.pack(pady=10)
-
-        # Cuadro de color azul claro
-        frame = tk.Frame(self, bg="lightblue", bd=1, relief="solid", padx=25, pady=25)
-        frame.pack()
-
-        # Botones dentro del cuadro
-        label_width = 20  # Ancho deseado para los botones
-
-        origin_label = tk.Label(frame, text="Aeropuerto de Origen", width=label_width, bg=frame.cget("bg"))
-        origin_label.pack(pady=5)
-        self.origin_entry = tk.Entry(frame)
-        self.origin_entry.pack()
-
-        destination_label = tk.Label(frame, text="Aeropuerto de Destino", width=label_width, bg=frame.cget("bg"))
-        destination_label.pack(pady=10)
-        self.destination_entry = tk.Entry(frame)
-        self.destination_entry.pack()
-
-        search_button = tk.Button(frame, text="Buscar Ruta por Distancia", bg="#E4F4FD", command=self.search_route, width=label_width)
-        search_button.pack(pady=10)
-
-        search_shortest_time_button = tk.Button(frame, text="Buscar Ruta por Tiempo Corto", bg="#E4F4FD", command=self.search_shortest_time_route, width=button_width)
-        search_shortest_time_button.pack(pady=5)
-
-
-    def register_airport(self):
-        # Crear una nueva ventana superior para registrar aeropuertos
-        register_window = tk.Toplevel(self)
-        register_window.title("Registrar Aeropuerto")
-
-        # Crear campos de entrada para el nombre y la ubicación del aeropuerto
-        self.create_input_field(register_window, "Nombre:", "name_entry")
-        self.create_input_field(register_window, "Ubicación:", "location_entry")
-
-        # Agregar un botón de guardar que llama a la función 'save_airport' cuando se presiona
-        save_button = tk.Button(register_window, text="Guardar", command=self.save_airport)
-        save_button.pack()
-
-    def create_input_field(self, window, label_text, entry_name):
-        # Crear una etiqueta con el texto proporcionado y agregarla a la ventana
-        label = tk.Label(window, text=label_text)
-        label.pack()
-
-        # Crear un campo de entrada utilizando ttk.Entry y agregarlo a la ventana
-        entry = ttk.Entry(window)
-        entry.pack()
-
-        # Establecer el atributo de la instancia con el nombre proporcionado para referenciar el campo de entrada
-        setattr(self, entry_name, entry)
-
-    def save_airport(self):
-        name = self.name_entry.get()
-        location = self.location_entry.get()
-
-        if name and location:
-            if not any('name' in node_data and node_data['name'] == name for _, node_data in self.graph.graph.nodes(data=True)):
-                airport_code = self.graph.add_airport(name, location)
-                messagebox.showinfo("Aeropuerto registrado", f"Aeropuerto '{name}' registrado exitosamente con código {airport_code}.")
-                self.update_graph()
-                self.name_entry.delete(0, tk.END)
-                self.location_entry.delete(0, tk.END)
-            else:
-                messagebox.showerror("Error", "Ya existe un aeropuerto con este nombre.")
+    def _node_index(self, airport_code):
+        try:
+            return self.index[airport_code]
+        except KeyError:
+            raise nx.NodeNotFound(f"Aeropuerto {airport_code} no encontrado.") from None
+
+    def neighbors(self, airport_code):
+        i = self._node_index(airport_code)
+        self._build_csr()
+        return [self.codes[self.targets[k]] for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def iter_routes(self):
+        self._build_csr()
+        codes, offsets, targets = self.codes, self.offsets, self.targets
+        for i in range(len(codes)):
+            for k in range(offsets[i], offsets[i + 1]):
+                if targets[k] >= i:
+                    yield codes[i], codes[targets[k]], self.distances[k], self.flight_times[k]
+
+    def _csr_position(self, i, j):
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            if self.targets[k] == j:
+                return k
+        return -1
+
+    def get_route(self, source, destination):
+        i = self.index.get(source)
+        j = self.index.get(destination)
+        if i is None or j is None:
+            return None
+        k = self._csr_position(i, j)
+        if k != -1:
+            return self.distances[k], self.flight_times[k]
+        position = self._pending_index.get((i, j) if i <= j else (j, i))
+        if position is not None:
+            return self._pending_distances[position], self._pending_flight_times[position]
+        return None
+
+    def _set_route(self, source, destination, distance, flight_time):
+        i = self._node_index(source)
+        j = self._node_index(destination)
+        # Si la ruta ya está en el CSR se actualizan sus pesos en el mismo lugar
+        k = self._csr_position(i, j)
+        if k != -1:
+            self.distances[k] = distance
+            self.flight_times[k] = flight_time
+            k = self._csr_position(j, i)
+            self.distances[k] = distance
+            self.flight_times[k] = flight_time
+            return
+        key = (i, j) if i <= j else (j, i)
+        position = self._pending_index.get(key)
+        if position is not None:
+            self._pending_distances[position] = distance
+            self._pending_flight_times[position] = flight_time
+            return
+        position = len(self._pending_src)
+        self._pending_index[key] = position
+        self._pending_adjacency.setdefault(key[0], []).append((key[1], position))
+        if key[0] != key[1]:
+            self._pending_adjacency.setdefault(key[1], []).append((key[0], position))
+        self._pending_src.append(key[0])
+        self._pending_dst.append(key[1])
+        self._pending_distances.append(distance)
+        self._pending_flight_times.append(flight_time)
+
+    def _set_routes(self, routes):
+        for source, destination, distance, flight_time in routes:
+            self._set_route(source, destination, distance, flight_time)
+
+    def _build_csr(self):
+        # Fusionar las rutas pendientes con el CSR actual en O(V + E)
+        if not self._pending_src:
+            return
+        n = len(self.codes)
+        old_offsets = self.offsets
+        old_targets = _as_array('i', self.targets)
+        old_distances = _as_array('d', self.distances)
+        old_flight_times = _as_array('d', self.flight_times)
+        degree = [old_offsets[i + 1] - old_offsets[i] for i in range(n)]
+        for i, j in zip(self._pending_src, self._pending_dst):
+            degree[i] += 1
+            if i != j:
+                degree[j] += 1
+        offsets = array('q', [0]) * (n + 1)
+        for i in range(n):
+            offsets[i + 1] = offsets[i] + degree[i]
+        size = offsets[n]
+        targets = array('i', bytes(4 * size))
+        distances = array('d', bytes(8 * size))
+        flight_times = array('d', bytes(8 * size))
+        # Cursor de escritura por fila: primero se copia la fila antigua completa
+        cursor = array('q', offsets)
+        for i in range(n):
+            start, end = old_offsets[i], old_offsets[i + 1]
+            if start != end:
+                pos = offsets[i]
+                targets[pos:pos + end - start] = old_targets[start:end]
+                distances[pos:pos + end - start] = old_distances[start:end]
+                flight_times[pos:pos + end - start] = old_flight_times[start:end]
+                cursor[i] = pos + end - start
+        for i, j, d, t in zip(self._pending_src, self._pending_dst,
+                              self._pending_distances, self._pending_flight_times):
+            for u, v in ((i, j), (j, i)) if i != j else ((i, j),):
+                pos = cursor[u]
+                targets[pos] = v
+                distances[pos] = d
+                flight_times[pos] = t
+                cursor[u] = pos + 1
+        self.offsets, self.targets = offsets, targets
+        self.distances, self.flight_times = distances, flight_times
+        self._pending_src = array('i')
+        self._pending_dst = array('i')
+        self._pending_distances = array('d')
+        self._pending_flight_times = array('d')
+        self._pending_index = {}
+        self._pending_adjacency = {}
+
+    def _pending_overlay(self, weight):
+        # Rutas pendientes de fusionar como (adyacencia, pesos) para recorrerlas junto al CSR;
+        # None si no hay ninguna
+        if not self._pending_src:
+            return None
+        if weight == 'distance':
+            return self._pending_adjacency, self._pending_distances
+        if weight == 'flight_time':
+            return self._pending_adjacency, self._pending_flight_times
+        raise ValueError(f"Peso desconocido: {weight}")
+
+    def _weight_array(self, weight):
+        if weight == 'distance':
+            return self.distances
+        if weight == 'flight_time':
+            return self.flight_times
+        raise ValueError(f"Peso desconocido: {weight}")
+
+    def _compute_shortest_path(self, source, destination, weight, check=None):
+        s = self._node_index(source)
+        t = self.index.get(destination)
+        if t is None:
+            return None
+        self._build_csr()
+        dist, pred = _dijkstra_csr(self.offsets, self.targets, self._weight_array(weight), s, t, check)
+        if self.metrics is not None:
+            self._count_dijkstra_work(dist, t, weight)
+        if dist[t] == INF:
+            return None
+        return [self.codes[i] for i in _rebuild_path(pred, t)], dist[t]
+
+    def _count_dijkstra_work(self, dist, t, weight):
+        # El bucle de Dijkstra no lleva contadores para no costar nada sin instrumentación: los
+        # asentados se deducen de las distancias (las menores que la del destino, que se asienta
+        # sin examinar sus rutas) y las aristas examinadas son las que salen de ellos
+        offsets, limit = self.offsets, dist[t]
+        settled = [i for i, d in enumerate(dist) if d < limit]
+        self.metrics.count('nodes_settled', len(settled) + (limit != INF), algorithm='dijkstra', weight=weight)
+        self.metrics.count('edges_relaxed', sum(offsets[i + 1] - offsets[i] for i in settled),
+                           algorithm='dijkstra', weight=weight)
+
+    def _geo_heuristic(self, target, weight):
+        # Cota inferior del costo restante hasta el índice destino: distancia ortodrómica,
+        # o esa distancia a max_cruise_speed para el tiempo de vuelo. Sin coordenadas vale 0
+        latitudes, longitudes = self.latitudes, self.longitudes
+        if math.isnan(latitudes[target]):
+            return lambda v: 0.0
+        # Un margen mínimo evita que el redondeo haga la cota mayor que el costo real
+        scale = 1.0 - 1e-9
+        if weight == 'flight_time':
+            scale /= self.max_cruise_speed
+        lat_t, lon_t = latitudes[target], longitudes[target]
+        bounds = {}
+
+        def heuristic(v):
+            value = bounds.get(v)
+            if value is None:
+                latitude = latitudes[v]
+                value = 0.0 if math.isnan(latitude) else scale * haversine(latitude, longitudes[v], lat_t, lon_t)
+                bounds[v] = value
+            return value
+        return heuristic
+
+    def _astar_search(self, source, destination, weight, heuristic='geo', landmarks=None, check=None):
+        # Búsqueda A* entre dos códigos; devuelve (ruta y costo o None, nodos asentados).
+        # heuristic: 'geo' (coordenadas), 'alt' (landmarks) o None, que equivale a Dijkstra
+        # y sirve para comparar el trabajo realizado
+        s = self._node_index(source)
+        t = self.index.get(destination)
+        if t is None:
+            return None, 0
+        self._build_csr()
+        if heuristic == 'geo':
+            heuristic = self._geo_heuristic(t, weight)
+        elif heuristic == 'alt':
+            heuristic = landmarks.heuristic(weight, s, t)
         else:
-            messagebox.showerror("Error", "Todos los campos son requeridos.")
-
-    def create_route(self):
-        create_route_window = tk.Toplevel(self)
-        create_route_window.title("Crear Ruta")
-
-        source_label = tk.Label(create_route_window, text="Código de Aeropuerto de Origen:")
-        source_entry = tk.Entry(create_route_window)
-        source_label.pack()
-        source_entry.pack()
-
-        destination_label = tk.Label(create_route_window, text="Código de Aeropuerto de Destino:")
-        destination_entry = tk.Entry(create_route_window)
-        destination_label.pack()
-        destination_entry.pack()
-
-        distance_label = tk.Label(create_route_window, text="Distancia:")
-        distance_entry = tk.Entry(create_route_window)
-        distance_label.pack()
-        distance_entry.pack()
-
-        flight_time_label = tk.Label(create_route_window, text="Tiempo de vuelo:")
-        flight_time_entry = tk.Entry(create_route_window)
-        flight_time_label.pack()
-        flight_time_entry.pack()
-
-        save_button = tk.Button(create_route_window, text="Guardar",
-                                command=lambda: self.save_route(source_entry.get(), 
-                                                                destination_entry.get(), 
-                                                                distance_entry.get(), 
-                                                                flight_time_entry.get(),
-                                                                create_route_window))
-        save_button.pack()
-
-    def save_route(self, source_code, destination_code, distance, flight_time, window):
+            heuristic = lambda v: 0.0
+        dist, pred, settled = _astar_csr(self.offsets, self.targets, self._weight_array(weight), s, t, heuristic,
+                                         check)
+        if dist[t] == INF:
+            return None, settled
+        return ([self.codes[i] for i in _rebuild_path(pred, t)], dist[t]), settled
+
+    def _pareto_search(self, source, destination, max_labels, check=None):
+        s = self._node_index(source)
+        t = self.index.get(destination)
+        if t is None:
+            return []
+        self._build_csr()
+        front, settled, dropped = _pareto_csr(self.offsets, self.targets, self.distances, self.flight_times,
+                                              s, t, max_labels, check)
+        if self.metrics is not None:
+            self.metrics.count('labels_settled', settled, algorithm='pareto')
+            self.metrics.count('labels_dropped', dropped, algorithm='pareto')
+        codes = self.codes
+        return [([codes[i] for i in path], distance, flight_time) for path, distance, flight_time in front]
+
+    def _k_shortest_search(self, source, destination, k, weight, check=None):
+        s = self._node_index(source)
+        t = self.index.get(destination)
+        if t is None:
+            return []
+        self._build_csr()
+        paths, searches = _yen_csr(self.offsets, self.targets, self._weight_array(weight), s, t, k, check)
+        if self.metrics is not None:
+            self.metrics.count('spur_searches', searches, algorithm='yen', weight=weight)
+        codes = self.codes
+        return [([codes[i] for i in path], cost) for cost, path in paths]
+
+    def _compute_shortest_path_tree(self, source, weight):
+        self._build_csr()
+        dist, pred = _dijkstra_csr(self.offsets, self.targets, self._weight_array(weight), self._node_index(source))
+        return _tree_dicts(self.codes, dist, pred)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    # Distancia ortodrómica en kilómetros entre dos puntos dados en grados
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class ImportReport:
+    # Resumen de una importación: filas leídas, aceptadas, rechazadas y velocidad
+    def __init__(self, kind, max_samples=20):
+        self.kind = kind
+        self.rows = 0
+        self.accepted = 0
+        self.rejected = 0
+        # Solo se conserva una muestra de los rechazos para no acumular el fichero en memoria
+        self.rejected_samples = []
+        self.max_samples = max_samples
+        self.elapsed = 0.0
+
+    def reject(self, line_number, reason):
+        self.rejected += 1
+        if len(self.rejected_samples) < self.max_samples:
+            self.rejected_samples.append((line_number, reason))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        lines = [f"{self.kind}: {self.rows} filas leídas, {self.accepted} aceptadas, {self.rejected} rechazadas",
+                 f"Velocidad: {self.rows_per_second:.0f} filas/s en {self.elapsed:.2f} s"]
+        lines += [f"  línea {line}: {reason}" for line, reason in self.rejected_samples]
+        return "\n".join(lines)
+
+
+class BulkLoader:
+    # Carga masiva en streaming de aeropuertos y rutas desde CSV con cabecera o ficheros
+    # estilo OpenFlights (airports.dat / routes.dat). Las filas se validan y se insertan
+    # en el grafo por lotes; los códigos IATA, ICAO o identificadores externos se traducen
+    # a los códigos internos asignados por airport_counter. internal_codes decide si un número
+    # sin traducción en un CSV se toma como código interno: None solo cuando no se ha importado
+    # ningún código externo, True siempre y False nunca. En OpenFlights nunca se hace, porque
+    # sus identificadores coinciden con los códigos internos de aeropuertos que no tienen nada que ver.
+    def __init__(self, graph, batch_size=5000, cruise_speed=CRUISE_SPEED_KMH, internal_codes=None):
+        self.graph = graph
+        self.batch_size = batch_size
+        self.cruise_speed = cruise_speed
+        self.internal_codes = internal_codes
+        self.external_codes = {}
+        # Nombres del lote aún no insertado; los ya insertados se consultan en el índice del grafo
+        self._batch_names = set()
+
+    @staticmethod
+    def _is_openflights(path, file_format):
+        if file_format == 'auto':
+            return path.lower().endswith('.dat')
+        return file_format == 'openflights'
+
+    def load_airports(self, path, file_format='auto', progress=None):
+        # progress, si se indica, recibe el informe parcial después de cada lote insertado
+        report = ImportReport("Aeropuertos")
+        start = time.perf_counter()
+        openflights = self._is_openflights(path, file_format)
+        batch = []
         try:
-            source_code = int(source_code)
-            destination_code = int(destination_code)
-            self.graph.add_route(source_code, destination_code, float(distance), float(flight_time))
-            messagebox.showinfo("Ruta creada", "Ruta creada exitosamente.")
-            window.destroy()
-        except ValueError:
-            messagebox.showerror("Error", "Códigos de aeropuerto, distancia y tiempo de vuelo deben ser números válidos.")
-        except nx.NodeNotFound:
-            messagebox.showerror("Error", "Aeropuerto no encontrado. Por favor, registra los aeropuertos primero.")
-
-    def edit_route(self):
-        edit_route_window = tk.Toplevel(self)
-        edit_route_window.title("Editar Ruta")
-
-        source_label = tk.Label(edit_route_window, text="Aeropuerto de Origen:")
-        source_entry = tk.Entry(edit_route_window)
-        source_label.pack()
-        source_entry.pack()
-
-        destination_label = tk.Label(edit_route_window, text="Aeropuerto de Destino:")
-        destination_entry = tk.Entry(edit_route_window)
-        destination_label.pack()
-        destination_entry.pack()
-
-        distance_label = tk.Label(edit_route_window, text="Nueva Distancia:")
-        distance_entry = tk.Entry(edit_route_window)
-        distance_label.pack()
-        distance_entry.pack()
-
-        flight_time_label = tk.Label(edit_route_window, text="Nuevo Tiempo de Vuelo:")
-        flight_time_entry = tk.Entry(edit_route_window)
-        flight_time_label.pack()
-        flight_time_entry.pack()
-
-        save_button = tk.Button(edit_route_window, text="Guardar",
-                                command=lambda: self.update_route(source_entry.get(), destination_entry.get(),
-                                                                  distance_entry.get(), flight_time_entry.get(),
-                                                                  edit_route_window))
-        save_button.pack()
-
-    def visualize_routes(self):
-        graph_window = tk.Toplevel(self)
-        graph_window.title("Visualizar Rutas")
-
-        # Crear un nuevo lienzo para mostrar el grafo
-        figure = plt.figure(figsize=(10, 6))
-        canvas = FigureCanvasTkAgg(figure, master=graph_window)
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        # Obtener la información del nodo para etiquetar los nodos con el nombre del aeropuerto
-        node_labels = {node: self.graph.graph.nodes[node]['name'] for node in self.graph.graph.nodes}
-
-        # Dibujar el grafo en el lienzo con los nombres de los aeropuertos
-        pos = nx.spring_layout(self.graph.graph)
-        nx.draw(self.graph.graph, pos, with_labels=True, labels=node_labels, node_color='skyblue', node_size=800)
-        labels = nx.get_edge_attributes(self.graph.graph, 'distance')
-        nx.draw_networkx_edge_labels(self.graph.graph, pos, edge_labels=labels)
-
-        # Actualizar el lienzo
-        canvas.draw()
-
-        # Añadido para mostrar la ventana
-        graph_window.mainloop()
-
-    def visualize_time_routes(self):
-        graph_window = tk.Toplevel(self)
-        graph_window.title("Visualizar Rutas por Tiempo de Vuelo")
-
-        figure = plt.figure(figsize=(10, 6))
-        canvas = FigureCanvasTkAgg(figure, master=graph_window)
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-        node_labels = {node: self.graph.graph.nodes[node]['name'] for node in self.graph.graph.nodes}
-        pos = nx.spring_layout(self.graph.graph)
-        nx.draw(self.graph.graph, pos, with_labels=True, labels=node_labels, node_color='skyblue', node_size=800)
-        labels = nx.get_edge_attributes(self.graph.graph, 'flight_time')
-        nx.draw_networkx_edge_labels(self.graph.graph, pos, edge_labels=labels)
-
-        canvas.draw()
-
-    def update_graph(self):
-        self.figure.clear()
-        pos = nx.spring_layout(self.graph.graph)
-        nx.draw(self.graph.graph, pos, with_labels=True, node_color='skyblue', node_size=800)
-        labels = nx.get_edge_attributes(self.graph.graph, 'distance')
-        nx.draw_networkx_edge_labels(self.graph.graph, pos, edge_labels=labels)
-
-    def update_route(self, source, destination, distance, flight_time, window):
-        if source and destination and distance and flight_time:
-            try:
-                source = int(source)
-                destination = int(destination)
-
-                if self.graph.graph.has_edge(source, destination):
-                    self.graph.graph[source][destination]['distance'] = float(distance)
-                    self.graph.graph[source][destination]['flight_time'] = float(flight_time)
-                    self.update_graph()  # Asegúrate de llamar correctamente al método update_graph
-                    messagebox.showinfo("Ruta actualizada", "Ruta actualizada exitosamente.")
-                    window.destroy()
+            # utf-8-sig descarta la marca BOM que Excel pone al principio de los CSV
+            with open(path, newline='', encoding='utf-8-sig') as handle:
+                rows = csv.reader(handle) if openflights else _lowercase_dict_reader(handle)
+                for line_number, row in enumerate(rows, start=1 if openflights else 2):
+                    report.rows += 1
+                    try:
+                        airport = (self._parse_openflights_airport(row) if openflights
+                                   else self._parse_csv_airport(row))
+                    except (ValueError, IndexError, KeyError) as error:
+                        report.reject(line_number, f"fila inválida ({error})")
+                        continue
+                    name, location, external, coordinates = airport
+                    # Los nombres de aeropuerto son únicos, igual que al registrarlos desde la interfaz
+                    if name in self._batch_names or self.graph.has_airport_name(name):
+                        report.reject(line_number, f"nombre duplicado '{name}'")
+                        continue
+                    if any(code in self.external_codes for code in external):
+                        report.reject(line_number, f"código duplicado {external[0]}")
+                        continue
+                    self._batch_names.add(name)
+                    # Reservar los códigos externos ya dentro del lote para detectar duplicados
+                    for code in external:
+                        self.external_codes[code] = None
+                    batch.append((name, location, external, coordinates))
+                    if len(batch) >= self.batch_size:
+                        report.accepted += self._flush_airports(batch)
+                        if progress is not None:
+                            progress(report)
+                report.accepted += self._flush_airports(batch)
+        finally:
+            # Si la carga se interrumpe (error de lectura, tarea cancelada), el lote sin insertar
+            # no debe dejar reservados sus nombres ni sus códigos externos para el siguiente intento
+            self._batch_names.clear()
+            for _, _, external, _ in batch:
+                for code in external:
+                    if code in self.external_codes and self.external_codes[code] is None:
+                        del self.external_codes[code]
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _flush_airports(self, batch):
+        codes = self.graph.add_airports((name, location, *(coordinates or ()))
+                                        for name, location, _, coordinates in batch)
+        for code, (_, _, external, _) in zip(codes, batch):
+            for external_code in external:
+                self.external_codes[external_code] = code
+        count = len(batch)
+        batch.clear()
+        self._batch_names.clear()
+        return count
+
+    @staticmethod
+    def _parse_openflights_airport(row):
+        # ID, nombre, ciudad, país, IATA, ICAO, latitud, longitud, ...
+        name = row[1].strip()
+        if not name:
+            raise ValueError("nombre vacío")
+        location = ", ".join(part for part in (row[2].strip(), row[3].strip()) if part and part != '\\N')
+        external = [code for code in (row[0], row[4], row[5]) if code and code != '\\N']
+        coordinates = _parse_coordinates(row[6], row[7])
+        return name, location or 'No Location', external, coordinates
+
+    @staticmethod
+    def _parse_csv_airport(row):
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise ValueError("nombre vacío")
+        location = (row.get('location') or row.get('city') or '').strip() or 'No Location'
+        external = [row[key].strip() for key in ('id', 'iata', 'icao', 'code') if (row.get(key) or '').strip()]
+        coordinates = None
+        if row.get('latitude') and row.get('longitude'):
+            coordinates = _parse_coordinates(row['latitude'], row['longitude'])
+        return name, location, external, coordinates
+
+    def load_routes(self, path, file_format='auto', progress=None):
+        report = ImportReport("Rutas")
+        start = time.perf_counter()
+        openflights = self._is_openflights(path, file_format)
+        batch = []
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            rows = csv.reader(handle) if openflights else _lowercase_dict_reader(handle)
+            for line_number, row in enumerate(rows, start=1 if openflights else 2):
+                report.rows += 1
+                try:
+                    route = self._parse_openflights_route(row) if openflights else self._parse_csv_route(row)
+                except (ValueError, IndexError, KeyError) as error:
+                    report.reject(line_number, f"fila inválida ({error})")
+                    continue
+                source, destination, distance, flight_time = route
+                if source is None or destination is None:
+                    report.reject(line_number, "aeropuerto desconocido")
+                    continue
+                if source == destination:
+                    report.reject(line_number, "origen y destino iguales")
+                    continue
+                if distance is None:
+                    distance = self._great_circle(source, destination)
+                    if distance is None:
+                        report.reject(line_number, "sin distancia ni coordenadas")
+                        continue
+                if flight_time is None:
+                    flight_time = distance / self.cruise_speed
+                if distance < 0 or flight_time < 0:
+                    report.reject(line_number, "distancia o tiempo negativos")
+                    continue
+                batch.append((source, destination, distance, flight_time))
+                if len(batch) >= self.batch_size:
+                    report.accepted += self._flush_routes(batch)
+                    if progress is not None:
+                        progress(report)
+            report.accepted += self._flush_routes(batch)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _flush_routes(self, batch):
+        self.graph.add_routes(batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def load_flights(self, path, timetable=None, progress=None):
+        # Horario en CSV con cabecera: source, destination, departure y, opcionalmente, arrival y
+        # flight. Las horas son "HH:MM" (con "+N" para días posteriores) o minutos desde las 00:00
+        timetable = timetable if timetable is not None else self.graph.timetable
+        report = ImportReport("Vuelos")
+        start = time.perf_counter()
+        batch = []
+        internal = self._accepts_internal_codes()
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            for line_number, row in enumerate(_lowercase_dict_reader(handle), start=2):
+                report.rows += 1
+                try:
+                    source = self._resolve(row['source'], internal=internal)
+                    destination = self._resolve(row['destination'], internal=internal)
+                    departure = _parse_clock(row['departure'])
+                    arrival = _parse_clock(row['arrival']) if (row.get('arrival') or '').strip() else None
+                except (ValueError, KeyError) as error:
+                    report.reject(line_number, f"fila inválida ({error})")
+                    continue
+                if source is None or destination is None:
+                    report.reject(line_number, "aeropuerto desconocido")
+                    continue
+                if not self.graph.has_route(source, destination):
+                    report.reject(line_number, "la ruta no existe")
+                    continue
+                if arrival is not None and arrival < departure:
+                    report.reject(line_number, "llegada anterior a la salida")
+                    continue
+                batch.append((source, destination, departure, arrival, (row.get('flight') or '').strip() or None))
+                if len(batch) >= self.batch_size:
+                    report.accepted += self._flush_flights(timetable, batch)
+                    if progress is not None:
+                        progress(report)
+            report.accepted += self._flush_flights(timetable, batch)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _flush_flights(timetable, batch):
+        timetable.add_flights(batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def _accepts_internal_codes(self):
+        if self.internal_codes is None:
+            return not self.external_codes
+        return self.internal_codes
+
+    def _resolve(self, *candidates, internal=False):
+        # Traducir el primer código externo conocido; con internal, los números sin traducción
+        # se aceptan como códigos internos si el aeropuerto existe en el grafo
+        for candidate in candidates:
+            candidate = candidate.strip()
+            if not candidate or candidate == '\\N':
+                continue
+            code = self.external_codes.get(candidate)
+            if code is not None:
+                return code
+        if not internal:
+            return None
+        for candidate in candidates:
+            candidate = candidate.strip()
+            if candidate.isdigit() and candidate not in self.external_codes and self.graph.has_airport(int(candidate)):
+                return int(candidate)
+        return None
+
+    def _great_circle(self, source, destination):
+        source_coordinates = self.graph.get_coordinates(source)
+        destination_coordinates = self.graph.get_coordinates(destination)
+        if source_coordinates is None or destination_coordinates is None:
+            return None
+        return haversine(*source_coordinates, *destination_coordinates)
+
+    def _parse_openflights_route(self, row):
+        # Aerolínea, ID aerolínea, origen, ID origen, destino, ID destino, código compartido, escalas, equipo
+        return self._resolve(row[3], row[2]), self._resolve(row[5], row[4]), None, None
+
+    def _parse_csv_route(self, row):
+        distance = row.get('distance')
+        flight_time = row.get('flight_time')
+        internal = self._accepts_internal_codes()
+        return (self._resolve(row['source'], internal=internal), self._resolve(row['destination'], internal=internal),
+                float(distance) if distance else None, float(flight_time) if flight_time else None)
+
+
+def _lowercase_dict_reader(handle):
+    # Lector CSV con cabecera cuyos nombres de columna se normalizan a minúsculas
+    reader = csv.reader(handle)
+    header = [column.strip().lower() for column in next(reader, [])]
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def _parse_clock(text):
+    # "HH:MM" o "HH:MM+N" (N días después) a minutos desde las 00:00 del primer día; un número
+    # se toma directamente como minutos
+    text = str(text).strip()
+    if ':' not in text:
+        return float(text)
+    clock, _, days = text.partition('+')
+    hours, minutes = clock.split(':')
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"hora fuera de rango: {text}")
+    return float((int(days) if days else 0) * 1440 + hours * 60 + minutes)
+
+
+def _format_clock(minutes):
+    days, minutes = divmod(int(round(minutes)), 1440)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}" + (f"+{days}" if days else "")
+
+
+def _parse_coordinates(latitude, longitude):
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("coordenadas fuera de rango")
+    return latitude, longitude
+
+
+class LandmarkIndex:
+    # Preprocesamiento ALT: distancias exactas desde unos pocos aeropuertos "landmark" a todos
+    # los demás, para cada peso. Por la desigualdad triangular, |d(L, t) - d(L, v)| es una cota
+    # inferior de d(v, t) que guía A* sin cambiar el costo de la ruta encontrada.
+    # Si un peso aumenta las cotas siguen siendo válidas; si disminuye o aparece una ruta,
+    # el peso se marca como obsoleto y solo sus tablas se recalculan.
+    def __init__(self, landmarks, tables, active=4):
+        self.landmarks = landmarks
+        self.tables = tables
+        self.stale = set()
+        # Número de landmarks que se usan en cada consulta (los de mejor cota en el origen)
+        self.active = active
+
+    @classmethod
+    def build(cls, compact, count=8, weights=WEIGHTS):
+        index = cls(_select_landmarks(compact, count), {})
+        for weight in weights:
+            index._compute(compact, weight)
+        return index
+
+    def _compute(self, compact, weight):
+        weights = compact._weight_array(weight)
+        self.tables[weight] = [array('d', _dijkstra_csr(compact.offsets, compact.targets, weights, landmark)[0])
+                               for landmark in self.landmarks]
+        self.stale.discard(weight)
+
+    def refresh(self, compact, weight):
+        # Recalcular las tablas de un peso obsoleto o que aún no se había preprocesado
+        if weight in self.stale or weight not in self.tables:
+            self._compute(compact, weight)
+
+    def heuristic(self, weight, source, target):
+        # Cota h(v) hacia el índice destino con los landmarks más informativos para este origen.
+        # Los aeropuertos añadidos después del preprocesamiento no tienen cota (valen 0)
+        candidates = []
+        for table in self.tables[weight]:
+            if target < len(table) and table[target] != INF:
+                bound = abs(table[target] - table[source]) if source < len(table) and table[source] != INF else 0.0
+                candidates.append((bound, table[target], table))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        chosen = [(to_target, table) for _, to_target, table in candidates[:self.active]]
+        # Un margen mínimo evita que el redondeo haga la cota mayor que el costo real
+        scale = 1.0 - 1e-9
+
+        def heuristic(v):
+            best = 0.0
+            for to_target, table in chosen:
+                if v < len(table):
+                    bound = table[v]
+                    if bound != INF:
+                        bound = to_target - bound if to_target > bound else bound - to_target
+                        if bound > best:
+                            best = bound
+            return best * scale
+        return heuristic
+
+    def save(self, path, checksum):
+        weights = [weight for weight in WEIGHTS if weight in self.tables and weight not in self.stale]
+        n = len(self.tables[weights[0]][0]) if weights and self.landmarks else 0
+        mask = sum(1 << WEIGHTS.index(weight) for weight in weights)
+        with open(path, 'wb') as handle:
+            handle.write(LANDMARKS_HEADER.pack(LANDMARKS_MAGIC, LANDMARKS_VERSION, len(self.landmarks),
+                                               n, mask, checksum))
+            handle.write(_as_array('i', self.landmarks).tobytes())
+            for weight in weights:
+                for table in self.tables[weight]:
+                    handle.write(table.tobytes())
+
+    @classmethod
+    def load(cls, path, checksum):
+        # Devuelve None si no hay fichero o si pertenece a otra versión de la red
+        try:
+            with open(path, 'rb') as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < LANDMARKS_HEADER.size:
+            return None
+        magic, version, count, n, mask, owner = LANDMARKS_HEADER.unpack_from(data)
+        if magic != LANDMARKS_MAGIC or version != LANDMARKS_VERSION or owner != checksum:
+            return None
+        position = LANDMARKS_HEADER.size
+        landmarks = array('i')
+        landmarks.frombytes(data[position:position + 4 * count])
+        position += 4 * count
+        tables = {}
+        for bit, weight in enumerate(WEIGHTS):
+            if mask & (1 << bit):
+                tables[weight] = []
+                for _ in range(count):
+                    table = array('d')
+                    table.frombytes(data[position:position + 8 * n])
+                    tables[weight].append(table)
+                    position += 8 * n
+        if sys.byteorder != 'little':
+            landmarks.byteswap()
+            for weight_tables in tables.values():
+                for table in weight_tables:
+                    table.byteswap()
+        return cls(landmarks, tables)
+
+
+def _select_landmarks(compact, count):
+    # Selección "farthest": cada landmark es el aeropuerto más alejado (por distancia) de los
+    # ya elegidos, empezando por el más lejano al aeropuerto con más rutas
+    offsets, targets, weights = compact.offsets, compact.targets, compact.distances
+    n = len(offsets) - 1
+    candidates = [i for i in range(n) if offsets[i + 1] > offsets[i]]
+    landmarks = array('i')
+    if not candidates:
+        return landmarks
+    start = max(candidates, key=lambda i: offsets[i + 1] - offsets[i])
+    nearest, _ = _dijkstra_csr(offsets, targets, weights, start)
+    while len(landmarks) < count:
+        best = max(candidates, key=lambda i: nearest[i] if nearest[i] != INF else -1.0)
+        if nearest[best] in (0.0, INF):
+            break
+        landmarks.append(best)
+        dist, _ = _dijkstra_csr(offsets, targets, weights, best)
+        nearest = [min(a, b) for a, b in zip(nearest, dist)]
+    return landmarks
+
+
+class _HubTree:
+    # Árbol de caminos mínimos desde un aeropuerto para un peso, sobre índices del motor compacto
+    def __init__(self, hub, weight):
+        self.hub = hub
+        self.weight = weight
+        self.dist = []
+        self.pred = []
+        # Aeropuertos alcanzables: los que asentaría un recálculo completo
+        self.reached = 0
+
+    def compute(self, compact):
+        compact._build_csr()
+        self.dist, self.pred = _dijkstra_csr(compact.offsets, compact.targets, compact._weight_array(self.weight),
+                                             self.hub)
+        self.reached = sum(d != INF for d in self.dist)
+
+    def grow(self, n):
+        # Los aeropuertos registrados después del cálculo aún no tienen rutas
+        missing = n - len(self.dist)
+        if missing > 0:
+            self.dist.extend([INF] * missing)
+            self.pred.extend([-1] * missing)
+
+
+def _arcs(offsets, targets, weights, overlay, u):
+    # Vecinos de u con el peso de la ruta: los del CSR y los de las rutas pendientes de fusionar
+    for k in range(offsets[u], offsets[u + 1]):
+        yield targets[k], weights[k]
+    if overlay is not None:
+        adjacency, pending_weights = overlay
+        for v, position in adjacency.get(u, ()):
+            yield v, pending_weights[position]
+
+
+def _repair_decrease(offsets, targets, weights, tree, arcs, overlay=None):
+    # Rutas nuevas o más baratas: propagar las mejoras desde los extremos, como en Dijkstra,
+    # solo por los aeropuertos cuya distancia baja. Devuelve los aeropuertos tocados
+    dist, pred = tree.dist, tree.pred
+    heap = []
+    for u, v, w in arcs:
+        if dist[u] + w < dist[v]:
+            tree.reached += dist[v] == INF
+            dist[v] = dist[u] + w
+            pred[v] = u
+            heapq.heappush(heap, (dist[v], v))
+    touched = set()
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        touched.add(u)
+        for v, w in _arcs(offsets, targets, weights, overlay, u):
+            nd = d + w
+            if nd < dist[v]:
+                tree.reached += dist[v] == INF
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return len(touched)
+
+
+def _repair_increase(offsets, targets, weights, tree, child, overlay=None):
+    # Una ruta del árbol se encarece: solo cambia el subárbol que cuelga de ella. Se vacía,
+    # cada aeropuerto del subárbol toma la mejor entrada desde fuera y Dijkstra restringido
+    # al subárbol reparte el resto (en el estilo de Ramalingam y Reps). Devuelve su tamaño
+    dist, pred = tree.dist, tree.pred
+    subtree = [child]
+    inside = {child}
+    for x in subtree:
+        for y, _ in _arcs(offsets, targets, weights, overlay, x):
+            if pred[y] == x and y not in inside:
+                inside.add(y)
+                subtree.append(y)
+    for x in subtree:
+        dist[x] = INF
+        pred[x] = -1
+    heap = []
+    for x in subtree:
+        for y, w in _arcs(offsets, targets, weights, overlay, x):
+            if y not in inside and dist[y] + w < dist[x]:
+                dist[x] = dist[y] + w
+                pred[x] = y
+        if dist[x] != INF:
+            heapq.heappush(heap, (dist[x], x))
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v, w in _arcs(offsets, targets, weights, overlay, u):
+            if v in inside:
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd, v))
+    tree.reached -= sum(dist[x] == INF for x in subtree)
+    return len(subtree)
+
+
+class HubTrees:
+    # Árboles de caminos mínimos dinámicos desde aeropuertos "hub" elegidos. Cada cambio de ruta
+    # repara solo la parte afectada de cada árbol en lugar de recalcularlo, y las consultas con
+    # origen o destino en un hub se responden directamente desde su árbol (la red es no dirigida).
+    # Se lleva la cuenta de los aeropuertos tocados frente a los que asentaría un recálculo.
+    def __init__(self):
+        self.trees = {}
+        self.updates = 0
+        self.touched = 0
+        self.recompute_cost = 0
+        # (código del hub, peso, tocados, alcanzables) de cada árbol en el último cambio
+        self.last_update = []
+
+    def track(self, compact, hub, weight):
+        tree = self.trees.get((hub, weight))
+        if tree is None:
+            tree = _HubTree(hub, weight)
+            tree.compute(compact)
+            self.trees[(hub, weight)] = tree
+        return tree
+
+    def untrack(self, hub):
+        for key in [key for key in self.trees if key[0] == hub]:
+            del self.trees[key]
+
+    def get(self, compact, hub, weight):
+        tree = self.trees.get((hub, weight))
+        if tree is not None:
+            tree.grow(len(compact.codes))
+        return tree
+
+    def apply(self, compact, changes):
+        # changes: [(i, j, (distancia, tiempo) anteriores o None si la ruta es nueva)]; los pesos
+        # nuevos se leen de la red compacta. Varios aumentos en un mismo cambio masivo (o aumentos mezclados
+        # con reducciones) no se pueden reparar uno a uno sobre la red final: esos árboles se
+        # recalculan. Las rutas que aún no están en el CSR se recorren desde la lista pendiente.
+        # Devuelve los aeropuertos tocados por peso
+        codes = compact.codes
+        n = len(codes)
+        self.updates += 1
+        self.last_update = []
+        touched_by_weight = {}
+        for position, weight in enumerate(WEIGHTS):
+            trees = [tree for tree in self.trees.values() if tree.weight == weight]
+            if not trees:
+                continue
+            decreased, increased = [], []
+            for i, j, old in changes:
+                if i == j:
+                    continue
+                new = compact.get_route(codes[i], codes[j])[position]
+                before = INF if old is None else old[position]
+                if new < before:
+                    decreased += [(i, j, new), (j, i, new)]
+                elif new > before:
+                    increased.append((i, j))
+            if not decreased and not increased:
+                continue
+            offsets, targets = compact.offsets, compact.targets
+            weights = compact._weight_array(weight)
+            overlay = compact._pending_overlay(weight)
+            total = 0
+            for tree in trees:
+                tree.grow(n)
+                reached = tree.reached
+                if len(increased) > 1 or (increased and decreased):
+                    # compute() fusiona las rutas pendientes: el resto de árboles ya no las necesita
+                    tree.compute(compact)
+                    offsets, targets = compact.offsets, compact.targets
+                    weights, overlay = compact._weight_array(weight), None
+                    touched = max(reached, tree.reached)
+                elif increased:
+                    i, j = increased[0]
+                    child = j if tree.pred[j] == i else i if tree.pred[i] == j else -1
+                    touched = 0 if child == -1 else _repair_increase(offsets, targets, weights, tree, child,
+                                                                     overlay)
+                else:
+                    touched = _repair_decrease(offsets, targets, weights, tree, decreased, overlay)
+                self.touched += touched
+                self.recompute_cost += max(reached, tree.reached)
+                self.last_update.append((compact.codes[tree.hub], weight, touched, max(reached, tree.reached)))
+                total += touched
+            touched_by_weight[weight] = total
+        return touched_by_weight
+
+    def path(self, compact, source, destination, weight):
+        # (encontrado, resultado): la ruta desde el árbol del origen o, invertida, desde el del destino
+        i = compact.index.get(source)
+        j = compact.index.get(destination)
+        if i is None or j is None:
+            return False, None
+        tree = self.get(compact, i, weight)
+        if tree is None:
+            tree = self.get(compact, j, weight)
+            if tree is None:
+                return False, None
+            i, j = j, i
+        if tree.dist[j] == INF:
+            return True, None
+        path = [compact.codes[k] for k in _rebuild_path(tree.pred, j)]
+        if path[0] != source:
+            path.reverse()
+        return True, (path, tree.dist[j])
+
+    def stats(self):
+        return {'trees': len(self.trees), 'updates': self.updates, 'touched': self.touched,
+                'recompute_cost': self.recompute_cost,
+                'touched_ratio': self.touched / self.recompute_cost if self.recompute_cost else 0.0,
+                'last_update': list(self.last_update)}
+
+
+class Timetable:
+    # Horario de vuelos sobre las rutas del grafo con búsquedas Connection Scan (CSA). Cada vuelo
+    # es una conexión (origen, destino, salida, llegada) con las horas en minutos desde las 00:00
+    # del primer día. Las conexiones se guardan en columnas ordenadas por hora de salida que, como
+    # el CSR del motor compacto, solo se reconstruyen cuando hay vuelos nuevos. Los tramos
+    # encadenados con el mismo código de vuelo forman un viaje en el que el pasajero sigue a bordo;
+    # para cambiar de vuelo hace falta el tiempo mínimo de conexión del aeropuerto.
+    def __init__(self, graph, min_connection=MIN_CONNECTION_MINUTES):
+        self.graph = graph
+        self.min_connection = min_connection
+        # Tiempo mínimo de conexión propio de algunos aeropuertos: código -> minutos
+        self.connection_times = {}
+        self._sources = array('q')
+        self._destinations = array('q')
+        self._departures = array('d')
+        self._arrivals = array('d')
+        self._flights = []
+        self._built = True
+        self._clear_columns()
+
+    def _clear_columns(self):
+        self.stops = []
+        self.stop_index = {}
+        self.dep_stop = []
+        self.arr_stop = []
+        self.dep_time = []
+        self.arr_time = []
+        self.trip = []
+        self.flight = []
+        self.transfer = []
+        self.trips = 0
+
+    def __len__(self):
+        return len(self._departures)
+
+    def add_flight(self, source, destination, departure, arrival=None, flight=None):
+        # Sin hora de llegada se usa el tiempo de vuelo de la ruta
+        self.add_flights([(source, destination, departure, arrival, flight)])
+
+    def add_flights(self, flights):
+        # Inserción masiva de (origen, destino, salida, llegada o None, código de vuelo o None)
+        rows = []
+        for source, destination, departure, arrival, flight in flights:
+            route = self.graph.get_route(source, destination)
+            if route is None:
+                raise ValueError(f"No existe una ruta entre {source} y {destination}.")
+            departure = float(departure)
+            arrival = departure + route[1] * 60 if arrival is None else float(arrival)
+            if arrival < departure:
+                raise ValueError("La llegada de un vuelo no puede ser anterior a su salida.")
+            rows.append((source, destination, departure, arrival, flight))
+        for source, destination, departure, arrival, flight in rows:
+            self._sources.append(source)
+            self._destinations.append(destination)
+            self._departures.append(departure)
+            self._arrivals.append(arrival)
+            self._flights.append(flight)
+        if rows:
+            self._built = False
+
+    def set_min_connection_time(self, airport_code, minutes):
+        if not self.graph.has_airport(airport_code):
+            raise nx.NodeNotFound(f"Aeropuerto {airport_code} no encontrado.")
+        self.connection_times[airport_code] = float(minutes)
+        self._built = False
+
+    def _build(self):
+        # Ordenar las conexiones por salida (y llegada) y encadenar los tramos de cada vuelo
+        if self._built:
+            return
+        self._clear_columns()
+        departures, arrivals = self._departures, self._arrivals
+        order = sorted(range(len(departures)), key=lambda c: (departures[c], arrivals[c]))
+        stop_index = self.stop_index
+        for code in self._sources + self._destinations:
+            if code not in stop_index:
+                stop_index[code] = len(self.stops)
+                self.stops.append(code)
+        self.dep_stop = [stop_index[self._sources[c]] for c in order]
+        self.arr_stop = [stop_index[self._destinations[c]] for c in order]
+        self.dep_time = [departures[c] for c in order]
+        self.arr_time = [arrivals[c] for c in order]
+        self.flight = [self._flights[c] for c in order]
+        # Un tramo continúa el viaje del tramo anterior del mismo vuelo si sale del aeropuerto
+        # al que este llegó y no antes de su llegada
+        last_leg = {}
+        for position, flight in enumerate(self.flight):
+            previous = last_leg.get(flight) if flight is not None else None
+            if (previous is not None and self.arr_stop[previous] == self.dep_stop[position]
+                    and self.arr_time[previous] <= self.dep_time[position]):
+                self.trip.append(self.trip[previous])
+            else:
+                self.trip.append(self.trips)
+                self.trips += 1
+            if flight is not None:
+                last_leg[flight] = position
+        self.transfer = [self.connection_times.get(code, self.min_connection) for code in self.stops]
+        self._built = True
+
+    def _scan(self, origin, departure, target=-1):
+        # CSA hacia delante: llegada más temprana a cada aeropuerto saliendo del origen a partir de
+        # departure. ready es la primera hora a la que se puede embarcar (llegada más conexión).
+        # Con un destino se detiene en cuanto las salidas no pueden mejorar su llegada
+        n = len(self.stops)
+        dep_stop, arr_stop, dep_time, arr_time, trip = self.dep_stop, self.arr_stop, self.dep_time, self.arr_time, self.trip
+        transfer = self.transfer
+        arrival = [INF] * n
+        ready = [INF] * n
+        # Por aeropuerto, el tramo con el que se llegó; por viaje, el tramo en el que se embarcó
+        exit_leg = [-1] * n
+        boarded = [-1] * self.trips
+        arrival[origin] = ready[origin] = departure
+        limit = INF
+        for c in range(bisect.bisect_left(dep_time, departure), len(dep_time)):
+            d = dep_time[c]
+            if d >= limit:
+                break
+            t = trip[c]
+            if boarded[t] == -1:
+                if ready[dep_stop[c]] > d:
+                    continue
+                boarded[t] = c
+            a = arr_stop[c]
+            if arr_time[c] < arrival[a]:
+                arrival[a] = arr_time[c]
+                ready[a] = arr_time[c] + transfer[a]
+                exit_leg[a] = c
+                if a == target:
+                    limit = arr_time[c]
+        return arrival, exit_leg, boarded
+
+    def earliest_arrival(self, origin, destination, departure):
+        # Itinerario que llega antes al destino saliendo del origen desde la hora departure:
+        # (llegada, tramos) con cada tramo como (vuelo, origen, destino, salida, llegada),
+        # o None si no hay ninguno
+        if not self.graph.has_airport(origin):
+            raise nx.NodeNotFound(f"Aeropuerto {origin} no encontrado.")
+        if origin == destination:
+            return departure, []
+        self._build()
+        s = self.stop_index.get(origin)
+        t = self.stop_index.get(destination)
+        if s is None or t is None:
+            return None
+        arrival, exit_leg, boarded = self._scan(s, departure, t)
+        if arrival[t] == INF:
+            return None
+        legs = []
+        stop = t
+        while stop != s:
+            last = exit_leg[stop]
+            first = boarded[self.trip[last]]
+            legs.append((self.flight[first], self.stops[self.dep_stop[first]], self.stops[stop],
+                         self.dep_time[first], self.arr_time[last]))
+            stop = self.dep_stop[first]
+        legs.reverse()
+        return arrival[t], legs
+
+    def earliest_arrivals(self, origin, departure):
+        # Llegada más temprana a todos los aeropuertos alcanzables: código -> minutos
+        if not self.graph.has_airport(origin):
+            raise nx.NodeNotFound(f"Aeropuerto {origin} no encontrado.")
+        self._build()
+        s = self.stop_index.get(origin)
+        if s is None:
+            return {origin: departure}
+        arrival, _, _ = self._scan(s, departure)
+        return {code: time for code, time in zip(self.stops, arrival) if time != INF}
+
+    def profile(self, origin, destination, departure=0.0, until=INF):
+        # Perfil origen-destino: todos los pares (salida, llegada) no dominados con salida entre
+        # departure y until, ordenados por salida. CSA hacia atrás: recorriendo las conexiones de
+        # la última a la primera se mantiene, por aeropuerto, la lista de (salida, llegada al
+        # destino) útiles y, por viaje, la llegada si se sigue a bordo. Los itinerarios que salen
+        # antes de until pueden usar vuelos posteriores, así que siempre se recorre hasta el final
+        if not self.graph.has_airport(origin):
+            raise nx.NodeNotFound(f"Aeropuerto {origin} no encontrado.")
+        self._build()
+        s = self.stop_index.get(origin)
+        t = self.stop_index.get(destination)
+        if s is None or t is None or s == t:
+            return []
+        dep_stop, arr_stop, dep_time, arr_time, trip = self.dep_stop, self.arr_stop, self.dep_time, self.arr_time, self.trip
+        transfer = self.transfer
+        n = len(self.stops)
+        # Perfiles con las salidas negadas para buscarlas con bisect en orden creciente
+        keys = [[] for _ in range(n)]
+        values = [[] for _ in range(n)]
+        on_board = [INF] * self.trips
+        first = bisect.bisect_left(dep_time, departure)
+        for c in range(len(dep_time) - 1, first - 1, -1):
+            a = arr_stop[c]
+            if a == t:
+                best = arr_time[c]
+            else:
+                best = on_board[trip[c]]
+                profile_keys = keys[a]
+                if profile_keys:
+                    # Primera salida de a que se puede tomar tras la conexión
+                    i = bisect.bisect_right(profile_keys, -(arr_time[c] + transfer[a])) - 1
+                    if i >= 0 and values[a][i] < best:
+                        best = values[a][i]
+            if best == INF:
+                continue
+            if best < on_board[trip[c]]:
+                on_board[trip[c]] = best
+            u = dep_stop[c]
+            # Una salida anterior solo sirve si llega antes que todas las posteriores
+            if not values[u] or best < values[u][-1]:
+                if keys[u] and keys[u][-1] == -dep_time[c]:
+                    values[u][-1] = best
                 else:
-                    messagebox.showerror("Error", "La ruta especificada no existe.")
-            except ValueError:
-                messagebox.showerror("Error", "Códigos de aeropuerto deben ser números válidos.")
+                    keys[u].append(-dep_time[c])
+                    values[u].append(best)
+        return [(-key, value) for key, value in zip(reversed(keys[s]), reversed(values[s])) if -key <= until]
+
+
+def _as_array(typecode, values):
+    # Convertir una vista de memoria (por ejemplo, sobre un mmap) en un arreglo propio
+    if isinstance(values, array):
+        return values
+    copy = array(typecode)
+    copy.frombytes(memoryview(values).cast('B'))
+    return copy
+
+
+class _StringTable:
+    # Secuencia de solo lectura de textos UTF-8 decodificados bajo demanda desde la instantánea
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def _string_offsets(encoded, start):
+    offsets = array('q', [start])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return offsets
+
+
+def _write_snapshot(compact, path):
+    n = len(compact.codes)
+    names = [name.encode('utf-8') for name in compact.names]
+    locations = [location.encode('utf-8') for location in compact.locations]
+    name_offsets = _string_offsets(names, 0)
+    location_offsets = _string_offsets(locations, name_offsets[-1])
+    blob_size = location_offsets[-1]
+    sections = [
+        _as_array('q', compact.codes),
+        _as_array('q', compact.offsets),
+        _as_array('i', compact.targets),
+        _as_array('d', compact.distances),
+        _as_array('d', compact.flight_times),
+        _as_array('d', compact.latitudes),
+        _as_array('d', compact.longitudes),
+        name_offsets,
+        location_offsets,
+    ]
+    checksum = 0
+    with open(path, 'wb') as handle:
+        handle.write(bytes(SNAPSHOT_HEADER.size))
+        for section in sections:
+            data = section.tobytes() if sys.byteorder == 'little' else _byteswapped(section)
+            data += bytes(-len(data) % 8)
+            checksum = zlib.crc32(data, checksum)
+            handle.write(data)
+        for value in names + locations:
+            checksum = zlib.crc32(value, checksum)
+            handle.write(value)
+        # La cabecera se escribe al final, cuando ya se conoce la suma de comprobación
+        handle.seek(0)
+        handle.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, compact.airport_counter,
+                                          n, len(compact.targets), blob_size, checksum, 0))
+    return checksum
+
+
+def _byteswapped(section):
+    copy = array(section.typecode, section)
+    copy.byteswap()
+    return copy.tobytes()
+
+
+def _read_snapshot(path, verify, mapped=False):
+    with open(path, 'rb') as handle:
+        if mapped:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
         else:
-            messagebox.showerror("Error", "Todos los campos son requeridos.")
-
-    def search_route(self):
-        # Obtener referencias a las entradas de origen y destino
-        origin_entry = self.origin_entry
-        destination_entry = self.destination_entry
+            data = handle.read()
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("Fichero de instantánea incompleto.")
+    magic, version, _, airport_counter, n, m, blob_size, checksum, _ = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("El fichero no es una instantánea de rutas.")
+    if version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"Versión de instantánea no soportada: {version}")
+    if verify and zlib.crc32(memoryview(data)[SNAPSHOT_HEADER.size:]) != checksum:
+        raise ValueError("La suma de comprobación de la instantánea no coincide.")
+    if sys.byteorder != 'little' or not mapped:
+        # Sin mmap (o en máquinas big-endian) las secciones se copian a arreglos propios
+        mapped = False
+    view = memoryview(data)
+    position = SNAPSHOT_HEADER.size
+    sections = {}
+    layout = [('codes', 'q', n), ('offsets', 'q', n + 1), ('targets', 'i', m),
+              ('distances', 'd', m), ('flight_times', 'd', m)]
+    if version >= 2:
+        # La versión 2 añade las coordenadas de los aeropuertos
+        layout += [('latitudes', 'd', n), ('longitudes', 'd', n)]
+    layout += [('name_offsets', 'q', n + 1), ('location_offsets', 'q', n + 1)]
+    for name, typecode, count in layout:
+        size = array(typecode).itemsize * count
+        if position + size > len(data):
+            raise ValueError("Fichero de instantánea incompleto.")
+        section = view[position:position + size].cast(typecode)
+        if not mapped:
+            section = _as_array(typecode, section)
+            if sys.byteorder != 'little':
+                section.byteswap()
+        sections[name] = section
+        position += size + (-size % 8)
+    blob = view[position:position + blob_size]
+    if len(blob) != blob_size:
+        raise ValueError("Fichero de instantánea incompleto.")
+    if version < 2:
+        sections['latitudes'] = array('d', [math.nan]) * n
+        sections['longitudes'] = array('d', [math.nan]) * n
+    sections['names'] = _StringTable(blob, sections.pop('name_offsets'))
+    sections['locations'] = _StringTable(blob, sections.pop('location_offsets'))
+    sections['airport_counter'] = airport_counter
+    sections['checksum'] = checksum
+    sections['mmap'] = data if mapped else None
+    return sections
+
+
+_batch_state = None
+
+
+def _batch_worker_init(snapshot, wanted, keep_paths):
+    # Guardar en el proceso de trabajo la instantánea de solo lectura y los destinos comunes de
+    # la matriz (None si cada origen trae los suyos); solo se usa con ProcessPoolExecutor
+    global _batch_state
+    _batch_state = (snapshot, wanted, keep_paths)
+
+
+def _batch_worker_run(job):
+    return _batch_row(*_batch_state, job)
+
+
+def _batch_row(snapshot, shared, keep_paths, job):
+    # job: (índice del origen, sus destinos o None para usar los comunes); la búsqueda se
+    # detiene en cuanto están asentados los destinos de este origen
+    offsets, targets, weights = snapshot
+    source, wanted = job
+    if wanted is None:
+        wanted = shared
+    dist, pred = _dijkstra_csr_many(offsets, targets, weights, source, [j for j in wanted if j != -1])
+    row = array('d', (dist[j] if j != -1 else INF for j in wanted))
+    return row, array('i', pred) if keep_paths else None
+
+
+class RouteMatrix:
+    # Resultado de una consulta por lotes: una fila de costos por origen con sus destinos (todos
+    # los destinos en una matriz completa, solo los pedidos con pares). Las rutas se reconstruyen
+    # bajo demanda a partir de la misma instantánea de la red.
+    def __init__(self, codes, index, snapshot, origins, columns, rows):
+        self.codes = codes
+        self.index = index
+        self.snapshot = snapshot
+        self.origins = origins
+        self.destinations = list(dict.fromkeys(destination for destinations in columns for destination in destinations))
+        self.values = [row for row, _ in rows]
+        self._preds = [pred for _, pred in rows]
+        self._origin_row = {code: i for i, code in enumerate(origins)}
+        # Las filas con la misma lista de destinos comparten el mapa destino -> columna
+        maps = {}
+        self._columns = [maps.setdefault(id(destinations), {code: j for j, code in enumerate(destinations)})
+                         for destinations in columns]
+        self._column_lists = columns
+
+    def get(self, source, destination):
+        # Costo mínimo de un par del resultado, o None si no hay ruta
+        i = self._origin_row[source]
+        value = self.values[i][self._columns[i][destination]]
+        return None if value == INF else value
+
+    def path(self, source, destination):
+        # Ruta y costo como en Graph.get_shortest_path_dis, calculados bajo demanda
+        cost = self.get(source, destination)
+        if cost is None:
+            return None
+        t = self.index[destination]
+        pred = self._preds[self._origin_row[source]]
+        if pred is None:
+            offsets, targets, weights = self.snapshot
+            _, pred = _dijkstra_csr(offsets, targets, weights, self.index[source], t)
+        return [self.codes[i] for i in _rebuild_path(pred, t)], cost
 
-        # Verificar si las entradas están en la ventana principal o en una ventana secundaria
-        if not self.origin_entry.winfo_ismapped():
-            # Si no están mapeadas, buscar en la ventana secundaria
-            origin_entry = self.origin_entry.in_toplevel()
-            destination_entry = self.destination_entry.in_toplevel()
+    def rows(self):
+        # Iterar (origen, destino, costo) sobre todas las celdas alcanzables
+        for source, destinations, row in zip(self.origins, self._column_lists, self.values):
+            for destination, value in zip(destinations, row):
+                if value != INF:
+                    yield source, destination, value
 
-        # Verificar si la ventana secundaria aún existe
-        if origin_entry.winfo_exists() and destination_entry.winfo_exists():
-            origin_code = origin_entry.get()
-            destination_code = destination_entry.get()
 
-            if origin_code and destination_code:
-                try:
-                    origin_code = int(origin_code)
-                    destination_code = int(destination_code)
-                    result = self.graph.get_shortest_path_dis(origin_code, destination_code)
-                    if result:
-                        path, distance = result
-                        airport_names = [self.graph.graph.nodes[node]['name'] for node in path]
-                        messagebox.showinfo("Ruta encontrada", f"Ruta encontrada:\n\n"
-                                                            f"Ruta: {' -> '.join(map(str, airport_names))}\n"
-                                                            f"Distancia: {distance} km\n")
-                    else:
-                        messagebox.showerror("Error", "No se encontró una ruta entre los aeropuertos especificados.")
-                except ValueError:
-                    messagebox.showerror("Error", "Códigos de aeropuerto deben ser números válidos.")
-            else:
-                messagebox.showerror("Error", "Todos los campos son requeridos.")
-        else:
-            messagebox.showerror("Error", "La ventana de edición de rutas ha sido cerrada.")
+# La interfaz gráfica vive en interfaz.py y solo se importa (con tkinter y matplotlib) cuando
+# se usa alguno de sus nombres, así el motor de rutas se puede usar sin pantalla
+_GUI_NAMES = ('Application', 'NetworkView', 'TaskScheduler', 'Task', 'TaskCancelled', 'network_snapshot')
 
-    def search_shortest_time_route(self):
-        # Obtener referencias a las entradas de origen y destino
-        origin_entry = self.origin_entry
-        destination_entry = self.destination_entry
 
-        # Verificar si las entradas están en la ventana principal o en una ventana secundaria
-        if not self.origin_entry.winfo_ismapped():
-            # Si no están mapeadas, buscar en la ventana secundaria
-            origin_entry = self.origin_entry.in_toplevel()
-            destination_entry = self.destination_entry.in_toplevel()
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        import interfaz
+        return getattr(interfaz, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-        # Verificar si la ventana secundaria aún existe
-        if origin_entry.winfo_exists() and destination_entry.winfo_exists():
-            origin_code = origin_entry.get()
-            destination_code = destination_entry.get()
 
-            if origin_code and destination_code:
-                try:
-                    origin_code = int(origin_code)
-                    destination_code = int(destination_code)
-                    result = self.graph.get_shortest_path(origin_code, destination_code)
-                    if result:
-                        path, flight_time = result
-                        airport_names = [self.graph.graph.nodes[node]['name'] for node in path]
-                        messagebox.showinfo("Ruta encontrada", f"Ruta encontrada:\n\n"
-                                                            f"Ruta: {' -> '.join(map(str, airport_names))}\n"
-                                                            f"Tiempo de vuelo: {flight_time} horas")
-                    else:
-                        messagebox.showerror("Error", "No se encontró una ruta entre los aeropuertos especificados.")
-                except ValueError:
-                    messagebox.showerror("Error", "Códigos de aeropuerto deben ser números válidos.")
-            else:
-                messagebox.showerror("Error", "Todos los campos son requeridos.")
-        else:
-            messagebox.showerror("Error", "La ventana de edición de rutas ha sido cerrada.")
-
-    def display_airports(self):
-        # Obtener la lista de aeropuertos y crear una nueva ventana para mostrarla
-        airports_list = self.graph.get_airports_list()
-        airports_window = tk.Toplevel(self)
-        airports_window.title("Lista de Aeropuertos")
-
-        # Crear un nuevo marco para mostrar la lista de aeropuertos
-        frame = tk.Frame(airports_window, bg="white", bd=1, relief="solid", padx=25, pady=25)
-        frame.pack()
-
-        # Crear etiquetas para mostrar la lista de aeropuertos
-        for airport in airports_list:
-            airport_info = f"Código: {airport['code']}, Nombre: {airport['name']}, Ubicación: {airport['location']}"
-            airport_label = tk.Label(frame, text=airport_info, bg=frame.cget("bg"))
-            airport_label.pack()
-        
 if __name__ == "__main__":
+    # Al ejecutar este fichero, interfaz.py debe reutilizar este módulo y no cargarlo otra vez
+    sys.modules.setdefault('Proyecto2', sys.modules[__name__])
+    from interfaz import Application
     app = Application()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,681 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import networkx as nx
+
+from Proyecto2 import PARETO_MAX_LABELS, WEIGHTS, CompactGraph, Graph, haversine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def random_network(graph, airports, routes, seed=0):
+    # Generar una red aleatoria conexa: un árbol de expansión más rutas extra al azar
+    rng = random.Random(seed)
+    codes = [graph.add_airport(f"Aeropuerto {i}", f"Ciudad {i}") for i in range(airports)]
+    for i in range(1, airports):
+        distance = rng.uniform(100, 5000)
+        graph.add_route(codes[rng.randrange(i)], codes[i], distance, distance / 800)
+    for _ in range(routes - (airports - 1)):
+        distance = rng.uniform(100, 5000)
+        graph.add_route(rng.choice(codes), rng.choice(codes), distance, distance / 800)
+    return codes
+
+
+# Los generadores de redes sintéticas devuelven una especificación (aeropuertos, rutas) sin tocar
+# ningún grafo, para poder medir la inserción aparte: aeropuertos como (nombre, ubicación,
+# latitud, longitud) y rutas como (índice de origen, índice de destino, distancia, tiempo).
+# Las distancias nunca son menores que la ortodrómica y los tiempos respetan la velocidad
+# máxima de crucero, de modo que las heurísticas de A* son admisibles en todas ellas.
+DEFAULT_BOUNDS = (35.0, 70.0, -10.0, 40.0)
+
+
+def _route(rng, points, i, j, detour=(1.0, 1.15)):
+    distance = haversine(*points[i], *points[j]) * rng.uniform(*detour)
+    return i, j, distance, distance / rng.uniform(700, 900) + 0.5
+
+
+def _airport_rows(points):
+    return [(f"Aeropuerto {i}", f"Ciudad {i}", lat, lon) for i, (lat, lon) in enumerate(points)]
+
+
+def hub_and_spoke_spec(airports, seed=0, hubs=None, bounds=DEFAULT_BOUNDS):
+    # Red de aerolínea con centros de conexión: unos pocos hubs unidos a sus hubs más cercanos
+    # y con algún vuelo de largo radio; cada aeropuerto regional vuela a un hub cercano (de
+    # tamaño según una ley de Zipf) y a veces también a un segundo hub vecino
+    rng = random.Random(seed)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    hubs = min(airports, hubs or max(2, int(airports ** 0.5 / 2)))
+    points = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)) for _ in range(hubs)]
+    routes = []
+    hub_neighbors = []
+    for i, point in enumerate(points):
+        nearest = sorted(range(hubs), key=lambda j: (points[j][0] - point[0]) ** 2 + (points[j][1] - point[1]) ** 2)
+        hub_neighbors.append(nearest[1:9])
+        routes.extend(_route(rng, points, i, j) for j in nearest[1:9] if j > i)
+        for _ in range(2):
+            j = rng.randrange(hubs)
+            if j != i:
+                routes.append(_route(rng, points, i, j))
+    weights = [1 / (rank + 1) for rank in range(hubs)]
+    spread = max(lat_max - lat_min, lon_max - lon_min) / hubs ** 0.5
+    for i, hub in enumerate(rng.choices(range(hubs), weights, k=airports - hubs), start=hubs):
+        lat, lon = points[hub]
+        points.append((min(lat_max, max(lat_min, rng.gauss(lat, spread))),
+                       min(lon_max, max(lon_min, rng.gauss(lon, spread)))))
+        routes.append(_route(rng, points, i, hub))
+        if hub_neighbors[hub] and rng.random() < 0.2:
+            routes.append(_route(rng, points, i, rng.choice(hub_neighbors[hub])))
+    return _airport_rows(points), routes
+
+
+def scale_free_spec(airports, seed=0, links=2, bounds=DEFAULT_BOUNDS):
+    # Red libre de escala (Barabási-Albert): cada aeropuerto nuevo se une a `links` aeropuertos
+    # elegidos con probabilidad proporcional a su número de rutas
+    rng = random.Random(seed)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    points = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)) for _ in range(airports)]
+    # Semilla: una cadena con los primeros `links` + 1 aeropuertos
+    routes = [_route(rng, points, i, i - 1, (1.0, 1.3)) for i in range(1, min(airports, links + 1))]
+    # Cada aeropuerto aparece una vez por ruta: elegir al azar de aquí es elegir por grado
+    endpoints = [i for route in routes for i in route[:2]] or [0]
+    for i in range(len(routes) + 1, airports):
+        targets = set()
+        while len(targets) < min(links, i):
+            targets.add(rng.choice(endpoints))
+        for j in targets:
+            routes.append(_route(rng, points, i, j, (1.0, 1.3)))
+            endpoints.extend((i, j))
+    return _airport_rows(points), routes
+
+
+def geographic_spec(airports, neighbors=4, seed=0, bounds=DEFAULT_BOUNDS):
+    # Red geográfica: aeropuertos en una región y rutas hacia los vecinos más cercanos
+    rng = random.Random(seed)
+    lat_min, lat_max, lon_min, lon_max = bounds
+    points = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)) for _ in range(airports)]
+    # Rejilla con unos cuatro aeropuertos por celda para buscar vecinos cercanos
+    cell = max(1e-6, ((lat_max - lat_min) * (lon_max - lon_min) * 4 / airports) ** 0.5)
+    grid = {}
+    for i, (lat, lon) in enumerate(points):
+        grid.setdefault((int(lat // cell), int(lon // cell)), []).append(i)
+    routes = []
+    for i, (lat, lon) in enumerate(points):
+        row, column = int(lat // cell), int(lon // cell)
+        ring, candidates = 1, []
+        while len(candidates) <= neighbors and ring < 64:
+            candidates = [j for r in range(row - ring, row + ring + 1) for c in range(column - ring, column + ring + 1)
+                          for j in grid.get((r, c), ()) if j != i]
+            ring += 1
+        candidates.sort(key=lambda j: (points[j][0] - lat) ** 2 + (points[j][1] - lon) ** 2)
+        routes.extend(_route(rng, points, i, j) for j in candidates[:neighbors])
+    return _airport_rows(points), routes
+
+
+def network_from_spec(graph, spec):
+    # Insertar una especificación con la API masiva; devuelve los códigos asignados
+    airports, routes = spec
+    codes = graph.add_airports(airports)
+    graph.add_routes((codes[i], codes[j], distance, flight_time) for i, j, distance, flight_time in routes)
+    return codes
+
+
+def geographic_network(graph, airports, neighbors=4, seed=0, bounds=DEFAULT_BOUNDS):
+    return network_from_spec(graph, geographic_spec(airports, neighbors, seed, bounds))
+
+
+def measure_build(graph_class, airports, routes, seed):
+    # Medir tiempo y memoria máxima de la construcción de la red
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = graph_class()
+    codes = random_network(graph, airports, routes, seed)
+    if isinstance(graph, CompactGraph):
+        graph._build_csr()
+    elapsed = time.perf_counter() - start
+    # Memoria retenida por la red ya construida y pico durante la construcción
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph, codes, elapsed, current, peak
+
+
+def double_dijkstra(graph, source, destination, weight):
+    # Comportamiento anterior: una ejecución para la ruta y otra para la longitud
+    try:
+        path = nx.dijkstra_path(graph.graph, source, destination, weight=weight)
+        length = nx.dijkstra_path_length(graph.graph, source, destination, weight=weight)
+        return path, length
+    except nx.NetworkXNoPath:
+        return None
+
+
+def measure_queries(query, pairs):
+    start = time.perf_counter()
+    for source, destination in pairs:
+        query(source, destination)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def compare_backends(airports, routes, queries, seed=0):
+    graph, codes, nx_build, nx_memory, nx_peak = measure_build(Graph, airports, routes, seed)
+    compact, _, compact_build, compact_memory, compact_peak = measure_build(CompactGraph, airports, routes, seed)
+    rng = random.Random(seed + 1)
+    pairs = [(rng.choice(codes), rng.choice(codes)) for _ in range(queries)]
+
+    # Ambos motores deben devolver el mismo costo para cada consulta
+    for source, destination in pairs:
+        expected = graph.get_shortest_path_dis(source, destination)
+        result = compact.get_shortest_path_dis(source, destination)
+        assert (expected is None) == (result is None)
+        assert expected is None or abs(expected[1] - result[1]) < 1e-6
+
+    print(f"Red: {airports} aeropuertos, {routes} rutas, {queries} consultas")
+    print(f"{'motor':<28}{'construcción (s)':>18}{'memoria (MB)':>14}{'pico (MB)':>12}{'consulta (ms)':>16}")
+    rows = [
+        ("NetworkX (doble Dijkstra)", nx_build, nx_memory, nx_peak,
+         measure_queries(lambda s, d: double_dijkstra(graph, s, d, 'distance'), pairs)),
+        ("NetworkX (una pasada)", nx_build, nx_memory, nx_peak,
+         measure_queries(lambda s, d: graph._compute_shortest_path(s, d, 'distance'), pairs)),
+        ("CompactGraph (CSR)", compact_build, compact_memory, compact_peak,
+         measure_queries(lambda s, d: compact._compute_shortest_path(s, d, 'distance'), pairs)),
+        # Las consultas ya se hicieron una vez al verificar los costos: todas aciertan en la caché
+        ("NetworkX (con caché)", nx_build, nx_memory, nx_peak,
+         measure_queries(graph.get_shortest_path_dis, pairs)),
+    ]
+    for name, build, memory, peak, latency in rows:
+        print(f"{name:<28}{build:>18.3f}{memory / 2 ** 20:>14.1f}{peak / 2 ** 20:>12.1f}{latency * 1000:>16.3f}")
+    print(f"Caché de rutas: {graph.path_cache.stats()}")
+
+
+def compare_batch(airports, routes, origins, destinations, seed=0):
+    # Comparar consultas individuales contra la API por lotes con distinto número de procesos
+    graph = CompactGraph()
+    codes = random_network(graph, airports, routes, seed)
+    rng = random.Random(seed + 1)
+    sources = rng.sample(codes, origins)
+    targets = rng.sample(codes, destinations)
+
+    start = time.perf_counter()
+    for source in sources:
+        for destination in targets:
+            graph._compute_shortest_path(source, destination, 'distance')
+    single = time.perf_counter() - start
+    print(f"Matriz {origins}x{destinations} sobre {airports} aeropuertos y {routes} rutas")
+    print(f"{'modo':<28}{'tiempo (s)':>12}{'aceleración':>14}")
+    print(f"{'consultas individuales':<28}{single:>12.3f}{1.0:>14.2f}")
+
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        graph.batch_shortest_paths(origins=sources, destinations=targets, processes=processes, min_parallel=1)
+        elapsed = time.perf_counter() - start
+        print(f"{f'lotes, {processes} proceso(s)':<28}{elapsed:>12.3f}{single / elapsed:>14.2f}")
+        processes *= 2
+
+
+def compare_astar(airports, queries, seed=0, landmarks=8):
+    # Nodos asentados y latencia de A* y ALT frente a Dijkstra sobre las mismas consultas
+    graph = CompactGraph()
+    codes = geographic_network(graph, airports, seed=seed)
+    graph.to_compact()
+    start = time.perf_counter()
+    graph.preprocess_landmarks(landmarks)
+    print(f"Preprocesamiento ALT ({landmarks} landmarks): {time.perf_counter() - start:.2f} s")
+    rng = random.Random(seed + 1)
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+    print(f"Red geográfica: {airports} aeropuertos, {graph.number_of_routes()} rutas, {queries} consultas")
+    print(f"{'peso':<14}{'método':<10}{'asentados (media)':>20}{'consulta (ms)':>16}")
+    for weight in ('distance', 'flight_time'):
+        for method, heuristic in (('dijkstra', None), ('astar', 'geo'), ('alt', 'alt')):
+            settled = 0
+            costs = []
+            start = time.perf_counter()
+            for source, destination in pairs:
+                result, work = graph._astar_search(source, destination, weight, heuristic, graph.landmarks)
+                settled += work
+                costs.append(result and result[1])
+            latency = (time.perf_counter() - start) / queries
+            if method == 'dijkstra':
+                expected = costs
+            else:
+                assert all(a is None and b is None or abs(a - b) < 1e-6 for a, b in zip(expected, costs))
+            print(f"{weight:<14}{method:<10}{settled / queries:>20.1f}{latency * 1000:>16.3f}")
+
+
+def compare_pareto(airports, queries, seed=0, alternatives=5):
+    # Frente de Pareto en una búsqueda frente a las dos búsquedas de un solo criterio, y k rutas (Yen)
+    graph = CompactGraph()
+    codes = geographic_network(graph, airports, seed=seed)
+    graph.to_compact()
+    rng = random.Random(seed + 1)
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+    print(f"Red geográfica: {airports} aeropuertos, {graph.number_of_routes()} rutas, {queries} consultas")
+    timings = {}
+    fronts = []
+    for label, search in (("distancia + tiempo", lambda s, t: (graph._compute_shortest_path(s, t, 'distance'),
+                                                               graph._compute_shortest_path(s, t, 'flight_time'))),
+                          ("pareto", lambda s, t: fronts.append(len(graph._pareto_search(s, t, PARETO_MAX_LABELS)))),
+                          ("pareto exacto", lambda s, t: graph._pareto_search(s, t, None)),
+                          (f"yen k={alternatives}", lambda s, t: graph._k_shortest_search(s, t, alternatives, 'distance'))):
+        latencies = []
+        for source, destination in pairs:
+            start = time.perf_counter()
+            search(source, destination)
+            latencies.append(time.perf_counter() - start)
+        timings[label] = latency_summary(latencies)
+    print(f"Rutas en el frente de Pareto: media {sum(fronts) / len(fronts):.1f}, máximo {max(fronts)}")
+    print(f"{'búsqueda':<22}{'p50 (ms)':>10}{'p90 (ms)':>10}{'p99 (ms)':>10}")
+    for label, summary in timings.items():
+        print(f"{label:<22}{summary['p50_ms']:>10.2f}{summary['p90_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+
+
+def compare_dynamic(airports, updates, seed=0, hubs=4):
+    # Reparación de los árboles de los hubs frente a recalcularlos tras cada cambio de pesos
+    graph = CompactGraph()
+    codes = geographic_network(graph, airports, seed=seed)
+    compact = graph.to_compact()
+    rng = random.Random(seed + 1)
+    hub_codes = sorted(codes, key=lambda code: len(graph.neighbors(code)), reverse=True)[:hubs]
+    start = time.perf_counter()
+    trees = graph.track_hubs(hub_codes)
+    print(f"Red geográfica: {airports} aeropuertos, {graph.number_of_routes()} rutas, {hubs} hubs "
+          f"({time.perf_counter() - start:.2f} s para los árboles iniciales)")
+    routes = list(graph.iter_routes())
+    repair = []
+    for _ in range(updates):
+        source, destination, distance, flight_time = rng.choice(routes)
+        # Retrasos y desvíos: la mayoría de los cambios encarecen la ruta, algunos la abaratan
+        factor = rng.choice((0.7, 0.9, 1.2, 1.5, 2.0))
+        start = time.perf_counter()
+        graph.update_route(source, destination, distance * factor, flight_time * factor)
+        repair.append(time.perf_counter() - start)
+    recompute = []
+    for hub in hub_codes[:2]:
+        for weight in WEIGHTS:
+            start = time.perf_counter()
+            dist, _ = compact._compute_shortest_path_tree(hub, weight)
+            recompute.append(time.perf_counter() - start)
+            repaired, _ = graph.get_shortest_path_tree(hub, weight)
+            assert dist.keys() == repaired.keys() and all(abs(dist[code] - repaired[code]) < 1e-6 for code in dist)
+    stats = trees.stats()
+    per_tree = stats['recompute_cost'] / (updates * len(trees.trees))
+    print(f"{updates} cambios: reparación {sum(repair) / updates * 1000:.2f} ms por cambio ({len(trees.trees)} árboles), "
+          f"recálculo {sum(recompute) / len(recompute) * len(trees.trees) * 1000:.2f} ms")
+    print(f"Aeropuertos tocados: {stats['touched']} de {stats['recompute_cost']} "
+          f"({stats['touched_ratio'] * 100:.2f} %, {per_tree:.0f} alcanzables por árbol)")
+
+
+def timetable_flights(graph, flights, seed=0):
+    # Horario sintético de un día: cada vuelo usa una ruta al azar en un sentido al azar con
+    # salida entre las 05:00 y las 23:00; la llegada sale del tiempo de vuelo de la ruta
+    rng = random.Random(seed)
+    routes = list(graph.iter_routes())
+    for number in range(flights):
+        source, destination, _, _ = rng.choice(routes)
+        if rng.random() < 0.5:
+            source, destination = destination, source
+        yield source, destination, rng.uniform(300, 1380), None, f"V{number}"
+
+
+def compare_timetable(airports, flights, queries, seed=0):
+    # Consultas Connection Scan sobre el horario de un día completo
+    graph = CompactGraph()
+    codes = geographic_network(graph, airports, seed=seed)
+    timetable = graph.timetable
+    start = time.perf_counter()
+    timetable.add_flights(timetable_flights(graph, flights, seed))
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    timetable._build()
+    print(f"Red geográfica: {airports} aeropuertos, {flights} vuelos "
+          f"(carga {loaded:.2f} s, ordenación {time.perf_counter() - start:.2f} s)")
+    rng = random.Random(seed + 1)
+    # Destinos a pocas escalas del origen, para que la mayoría de las consultas tenga itinerario
+    pairs = []
+    for _ in range(queries):
+        source = destination = rng.choice(codes)
+        for _ in range(rng.randint(1, 4)):
+            destination = rng.choice(graph.neighbors(destination) or [destination])
+        pairs.append((source, destination, rng.uniform(300, 720)))
+    found = 0
+    latencies = {"llegada más temprana": [], "perfil del día": []}
+    for source, destination, departure in pairs:
+        start = time.perf_counter()
+        found += timetable.earliest_arrival(source, destination, departure) is not None
+        latencies["llegada más temprana"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        timetable.profile(source, destination, departure)
+        latencies["perfil del día"].append(time.perf_counter() - start)
+    print(f"{found} de {queries} consultas con itinerario")
+    print(f"{'consulta':<24}{'p50 (ms)':>10}{'p90 (ms)':>10}{'p99 (ms)':>10}")
+    for label, values in latencies.items():
+        summary = latency_summary(values)
+        print(f"{label:<24}{summary['p50_ms']:>10.2f}{summary['p90_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+
+
+def percentile(values, fraction):
+    # Percentil por el método del rango más cercano sobre una lista ordenada
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure_cold_start():
+    # Tiempo de importación en un proceso nuevo: solo el motor frente al motor con la interfaz
+    for label, code in (("import Proyecto2", "import Proyecto2"),
+                        ("import Proyecto2, interfaz", "import Proyecto2, interfaz")):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=HERE)
+        print(f"{label:<32}{(time.perf_counter() - start) * 1000:>10.0f} ms")
+
+
+async def run_clients(port, clients, pairs, weight='distance'):
+    # Cada cliente abre su conexión y envía sus consultas una tras otra
+    latencies = []
+
+    async def client(chunk):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for source, destination in chunk:
+            start = time.perf_counter()
+            request = {'op': 'shortest_path', 'source': source, 'destination': destination, 'weight': weight}
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            assert response['ok'], response
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(pairs[i::clients]) for i in range(clients)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+async def request_stats(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'{"op": "stats"}\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+def compare_server(airports, routes, queries, clients, seed=0):
+    # Arranque en frío y consultas por segundo del servidor con 1 y con N clientes concurrentes.
+    # El servidor corre en otro proceso con la red cargada desde una instantánea.
+    graph = Graph()
+    codes = random_network(graph, airports, routes, seed)
+    measure_cold_start()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "red.rutas")
+        graph.save_snapshot(path)
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(HERE, "servidor.py"), "--puerto", "0", "--red", path],
+                                   stdout=subprocess.PIPE, text=True)
+        try:
+            line = process.stdout.readline()
+            print(f"{'servidor listo':<32}{(time.perf_counter() - start) * 1000:>10.0f} ms  ({line.strip()})")
+            port = int(line.split()[3].rsplit(':', 1)[1])
+            rng = random.Random(seed + 1)
+            print(f"{'clientes':<10}{'consultas/s':>14}{'p50 (ms)':>12}{'p99 (ms)':>12}{'por lote':>10}")
+            batches = 0
+            for concurrency in sorted({1, clients}):
+                # Pares nuevos en cada ronda para no medir la caché de la ronda anterior
+                pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+                elapsed, latencies = asyncio.run(run_clients(port, concurrency, pairs))
+                stats = asyncio.run(request_stats(port))
+                print(f"{concurrency:<10}{queries / elapsed:>14.0f}{percentile(latencies, 0.5) * 1000:>12.2f}"
+                      f"{percentile(latencies, 0.99) * 1000:>12.2f}{queries / (stats['batches'] - batches):>10.1f}")
+                batches = stats['batches']
+        finally:
+            process.terminate()
+            process.wait()
+
+
+GENERATORS = {
+    'hub': hub_and_spoke_spec,
+    'scale-free': scale_free_spec,
+    'geographic': geographic_spec,
+}
+
+
+def latency_summary(latencies):
+    # Resumen en milisegundos de una lista de latencias en segundos
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p90_ms': percentile(latencies, 0.9) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def timed_calls(function, arguments):
+    latencies = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def build_by_call(graph_class, spec):
+    # Inserción de uno en uno con add_airport y add_route, como desde la interfaz
+    airports, routes = spec
+    graph = graph_class()
+    start = time.perf_counter()
+    codes = [graph.add_airport(*airport) for airport in airports]
+    airport_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for i, j, distance, flight_time in routes:
+        graph.add_route(codes[i], codes[j], distance, flight_time)
+    route_time = time.perf_counter() - start
+    return graph, codes, airport_time, route_time
+
+
+def build_bulk(graph_class, spec):
+    airports, routes = spec
+    graph = graph_class()
+    start = time.perf_counter()
+    codes = graph.add_airports(airports)
+    airport_time = time.perf_counter() - start
+    start = time.perf_counter()
+    graph.add_routes((codes[i], codes[j], distance, flight_time) for i, j, distance, flight_time in routes)
+    route_time = time.perf_counter() - start
+    return airport_time, route_time
+
+
+def traced_build(graph_class, spec):
+    # Memoria retenida por la red construida y pico durante la construcción (aparte de la
+    # especificación), en una construcción propia porque tracemalloc ralentiza la inserción
+    tracemalloc.start()
+    graph = graph_class()
+    network_from_spec(graph, spec)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def measure_drawing(graph):
+    # Costo de update_graph: disposición (primera vez y tras añadir un aeropuerto) y dibujo
+    # completo de la vista con el backend Agg, sin pantalla
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from interfaz import NetworkView, network_snapshot
+
+    result = {}
+    start = time.perf_counter()
+    positions = graph.get_layout()
+    result['layout_s'] = time.perf_counter() - start
+    code = graph.add_airport("Aeropuerto nuevo", "Ciudad nueva")
+    graph.add_route(code, next(iter(positions)), 100.0, 0.6)
+    start = time.perf_counter()
+    graph.get_layout()
+    result['layout_incremental_s'] = time.perf_counter() - start
+    # Copia de posiciones y rutas que update_graph entrega al hilo de la interfaz
+    start = time.perf_counter()
+    snapshot = network_snapshot(graph)
+    result['snapshot_s'] = time.perf_counter() - start
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    start = time.perf_counter()
+    NetworkView(figure, 'distance', snapshot)
+    figure.canvas.draw()
+    result['render_s'] = time.perf_counter() - start
+    return result
+
+
+def run_scenario(generator, airports, graph_class, queries, seed=0, drawing=True):
+    # Medir los caminos calientes sobre una red generada y devolver las métricas como diccionario
+    start = time.perf_counter()
+    spec = GENERATORS[generator](airports, seed=seed)
+    result = {'generator': generator, 'airports': airports, 'routes': len(spec[1]),
+              'backend': graph_class.__name__, 'seed': seed, 'generate_s': time.perf_counter() - start}
+
+    airport_time, route_time = build_bulk(graph_class, spec)
+    result['bulk_airports_per_s'] = airports / airport_time
+    result['bulk_routes_per_s'] = len(spec[1]) / route_time
+    result['memory_mb'], result['peak_memory_mb'] = (value / 2 ** 20 for value in traced_build(graph_class, spec))
+    graph, codes, airport_time, route_time = build_by_call(graph_class, spec)
+    result['airports_per_s'] = airports / airport_time
+    result['routes_per_s'] = len(spec[1]) / route_time
+    del spec
+
+    rng = random.Random(seed + 1)
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+    # Pares distintos: la primera pasada calcula y la segunda acierta en la caché
+    result['shortest_path_dis'] = timed_calls(graph.get_shortest_path_dis, pairs)
+    result['shortest_path_dis_cached'] = timed_calls(graph.get_shortest_path_dis, pairs)
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(queries)]
+    result['shortest_path'] = timed_calls(graph.get_shortest_path, pairs)
+
+    # Comprobación de nombre duplicado de save_airport: nombres existentes y nuevos
+    names = [(f"Aeropuerto {rng.randrange(airports)}",) for _ in range(queries)]
+    names += [(f"Aeropuerto nuevo {i}",) for i in range(queries)]
+    result['duplicate_name_check'] = timed_calls(graph.has_airport_name, names)
+    result['airports_list'] = timed_calls(graph.get_airports_list, [()] * 3)
+    if drawing:
+        result.update(measure_drawing(graph))
+    return result
+
+
+def run_suite(generators, sizes, graph_class, queries, seed=0, drawing=True, output=None):
+    results = []
+    for airports in sizes:
+        for generator in generators:
+            result = run_scenario(generator, airports, graph_class, queries, seed, drawing)
+            results.append(result)
+            print(f"{generator:<12}{airports:>9}{result['routes']:>10}"
+                  f"{result['airports_per_s']:>14.0f}{result['routes_per_s']:>12.0f}"
+                  f"{result['shortest_path_dis']['p50_ms']:>10.2f}{result['shortest_path_dis']['p99_ms']:>10.2f}"
+                  f"{result['peak_memory_mb']:>11.1f}", flush=True)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': git_commit(),
+        # Pico de memoria residente del proceso completo (ru_maxrss está en KiB en Linux)
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten_metrics(result, prefix=''):
+    for key, value in result.items():
+        if isinstance(value, dict):
+            yield from flatten_metrics(value, f"{prefix}{key}.")
+        elif isinstance(value, float):
+            yield prefix + key, value
+
+
+def compare_reports(old_path, report, threshold=0.1):
+    # Mostrar las métricas que cambian más de un 10 % respecto a un informe anterior
+    with open(old_path, encoding='utf-8') as handle:
+        old = json.load(handle)
+    previous = {(r['generator'], r['airports'], r['backend']): r for r in old['results']}
+    for result in report['results']:
+        key = (result['generator'], result['airports'], result['backend'])
+        if key not in previous:
+            continue
+        before = dict(flatten_metrics(previous[key]))
+        for name, value in flatten_metrics(result):
+            if before.get(name) and abs(value / before[name] - 1) > threshold:
+                print(f"{key[0]:<12}{key[1]:>9}  {name:<36}{before[name]:>14.3f}{value:>14.3f}"
+                      f"{(value / before[name] - 1) * 100:>+9.0f} %")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Medir el rendimiento de los motores de rutas")
+    parser.add_argument("--airports", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, metavar="N",
+                        help="medir la API por lotes con una matriz de N orígenes por N destinos")
+    parser.add_argument("--astar", action="store_true",
+                        help="comparar A* y ALT con Dijkstra sobre una red geográfica")
+    parser.add_argument("--pareto", action="store_true",
+                        help="medir el frente de Pareto y las rutas alternativas sobre una red geográfica")
+    parser.add_argument("--dinamico", type=int, metavar="CAMBIOS",
+                        help="medir la reparación de los árboles de los hubs con CAMBIOS de pesos")
+    parser.add_argument("--horario", type=int, metavar="VUELOS",
+                        help="medir las consultas Connection Scan sobre un horario de VUELOS vuelos")
+    parser.add_argument("--servidor", type=int, metavar="CLIENTES",
+                        help="medir arranque en frío y consultas por segundo del servidor con CLIENTES concurrentes")
+    parser.add_argument("--suite", action="store_true",
+                        help="medir los caminos calientes sobre redes sintéticas de varios tamaños")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="tamaños (aeropuertos) de la suite separados por comas, hasta 1000000")
+    parser.add_argument("--generators", default=",".join(GENERATORS),
+                        help=f"generadores de la suite: {', '.join(GENERATORS)}")
+    parser.add_argument("--backend", choices=("networkx", "compact"), default="networkx")
+    parser.add_argument("--no-drawing", action="store_true", help="no medir la disposición ni el dibujo")
+    parser.add_argument("--json", metavar="FICHERO", help="guardar los resultados de la suite en JSON")
+    parser.add_argument("--compare", metavar="FICHERO", help="comparar la suite con un JSON anterior")
+    args = parser.parse_args()
+    if args.suite:
+        print(f"{'generador':<12}{'aerop.':>9}{'rutas':>10}{'aerop./s':>14}{'rutas/s':>12}"
+              f"{'p50 (ms)':>10}{'p99 (ms)':>10}{'pico (MB)':>11}")
+        report = run_suite(args.generators.split(","), [int(size) for size in args.sizes.split(",")],
+                           CompactGraph if args.backend == "compact" else Graph, args.queries, args.seed,
+                           not args.no_drawing, args.json)
+        if args.compare:
+            compare_reports(args.compare, report)
+    elif args.servidor:
+        compare_server(args.airports, args.routes, args.queries, args.servidor, args.seed)
+    elif args.horario:
+        compare_timetable(args.airports, args.horario, args.queries, args.seed)
+    elif args.dinamico:
+        compare_dynamic(args.airports, args.dinamico, args.seed)
+    elif args.pareto:
+        compare_pareto(args.airports, args.queries, args.seed)
+    elif args.astar:
+        compare_astar(args.airports, args.queries, args.seed)
+    elif args.batch:
+        compare_batch(args.airports, args.routes, args.batch, args.batch, args.seed)
+    else:
+        compare_backends(args.airports, args.routes, args.queries, args.seed)
@@ -0,0 +1,1006 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+import networkx as nx
+
+from Proyecto2 import BulkLoader, Graph, Metrics, QueryProfiler, _format_clock, _parse_clock, _parse_coordinates
+
+# Variables de entorno que activan la instrumentación y el perfilado de consultas lentas (ms)
+METRICS_ENV = "PROYECTO2_METRICAS"
+PROFILE_ENV = "PROYECTO2_PERFIL_MS"
+# Trabajos simultáneos en segundo plano y frecuencia (ms) con la que la interfaz los revisa
+MAX_BACKGROUND_TASKS = 2
+TASK_POLL_INTERVAL = 50
+# Límites del nivel de detalle al dibujar la red
+MAX_DRAWN_EDGES = 3000
+MAX_EDGE_LABELS = 150
+MAX_NODE_LABELS = 150
+CLUSTER_THRESHOLD = 1500
+CLUSTER_GRID = 40
+# Número de rutas que muestra la búsqueda de rutas alternativas
+ALTERNATIVE_ROUTES = 5
+# Salidas alternativas del perfil que se muestran junto a un itinerario
+PROFILE_DEPARTURES = 10
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+    # Trabajo en segundo plano. La función recibe la tarea como primer argumento: puede
+    # publicar su avance con report() y dejar de trabajar si la tarea se cancela.
+    def __init__(self, key, description, function, args, on_done, on_error):
+        self.key = key
+        self.description = description
+        self.function = function
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.progress = None
+        self.future = None
+        self.started = None
+        self.elapsed = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, progress):
+        self.check()
+        self.progress = progress
+
+    def check(self):
+        # Las búsquedas largas lo llaman periódicamente para abandonar el trabajo cancelado
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def run(self):
+        self.check()
+        return self.function(self, *self.args)
+
+
+class TaskScheduler:
+    # Planificador de trabajos para la interfaz: los trabajos se ejecutan en un grupo de hilos
+    # con un máximo de trabajos simultáneos y los resultados se entregan en el hilo de Tk
+    # revisando periódicamente con after(). Enviar un trabajo con la misma clave que otro
+    # pendiente cancela el anterior; el resultado de un trabajo cancelado se descarta.
+    def __init__(self, widget, max_workers=MAX_BACKGROUND_TASKS, poll_interval=TASK_POLL_INTERVAL,
+                 on_status=None):
+        self.widget = widget
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.on_status = on_status
+        self.last = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rutas")
+        self._queued = deque()
+        self._running = []
+        self._poll_id = None
+
+    def submit(self, description, function, *args, key=None, on_done=None, on_error=None):
+        if key is not None:
+            self.cancel(key)
+        task = Task(key, description, function, args, on_done, on_error)
+        self._queued.append(task)
+        self._start_queued()
+        self._schedule_poll()
+        return task
+
+    def cancel(self, key=None):
+        # Cancelar los trabajos con esa clave, o todos si no se indica ninguna
+        for task in [task for task in self._queued if key is None or task.key == key]:
+            task.cancel()
+            self._queued.remove(task)
+        for task in self._running:
+            if key is None or task.key == key:
+                task.cancel()
+
+    def busy(self):
+        return bool(self._queued or self._running)
+
+    def shutdown(self):
+        self.cancel()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start_queued(self):
+        # Un trabajo cancelado sigue ocupando su hilo hasta que termina, así que cuenta para el tope
+        while self._queued and len(self._running) < self.max_workers:
+            task = self._queued.popleft()
+            task.started = time.perf_counter()
+            task.future = self._executor.submit(task.run)
+            self._running.append(task)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        finished = [task for task in self._running if task.future.done()]
+        now = time.perf_counter()
+        for task in finished:
+            self._running.remove(task)
+            task.elapsed = now - task.started
+        self._start_queued()
+        if self.busy():
+            self._schedule_poll()
+        # Las respuestas pueden abrir diálogos modales, que vuelven a procesar eventos:
+        # la revisión siguiente ya está programada y las tareas entregadas ya no están en curso
+        for task in finished:
+            if task.cancelled or task.future.cancelled():
+                continue
+            error = task.future.exception()
+            if isinstance(error, TaskCancelled):
+                continue
+            self.last = (task.description, task.elapsed)
+            if error is None:
+                if task.on_done is not None:
+                    task.on_done(task.future.result())
+            elif task.on_error is not None:
+                task.on_error(error)
+            else:
+                self.widget.report_callback_exception(type(error), error, error.__traceback__)
+        self._update_status()
+
+    def _update_status(self):
+        if self.on_status is None:
+            return
+        if self._running:
+            now = time.perf_counter()
+            parts = []
+            for task in self._running:
+                if task.cancelled:
+                    continue
+                text = f"{task.description}... {now - task.started:.1f} s"
+                if task.progress is not None:
+                    text += f" ({task.progress})"
+                parts.append(text)
+            if self._queued:
+                parts.append(f"{len(self._queued)} en cola")
+            self.on_status(" | ".join(parts) or "Cancelando...", True)
+        elif self.last is not None:
+            description, elapsed = self.last
+            self.on_status(f"{description}: {elapsed * 1000:.0f} ms", False)
+        else:
+            self.on_status("Listo", False)
+
+
+def network_snapshot(graph, node_labels=False):
+    # Datos para dibujar la red, copiados para poder calcularlos fuera del hilo de la interfaz:
+    # posiciones, rutas (origen, destino, distancia, tiempo) y etiquetas de los aeropuertos
+    positions = dict(graph.get_layout())
+    routes = list(graph.iter_routes())
+    if node_labels:
+        labels = {code: name for code, name, *_ in graph._iter_airports()}
+    else:
+        labels = {code: str(code) for code in positions}
+    return positions, routes, labels
+
+
+class NetworkView:
+    # Dibujo de la red sobre una figura con nivel de detalle: las rutas se dibujan en una sola
+    # colección, se diezman si son demasiadas, las etiquetas solo aparecen cuando hay pocos
+    # elementos a la vista y, con muchos aeropuertos visibles, se agrupan por celdas. Al hacer
+    # zoom o desplazar la vista se vuelve a dibujar solo lo que queda dentro de los límites.
+    # Los datos salen de network_snapshot, así que dibujar no vuelve a consultar el grafo.
+    def __init__(self, figure, weight, snapshot):
+        self.figure = figure
+        self.weight = weight
+        self.ax = figure.add_subplot(111)
+        self.ax.set_axis_off()
+        self._artists = []
+        self._limits = None
+        self._connection = figure.canvas.mpl_connect('draw_event', self._on_draw)
+        self.show(snapshot)
+
+    def disconnect(self):
+        self.figure.canvas.mpl_disconnect(self._connection)
+
+    def show(self, snapshot):
+        # Cambiar los datos dibujados y encuadrar toda la red
+        self.positions, self.routes, self.labels = snapshot
+        if self.positions:
+            xs = [x for x, _ in self.positions.values()]
+            ys = [y for _, y in self.positions.values()]
+            margin = max(max(xs) - min(xs), max(ys) - min(ys), 1e-3) * 0.05
+            self.ax.set_xlim(min(xs) - margin, max(xs) + margin)
+            self.ax.set_ylim(min(ys) - margin, max(ys) + margin)
+        self.render()
+
+    def _on_draw(self, event):
+        # Tras un zoom o desplazamiento los límites cambian y se vuelve a dibujar el detalle
+        if self._current_limits() != self._limits:
+            self.render()
+            self.figure.canvas.draw_idle()
+
+    def _current_limits(self):
+        return tuple(self.ax.get_xlim()) + tuple(self.ax.get_ylim())
+
+    def render(self):
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+        self._limits = self._current_limits()
+        x0, x1, y0, y1 = self._limits
+        positions = self.positions
+        visible = [code for code, (x, y) in positions.items() if x0 <= x <= x1 and y0 <= y <= y1]
+        if len(visible) > CLUSTER_THRESHOLD:
+            self._render_clusters(visible)
+        else:
+            self._render_detail(set(visible))
+
+    def _render_detail(self, visible):
+        positions = self.positions
+        routes = [route for route in self.routes if route[0] in visible or route[1] in visible]
+        drawn = routes
+        if len(drawn) > MAX_DRAWN_EDGES:
+            # Diezmado uniforme para acotar el número de segmentos dibujados
+            drawn = drawn[::len(drawn) // MAX_DRAWN_EDGES + 1]
+        segments = [(positions[source], positions[destination]) for source, destination, _, _ in drawn]
+        self._add(self.ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.8, zorder=1)))
+        if routes and len(routes) <= MAX_EDGE_LABELS:
+            column = 2 if self.weight == 'distance' else 3
+            for route in routes:
+                (xa, ya), (xb, yb) = positions[route[0]], positions[route[1]]
+                self._add(self.ax.text((xa + xb) / 2, (ya + yb) / 2, f"{route[column]:g}", fontsize=8,
+                                       ha='center', va='center', zorder=3,
+                                       bbox=dict(boxstyle='round', fc='white', ec='none', alpha=0.8)))
+        codes = list(visible)
+        size = 800 if len(codes) <= 30 else max(10, 24000 / len(codes))
+        if codes:
+            self._add(self.ax.scatter([positions[code][0] for code in codes], [positions[code][1] for code in codes],
+                                      s=size, c='skyblue', zorder=2))
+        if len(codes) <= MAX_NODE_LABELS:
+            for code in codes:
+                self._add(self.ax.text(*positions[code], self.labels[code], fontsize=9, ha='center', va='center',
+                                       zorder=4))
+
+    def _render_clusters(self, visible):
+        # Agrupar los aeropuertos visibles en una rejilla: un punto por celda, con tamaño
+        # según el número de aeropuertos, y una línea por par de celdas conectadas
+        x0, x1, y0, y1 = self._limits
+        width = (x1 - x0) / CLUSTER_GRID or 1.0
+        height = (y1 - y0) / CLUSTER_GRID or 1.0
+        cell_of = {}
+        cells = {}
+        for code in visible:
+            x, y = self.positions[code]
+            cell = (int((x - x0) / width), int((y - y0) / height))
+            cell_of[code] = cell
+            sx, sy, count = cells.get(cell, (0.0, 0.0, 0))
+            cells[cell] = (sx + x, sy + y, count + 1)
+        centers = {cell: (sx / count, sy / count) for cell, (sx, sy, count) in cells.items()}
+        links = set()
+        for source, destination, _, _ in self.routes:
+            a, b = cell_of.get(source), cell_of.get(destination)
+            if a is not None and b is not None and a != b:
+                links.add((a, b) if a < b else (b, a))
+                if len(links) >= MAX_DRAWN_EDGES:
+                    break
+        segments = [(centers[a], centers[b]) for a, b in links]
+        self._add(self.ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.5, zorder=1)))
+        self._add(self.ax.scatter([center[0] for center in centers.values()], [center[1] for center in centers.values()],
+                                  s=[10 + 4 * cells[cell][2] ** 0.5 * 10 for cell in centers], c='skyblue',
+                                  alpha=0.8, zorder=2))
+
+    def _add(self, artist):
+        self._artists.append(artist)
+        return artist
+
+
+class Application(tk.Tk):
+    def __init__(self):
+        # Inicialización de la aplicación y configuración de la ventana principal
+        super().__init__()
+
+        self.title("Gestión de Rutas Aéreas")
+        self.geometry("800x580")
+        self.configure(bg="#FFFFFF")
+
+        # Inicialización de la instancia de la clase Graph
+        self.graph = Graph()
+        # Cargador masivo: conserva la correspondencia de códigos externos entre importaciones
+        self.loader = BulkLoader(self.graph)
+        # Instrumentación opcional del grafo y de los redibujados
+        self.metrics = None
+        if os.environ.get(METRICS_ENV) or os.environ.get(PROFILE_ENV):
+            threshold = os.environ.get(PROFILE_ENV)
+            profiler = QueryProfiler(float(threshold) / 1000) if threshold else None
+            self.metrics = self.graph.enable_metrics(Metrics(profiler=profiler))
+        # Los trabajos pesados van a segundo plano; el cerrojo da a cada uno acceso exclusivo al grafo
+        self.graph_lock = threading.RLock()
+        self.scheduler = TaskScheduler(self, on_status=self.show_status)
+
+        # Creación de widgets en la ventana principal
+        self.create_widgets()
+
+        # Barra de estado con el trabajo en curso y la duración del último
+        status_frame = tk.Frame(self, bg="#FFFFFF")
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.progress_bar = ttk.Progressbar(status_frame, mode="indeterminate", length=120)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5, pady=2)
+        self.status_label = tk.Label(status_frame, text="Listo", bg="#FFFFFF", anchor="w")
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        # Configuración del lienzo para visualizar el grafo
+        self.figure = plt.figure(figsize=(10, 6))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
+        # Vista de la red en el lienzo principal; se crea con el primer dibujo
+        self.main_view = None
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        self.scheduler.shutdown()
+        self.destroy()
+
+    def run_graph_task(self, description, function, *args, key=None, on_done=None, on_error=None):
+        # Ejecutar function(task, graph, *args) en segundo plano con acceso exclusivo al grafo actual
+        graph = self.graph
+
+        def job(task):
+            with self.graph_lock:
+                task.check()
+                return function(task, graph, *args)
+
+        return self.scheduler.submit(description, job, key=key, on_done=on_done,
+                                     on_error=on_error or self.show_task_error)
+
+    def show_task_error(self, error):
+        messagebox.showerror("Error", str(error))
+
+    def show_status(self, text, busy):
+        self.status_label.config(text=text)
+        if busy:
+            self.progress_bar.start(10)
+        else:
+            self.progress_bar.stop()
+
+    def create_widgets(self):
+        # Creación de widgets en la ventana principal
+
+        # Título
+        title_label = tk.Label(self, text="      RUTAS AÉREAS      ", bg="#E4F4FD", fg="black", font=("Helvetica", 16, "bold"))
+        title_label.pack(pady=10)
+
+        # Cuadro de color azul claro
+        frame = tk.Frame(self, bg="lightblue", bd=1, relief="solid", padx=25, pady=25)
+        frame.pack()
+
+        # Botones dentro del cuadro
+        button_width = 20  # Ancho deseado para los botones
+
+        airport_button = tk.Button(frame, text="Registrar Aeropuerto", bg="#E4F4FD", command=self.register_airport, width=button_width)
+        airport_button.pack(pady=5)
+
+        route_button = tk.Button(frame, text="Crear Ruta", bg="#E4F4FD", command=self.create_route, width=button_width)
+        route_button.pack(pady=5)
+
+        edit_button = tk.Button(frame, text="Editar Ruta", bg="#E4F4FD", command=self.edit_route, width=button_width)
+        edit_button.pack(pady=5)
+
+        visualize_button = tk.Button(frame, text="Visualizar Rutas por Distancia", bg="#E4F4FD", command=self.visualize_routes, width=button_width)
+        visualize_button.pack(pady=5)
+
+        visualize_time_routes_button = tk.Button(frame, text="Visualizar Rutas por Tiempo", bg="#E4F4FD", command=self.visualize_time_routes, width=button_width)
+        visualize_time_routes_button.pack(pady=5)
+
+
+        airports_button = tk.Button(frame, text="Lista de Aeropuertos", bg="#E4F4FD", command=self.display_airports, width=button_width)
+        airports_button.pack(pady=5)
+
+        import_button = tk.Button(frame, text="Datos de la Red", bg="#E4F4FD", command=self.import_data, width=button_width)
+        import_button.pack(pady=5)
+
+        # Título
+        title_label = tk.Label(self, text=" BÚSQUEDA DE RUTAS ", bg="#E4F4FD", fg="black", font=("Helvetica", 16, "bold"))
+        title_label.pack(pady=10)
+
+        # Cuadro de color azul claro
+        frame = tk.Frame(self, bg="lightblue", bd=1, relief="solid", padx=25, pady=25)
+        frame.pack()
+
+        # Botones dentro del cuadro
+        label_width = 20  # Ancho deseado para los botones
+
+        origin_label = tk.Label(frame, text="Aeropuerto de Origen", width=label_width, bg=frame.cget("bg"))
+        origin_label.pack(pady=5)
+        # Las entradas aceptan código, nombre o el inicio de un nombre o ubicación
+        self.origin_entry = ttk.Combobox(frame)
+        self.origin_entry.bind("<KeyRelease>", self.suggest_airports)
+        self.origin_entry.pack()
+
+        destination_label = tk.Label(frame, text="Aeropuerto de Destino", width=label_width, bg=frame.cget("bg"))
+        destination_label.pack(pady=10)
+        self.destination_entry = ttk.Combobox(frame)
+        self.destination_entry.bind("<KeyRelease>", self.suggest_airports)
+        self.destination_entry.pack()
+
+        search_button = tk.Button(frame, text="Buscar Ruta por Distancia", bg="#E4F4FD", command=self.search_route, width=label_width)
+        search_button.pack(pady=10)
+
+        search_shortest_time_button = tk.Button(frame, text="Buscar Ruta por Tiempo Corto", bg="#E4F4FD", command=self.search_shortest_time_route, width=button_width)
+        search_shortest_time_button.pack(pady=5)
+
+        # Compromisos entre distancia y tiempo, y rutas alternativas según el criterio elegido
+        pareto_button = tk.Button(frame, text="Comparar Distancia y Tiempo", bg="#E4F4FD", command=self.search_pareto_routes, width=button_width)
+        pareto_button.pack(pady=5)
+
+        self.alternatives_weight = ttk.Combobox(frame, values=("Distancia", "Tiempo de vuelo"), state="readonly", width=label_width)
+        self.alternatives_weight.current(0)
+        self.alternatives_weight.pack(pady=5)
+
+        alternatives_button = tk.Button(frame, text="Rutas Alternativas", bg="#E4F4FD", command=self.search_alternative_routes, width=button_width)
+        alternatives_button.pack(pady=5)
+
+        # Itinerarios según el horario de vuelos, con tiempos mínimos de conexión
+        departure_label = tk.Label(frame, text="Hora de salida (HH:MM)", width=label_width, bg=frame.cget("bg"))
+        departure_label.pack(pady=5)
+        self.departure_entry = tk.Entry(frame)
+        self.departure_entry.insert(0, "08:00")
+        self.departure_entry.pack()
+
+        itinerary_button = tk.Button(frame, text="Buscar Itinerario", bg="#E4F4FD", command=self.search_itinerary, width=button_width)
+        itinerary_button.pack(pady=5)
+
+    def register_airport(self):
+        # Crear una nueva ventana superior para registrar aeropuertos
+        register_window = tk.Toplevel(self)
+        register_window.title("Registrar Aeropuerto")
+
+        # Crear campos de entrada para el nombre y la ubicación del aeropuerto
+        self.create_input_field(register_window, "Nombre:", "name_entry")
+        self.create_input_field(register_window, "Ubicación:", "location_entry")
+        self.create_input_field(register_window, "Latitud (opcional):", "latitude_entry")
+        self.create_input_field(register_window, "Longitud (opcional):", "longitude_entry")
+
+        # Agregar un botón de guardar que llama a la función 'save_airport' cuando se presiona
+        save_button = tk.Button(register_window, text="Guardar", command=self.save_airport)
+        save_button.pack()
+
+    def create_input_field(self, window, label_text, entry_name):
+        # Crear una etiqueta con el texto proporcionado y agregarla a la ventana
+        label = tk.Label(window, text=label_text)
+        label.pack()
+
+        # Crear un campo de entrada utilizando ttk.Entry y agregarlo a la ventana
+        entry = ttk.Entry(window)
+        entry.pack()
+
+        # Establecer el atributo de la instancia con el nombre proporcionado para referenciar el campo de entrada
+        setattr(self, entry_name, entry)
+
+    def save_airport(self):
+        name = self.name_entry.get()
+        location = self.location_entry.get()
+        latitude = self.latitude_entry.get().strip()
+        longitude = self.longitude_entry.get().strip()
+
+        if name and location:
+            coordinates = (None, None)
+            if latitude or longitude:
+                try:
+                    coordinates = _parse_coordinates(latitude, longitude)
+                except ValueError:
+                    messagebox.showerror("Error", "Latitud y longitud deben ser números válidos en grados.")
+                    return
+            self.run_graph_task("Registrando aeropuerto", self.insert_airport, name, location, coordinates,
+                                on_done=lambda airport_code: self.airport_saved(name, airport_code))
+        else:
+            messagebox.showerror("Error", "Todos los campos son requeridos.")
+
+    @staticmethod
+    def insert_airport(task, graph, name, location, coordinates):
+        if graph.has_airport_name(name):
+            raise ValueError("Ya existe un aeropuerto con este nombre.")
+        return graph.add_airport(name, location, *coordinates)
+
+    def airport_saved(self, name, airport_code):
+        messagebox.showinfo("Aeropuerto registrado", f"Aeropuerto '{name}' registrado exitosamente con código {airport_code}.")
+        self.update_graph()
+        # La ventana de registro puede haberse cerrado mientras se guardaba
+        if self.name_entry.winfo_exists():
+            self.name_entry.delete(0, tk.END)
+            self.location_entry.delete(0, tk.END)
+            self.latitude_entry.delete(0, tk.END)
+            self.longitude_entry.delete(0, tk.END)
+
+    def import_data(self):
+        # Ventana con las importaciones (primero aeropuertos y después rutas) y las instantáneas
+        import_window = tk.Toplevel(self)
+        import_window.title("Datos de la Red")
+
+        airports_button = tk.Button(import_window, text="Importar Aeropuertos (CSV / airports.dat)",
+                                    command=lambda: self.import_file(self.loader.load_airports))
+        airports_button.pack(padx=10, pady=5)
+
+        routes_button = tk.Button(import_window, text="Importar Rutas (CSV / routes.dat)",
+                                  command=lambda: self.import_file(self.loader.load_routes))
+        routes_button.pack(padx=10, pady=5)
+
+        flights_button = tk.Button(import_window, text="Importar Horario de Vuelos (CSV)",
+                                   command=lambda: self.import_file(self.loader.load_flights))
+        flights_button.pack(padx=10, pady=5)
+
+        save_button = tk.Button(import_window, text="Guardar Red", command=self.save_network)
+        save_button.pack(padx=10, pady=5)
+
+        open_button = tk.Button(import_window, text="Abrir Red", command=self.open_network)
+        open_button.pack(padx=10, pady=5)
+
+        if self.metrics is not None:
+            metrics_button = tk.Button(import_window, text="Ver Métricas", command=self.display_metrics)
+            metrics_button.pack(padx=10, pady=5)
+
+    def display_metrics(self):
+        # Volcado de la instrumentación en formato Prometheus y las capturas de consultas lentas
+        metrics_window = tk.Toplevel(self)
+        metrics_window.title("Métricas")
+        text = tk.Text(metrics_window, width=100, height=40)
+        scrollbar = ttk.Scrollbar(metrics_window, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        text.insert(tk.END, self.metrics.prometheus())
+        if self.metrics.profiler is not None:
+            for capture in self.metrics.profiler.captures:
+                text.insert(tk.END, f"\n{capture['op']}{capture['args']}: {capture['seconds'] * 1000:.1f} ms\n")
+                text.insert(tk.END, capture['stats'])
+        text.configure(state=tk.DISABLED)
+
+    def save_network(self):
+        path = filedialog.asksaveasfilename(defaultextension=".rutas", filetypes=[("Red de rutas", "*.rutas")])
+        if not path:
+            return
+        self.run_graph_task("Guardando red", lambda task, graph: graph.save_snapshot(path),
+                            on_done=lambda result: messagebox.showinfo("Red guardada", f"Red guardada en {path}."),
+                            on_error=lambda error: messagebox.showerror("Error", f"No se pudo guardar la red: {error}"))
+
+    def open_network(self):
+        path = filedialog.askopenfilename(filetypes=[("Red de rutas", "*.rutas"), ("Todos", "*.*")])
+        if not path:
+            return
+        # La red nueva no comparte nada con la actual, así que se carga sin el cerrojo del grafo
+        self.scheduler.submit("Abriendo red", lambda task: Graph.load_snapshot(path), key="open",
+                              on_done=self.network_opened,
+                              on_error=lambda error: messagebox.showerror("Error", f"No se pudo abrir la red: {error}"))
+
+    def network_opened(self, graph):
+        if self.metrics is not None:
+            graph.enable_metrics(self.metrics)
+        self.graph = graph
+        self.loader = BulkLoader(self.graph)
+        self.update_graph()
+        messagebox.showinfo("Red cargada", f"Red cargada con {len(graph.graph)} aeropuertos.")
+
+    def import_file(self, load):
+        path = filedialog.askopenfilename(filetypes=[("Datos de rutas", "*.csv *.dat"), ("Todos", "*.*")])
+        if not path:
+            return
+
+        def job(task, graph):
+            return load(path, progress=lambda report: task.report(f"{report.rows} filas leídas"))
+
+        self.run_graph_task("Importando datos", job, on_done=self.file_imported,
+                            on_error=lambda error: messagebox.showerror("Error", f"No se pudo leer el fichero: {error}"))
+
+    def file_imported(self, report):
+        self.update_graph()
+        messagebox.showinfo("Importación completada", report.summary())
+
+    def create_route(self):
+        create_route_window = tk.Toplevel(self)
+        create_route_window.title("Crear Ruta")
+
+        source_label = tk.Label(create_route_window, text="Código de Aeropuerto de Origen:")
+        source_entry = tk.Entry(create_route_window)
+        source_label.pack()
+        source_entry.pack()
+
+        destination_label = tk.Label(create_route_window, text="Código de Aeropuerto de Destino:")
+        destination_entry = tk.Entry(create_route_window)
+        destination_label.pack()
+        destination_entry.pack()
+
+        distance_label = tk.Label(create_route_window, text="Distancia:")
+        distance_entry = tk.Entry(create_route_window)
+        distance_label.pack()
+        distance_entry.pack()
+
+        flight_time_label = tk.Label(create_route_window, text="Tiempo de vuelo:")
+        flight_time_entry = tk.Entry(create_route_window)
+        flight_time_label.pack()
+        flight_time_entry.pack()
+
+        save_button = tk.Button(create_route_window, text="Guardar",
+                                command=lambda: self.save_route(source_entry.get(), 
+                                                                destination_entry.get(), 
+                                                                distance_entry.get(), 
+                                                                flight_time_entry.get(),
+                                                                create_route_window))
+        save_button.pack()
+
+    def save_route(self, source_code, destination_code, distance, flight_time, window):
+        try:
+            route = (int(source_code), int(destination_code), float(distance), float(flight_time))
+        except ValueError:
+            messagebox.showerror("Error", "Códigos de aeropuerto, distancia y tiempo de vuelo deben ser números válidos.")
+            return
+        self.run_graph_task("Creando ruta", lambda task, graph: graph.add_route(*route),
+                            on_done=lambda result: self.route_saved(window), on_error=self.route_error)
+
+    def route_saved(self, window):
+        messagebox.showinfo("Ruta creada", "Ruta creada exitosamente.")
+        if window.winfo_exists():
+            window.destroy()
+
+    def route_error(self, error):
+        if isinstance(error, nx.NodeNotFound):
+            messagebox.showerror("Error", "Aeropuerto no encontrado. Por favor, registra los aeropuertos primero.")
+        else:
+            messagebox.showerror("Error", "Códigos de aeropuerto, distancia y tiempo de vuelo deben ser números válidos.")
+
+    def edit_route(self):
+        edit_route_window = tk.Toplevel(self)
+        edit_route_window.title("Editar Ruta")
+
+        source_label = tk.Label(edit_route_window, text="Aeropuerto de Origen:")
+        source_entry = tk.Entry(edit_route_window)
+        source_label.pack()
+        source_entry.pack()
+
+        destination_label = tk.Label(edit_route_window, text="Aeropuerto de Destino:")
+        destination_entry = tk.Entry(edit_route_window)
+        destination_label.pack()
+        destination_entry.pack()
+
+        distance_label = tk.Label(edit_route_window, text="Nueva Distancia:")
+        distance_entry = tk.Entry(edit_route_window)
+        distance_label.pack()
+        distance_entry.pack()
+
+        flight_time_label = tk.Label(edit_route_window, text="Nuevo Tiempo de Vuelo:")
+        flight_time_entry = tk.Entry(edit_route_window)
+        flight_time_label.pack()
+        flight_time_entry.pack()
+
+        save_button = tk.Button(edit_route_window, text="Guardar",
+                                command=lambda: self.update_route(source_entry.get(), destination_entry.get(),
+                                                                  distance_entry.get(), flight_time_entry.get(),
+                                                                  edit_route_window))
+        save_button.pack()
+
+    def visualize_routes(self):
+        # Dibujar la red con los nombres de los aeropuertos y las distancias; la disposición
+        # se calcula en segundo plano y la ventana se abre al terminar
+        self.run_graph_task("Calculando disposición", lambda task, graph: network_snapshot(graph, node_labels=True),
+                            key="visualize-distance",
+                            on_done=lambda snapshot: self.open_network_window("Visualizar Rutas", 'distance', snapshot))
+
+    def visualize_time_routes(self):
+        self.run_graph_task("Calculando disposición", lambda task, graph: network_snapshot(graph, node_labels=True),
+                            key="visualize-time",
+                            on_done=lambda snapshot: self.open_network_window("Visualizar Rutas por Tiempo de Vuelo",
+                                                                              'flight_time', snapshot))
+
+    def open_network_window(self, title, weight, snapshot):
+        graph_window = tk.Toplevel(self)
+        graph_window.title(title)
+        # Crear un nuevo lienzo con barra de zoom
+        figure = Figure(figsize=(10, 6))
+        canvas = FigureCanvasTkAgg(figure, master=graph_window)
+        toolbar = NavigationToolbar2Tk(canvas, graph_window, pack_toolbar=False)
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        graph_window.view = NetworkView(figure, weight, snapshot)
+        graph_window.bind("<Destroy>", lambda event: graph_window.view.disconnect() if event.widget is graph_window else None)
+        canvas.draw()
+
+    def update_graph(self):
+        # Recalcular la disposición en segundo plano; un cambio posterior cancela el cálculo anterior
+        requested = time.perf_counter()
+        self.run_graph_task("Calculando disposición", self.compute_layout, key="layout",
+                            on_done=lambda snapshot: self.show_main_view(snapshot, requested))
+
+    def compute_layout(self, task, graph):
+        if self.metrics is None:
+            return network_snapshot(graph)
+        return self.metrics.timed('layout', network_snapshot, graph)
+
+    def show_main_view(self, snapshot, requested=None):
+        # Redibujar el lienzo principal reutilizando la vista si ya existe
+        start = time.perf_counter()
+        if self.main_view is None:
+            self.figure.clear()
+            self.main_view = NetworkView(self.figure, 'distance', snapshot)
+        else:
+            self.main_view.show(snapshot)
+        if self.metrics is None:
+            self.canvas.draw_idle()
+            return
+        # Con instrumentación se dibuja en el acto para medir el redibujado completo; update_graph
+        # mide desde la petición, incluida la espera en la cola de trabajos
+        self.canvas.draw()
+        end = time.perf_counter()
+        self.metrics.record('redraw', end - start)
+        if requested is not None:
+            self.metrics.record('update_graph', end - requested)
+
+    def update_route(self, source, destination, distance, flight_time, window):
+        if source and destination and distance and flight_time:
+            try:
+                source = int(source)
+                destination = int(destination)
+                route = (source, destination, float(distance), float(flight_time))
+            except ValueError:
+                messagebox.showerror("Error", "Códigos de aeropuerto deben ser números válidos.")
+                return
+            # Graph.update_route invalida solo los resultados en caché afectados por el cambio
+            self.run_graph_task("Actualizando ruta", lambda task, graph: graph.update_route(*route),
+                                on_done=lambda updated: self.route_updated(updated, window))
+        else:
+            messagebox.showerror("Error", "Todos los campos son requeridos.")
+
+    def route_updated(self, updated, window):
+        if updated:
+            self.update_graph()  # Asegúrate de llamar correctamente al método update_graph
+            messagebox.showinfo("Ruta actualizada", "Ruta actualizada exitosamente.")
+            if window.winfo_exists():
+                window.destroy()
+        else:
+            messagebox.showerror("Error", "La ruta especificada no existe.")
+
+    def search_route(self):
+        # Obtener referencias a las entradas de origen y destino
+        origin_entry = self.origin_entry
+        destination_entry = self.destination_entry
+
+        # Verificar si las entradas están en la ventana principal o en una ventana secundaria
+        if not self.origin_entry.winfo_ismapped():
+            # Si no están mapeadas, buscar en la ventana secundaria
+            origin_entry = self.origin_entry.in_toplevel()
+            destination_entry = self.destination_entry.in_toplevel()
+
+        # Verificar si la ventana secundaria aún existe
+        if origin_entry.winfo_exists() and destination_entry.winfo_exists():
+            origin_code = origin_entry.get()
+            destination_code = destination_entry.get()
+
+            if origin_code and destination_code:
+                # Una búsqueda nueva cancela la anterior si aún no ha terminado
+                self.run_graph_task("Buscando ruta por distancia", self.find_route, origin_code, destination_code,
+                                    'distance', key="search",
+                                    on_done=lambda result: self.show_route(result, "Distancia: {} km\n"))
+            else:
+                messagebox.showerror("Error", "Todos los campos son requeridos.")
+        else:
+            messagebox.showerror("Error", "La ventana de edición de rutas ha sido cerrada.")
+
+    def search_shortest_time_route(self):
+        # Obtener referencias a las entradas de origen y destino
+        origin_entry = self.origin_entry
+        destination_entry = self.destination_entry
+
+        # Verificar si las entradas están en la ventana principal o en una ventana secundaria
+        if not self.origin_entry.winfo_ismapped():
+            # Si no están mapeadas, buscar en la ventana secundaria
+            origin_entry = self.origin_entry.in_toplevel()
+            destination_entry = self.destination_entry.in_toplevel()
+
+        # Verificar si la ventana secundaria aún existe
+        if origin_entry.winfo_exists() and destination_entry.winfo_exists():
+            origin_code = origin_entry.get()
+            destination_code = destination_entry.get()
+
+            if origin_code and destination_code:
+                self.run_graph_task("Buscando ruta por tiempo", self.find_route, origin_code, destination_code,
+                                    'flight_time', key="search",
+                                    on_done=lambda result: self.show_route(result, "Tiempo de vuelo: {} horas"))
+            else:
+                messagebox.showerror("Error", "Todos los campos son requeridos.")
+        else:
+            messagebox.showerror("Error", "La ventana de edición de rutas ha sido cerrada.")
+
+    def find_route(self, task, graph, origin_text, destination_text, weight):
+        # Resolver las entradas y buscar la ruta; devuelve (nombres de la ruta, costo) o None
+        origin_code = self.resolve_airport(origin_text, graph)
+        destination_code = self.resolve_airport(destination_text, graph)
+        if weight == 'distance':
+            result = graph.get_shortest_path_dis(origin_code, destination_code, check=task.check)
+        else:
+            result = graph.get_shortest_path(origin_code, destination_code, check=task.check)
+        if not result:
+            return None
+        path, cost = result
+        return [graph.get_airport(node)['name'] for node in path], cost
+
+    def show_route(self, result, cost_format):
+        if result:
+            airport_names, cost = result
+            messagebox.showinfo("Ruta encontrada", f"Ruta encontrada:\n\n"
+                                                f"Ruta: {' -> '.join(map(str, airport_names))}\n"
+                                                + cost_format.format(cost))
+        else:
+            messagebox.showerror("Error", "No se encontró una ruta entre los aeropuertos especificados.")
+
+    def route_entries(self):
+        # Texto de las entradas de origen y destino, o None (tras avisar) si falta alguno
+        origin_text = self.origin_entry.get()
+        destination_text = self.destination_entry.get()
+        if not origin_text or not destination_text:
+            messagebox.showerror("Error", "Todos los campos son requeridos.")
+            return None
+        return origin_text, destination_text
+
+    def search_pareto_routes(self):
+        entries = self.route_entries()
+        if entries:
+            self.run_graph_task("Comparando distancia y tiempo", self.find_pareto_routes, *entries, key="search",
+                                on_done=lambda routes: self.show_routes("Compromisos entre Distancia y Tiempo", routes))
+
+    def search_alternative_routes(self):
+        entries = self.route_entries()
+        if entries:
+            weight = 'distance' if self.alternatives_weight.current() == 0 else 'flight_time'
+            self.run_graph_task("Buscando rutas alternativas", self.find_alternative_routes, *entries, weight,
+                                key="search",
+                                on_done=lambda routes: self.show_routes("Rutas Alternativas", routes))
+
+    def find_pareto_routes(self, task, graph, origin_text, destination_text):
+        # Una sola búsqueda da todas las rutas en las que no se puede ganar distancia sin perder tiempo
+        origin_code = self.resolve_airport(origin_text, graph)
+        destination_code = self.resolve_airport(destination_text, graph)
+        return self.describe_routes(graph, graph.get_pareto_routes(origin_code, destination_code, check=task.check))
+
+    def find_alternative_routes(self, task, graph, origin_text, destination_text, weight):
+        origin_code = self.resolve_airport(origin_text, graph)
+        destination_code = self.resolve_airport(destination_text, graph)
+        routes = graph.get_k_shortest_paths(origin_code, destination_code, ALTERNATIVE_ROUTES, weight,
+                                            check=task.check)
+        # Se muestran ambos costos de cada ruta, sea cual sea el criterio de la búsqueda
+        return self.describe_routes(graph, [(path, *self.route_costs(graph, path)) for path, _ in routes])
+
+    @staticmethod
+    def route_costs(graph, path):
+        legs = [graph.get_route(source, destination) for source, destination in zip(path, path[1:])]
+        return sum(distance for distance, _ in legs), sum(flight_time for _, flight_time in legs)
+
+    @staticmethod
+    def describe_routes(graph, routes):
+        # (nombres, distancia, tiempo) de cada ruta, calculados en el hilo de trabajo
+        return [([graph.get_airport(node)['name'] for node in path], distance, flight_time)
+                for path, distance, flight_time in routes]
+
+    def show_routes(self, title, routes):
+        if not routes:
+            messagebox.showerror("Error", "No se encontró una ruta entre los aeropuertos especificados.")
+            return
+        routes_window = tk.Toplevel(self)
+        routes_window.title(title)
+        columns = ("distance", "flight_time", "stops", "route")
+        table = ttk.Treeview(routes_window, columns=columns, show="headings", height=min(len(routes), 20))
+        for column, heading, width in zip(columns, ("Distancia (km)", "Tiempo (horas)", "Escalas", "Ruta"),
+                                          (110, 110, 70, 500)):
+            table.heading(column, text=heading)
+            table.column(column, width=width, anchor=tk.W if column == "route" else tk.E)
+        for airport_names, distance, flight_time in routes:
+            table.insert("", tk.END, values=(f"{distance:g}", f"{flight_time:g}", len(airport_names) - 2,
+                                             " -> ".join(map(str, airport_names))))
+        scrollbar = ttk.Scrollbar(routes_window, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    def search_itinerary(self):
+        entries = self.route_entries()
+        if not entries:
+            return
+        try:
+            departure = _parse_clock(self.departure_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "La hora de salida debe tener el formato HH:MM.")
+            return
+        self.run_graph_task("Buscando itinerario", self.find_itinerary, *entries, departure, key="search",
+                            on_done=self.show_itinerary)
+
+    def find_itinerary(self, task, graph, origin_text, destination_text, departure):
+        # Itinerario que llega antes y, del perfil, las demás salidas que merecen la pena
+        origin_code = self.resolve_airport(origin_text, graph)
+        destination_code = self.resolve_airport(destination_text, graph)
+        result = graph.timetable.earliest_arrival(origin_code, destination_code, departure)
+        if result is None:
+            return None
+        arrival, legs = result
+        legs = [(flight, graph.get_airport(source)['name'], graph.get_airport(destination)['name'], leg_departure,
+                 leg_arrival) for flight, source, destination, leg_departure, leg_arrival in legs]
+        task.report("Calculando salidas alternativas")
+        profile = graph.timetable.profile(origin_code, destination_code, departure)
+        return arrival, legs, profile[1:PROFILE_DEPARTURES + 1]
+
+    def show_itinerary(self, result):
+        if result is None:
+            messagebox.showerror("Error", "No hay vuelos que lleguen al destino desde esa hora.")
+            return
+        arrival, legs, profile = result
+        lines = [f"{flight or 'Vuelo'}: {source} {_format_clock(departure)} -> {destination} {_format_clock(leg_arrival)}"
+                 for flight, source, destination, departure, leg_arrival in legs]
+        text = f"Llegada: {_format_clock(arrival)}\n\n" + "\n".join(lines)
+        if profile:
+            text += "\n\nOtras salidas:\n" + "\n".join(f"Salida {_format_clock(departure)}, llegada {_format_clock(later)}"
+                                                       for departure, later in profile)
+        messagebox.showinfo("Itinerario encontrado", text)
+
+    def suggest_airports(self, event):
+        # Actualizar las sugerencias del desplegable con los aeropuertos que empiezan por el texto;
+        # si un trabajo en segundo plano está usando el grafo se omiten en lugar de esperar
+        text = event.widget.get().strip()
+        if not text or text.isdigit():
+            event.widget['values'] = ()
+            return
+        if not self.graph_lock.acquire(blocking=False):
+            return
+        try:
+            event.widget['values'] = [f"{airport['name']} ({airport['code']})"
+                                      for airport in map(self.graph.get_airport, self.graph.search_airports(text))]
+        finally:
+            self.graph_lock.release()
+
+    def resolve_airport(self, text, graph):
+        # Traducir el texto de una entrada a un código: número, sugerencia "Nombre (código)",
+        # nombre exacto o prefijo que identifique un único aeropuerto
+        text = text.strip()
+        if text.isdigit():
+            return int(text)
+        if text.endswith(")") and "(" in text:
+            code = text[text.rindex("(") + 1:-1]
+            if code.isdigit():
+                return int(code)
+        airport_code = graph.find_airport(text)
+        if airport_code is not None:
+            return airport_code
+        matches = graph.search_airports(text, limit=2)
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValueError(f"Hay varios aeropuertos que empiezan por '{text}'. Elija uno de la lista.")
+        raise ValueError(f"No se encontró ningún aeropuerto '{text}'.")
+
+    def display_airports(self):
+        # Obtener la lista de aeropuertos en segundo plano y mostrarla en una nueva ventana
+        self.run_graph_task("Listando aeropuertos", lambda task, graph: graph.get_airports_list(), key="airports",
+                            on_done=self.show_airports)
+
+    def show_airports(self, airports_list):
+        airports_window = tk.Toplevel(self)
+        airports_window.title("Lista de Aeropuertos")
+
+        # Crear un nuevo marco para mostrar la lista de aeropuertos
+        frame = tk.Frame(airports_window, bg="white", bd=1, relief="solid", padx=25, pady=25)
+        frame.pack()
+
+        # Crear etiquetas para mostrar la lista de aeropuertos
+        for airport in airports_list:
+            airport_info = f"Código: {airport['code']}, Nombre: {airport['name']}, Ubicación: {airport['location']}"
+            airport_label = tk.Label(frame, text=airport_info, bg=frame.cget("bg"))
+            airport_label.pack()
+
+
+if __name__ == "__main__":
+    app = Application()
+    app.mainloop()
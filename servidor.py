@@ -0,0 +1,447 @@
+import time
+
+# Instante de arranque, antes de importar el motor, para medir el arranque en frío
+STARTED = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+
+from Proyecto2 import CompactGraph, Graph, Metrics, QueryProfiler, WEIGHTS, _parse_clock, _parse_coordinates
+
+# Espera (s) para agrupar consultas concurrentes y tamaño máximo de cada lote
+BATCH_WINDOW = 0.002
+MAX_BATCH = 256
+# Tamaño máximo de una petición HTTP
+MAX_BODY = 16 * 1024 * 1024
+# Máximo de rutas alternativas por consulta
+MAX_ALTERNATIVES = 50
+
+
+class RouteService:
+    # Servicio de consultas sobre un Graph compartido. Todo el trabajo con el grafo se hace en
+    # un único hilo aparte, de modo que el bucle de eventos nunca ejecuta búsquedas y las
+    # escrituras no se mezclan con las lecturas. Las consultas de ruta se agrupan en lotes: las
+    # que llegan mientras el hilo está ocupado esperan juntas y se resuelven con un solo salto
+    # al hilo del grafo y una sola búsqueda por origen repetido.
+    def __init__(self, graph, window=BATCH_WINDOW, max_batch=MAX_BATCH, processes=1):
+        self.graph = graph
+        self.window = window
+        self.max_batch = max_batch
+        self.processes = processes
+        self.batches = 0
+        self.batched_queries = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grafo")
+        self._pending = []
+        self._flush_handle = None
+        self._running = False
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def shortest_path(self, source, destination, weight='distance', method='dijkstra'):
+        if weight not in WEIGHTS:
+            raise ValueError(f"Peso desconocido: {weight}")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((source, destination, weight, method, future))
+        # Con un lote en curso, la consulta espera a que termine y sale en el siguiente
+        if not self._running:
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        queries, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not queries:
+            return
+        self._running = True
+        self.batches += 1
+        self.batched_queries += len(queries)
+        task = asyncio.get_running_loop().run_in_executor(self._executor, self._run_batch,
+                                                          [query[:4] for query in queries])
+        task.add_done_callback(lambda done: self._deliver(queries, done))
+
+    def _deliver(self, queries, done):
+        self._running = False
+        self._flush()
+        if done.exception() is not None:
+            results = [done.exception()] * len(queries)
+        else:
+            results = done.result()
+        for (*_, future), result in zip(queries, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _run_batch(self, queries):
+        # Se ejecuta en el hilo del grafo. Las consultas Dijkstra de un origen repetido en el lote
+        # que no están en la caché se resuelven juntas con batch_shortest_paths(pairs=...): una
+        # búsqueda por origen que se detiene al asentar sus destinos, sin guardar el árbol entero
+        # (los hubs de --hubs ya tienen el suyo, siempre al día).
+        graph = self.graph
+        origins = {}
+        for source, _, weight, method in queries:
+            if method == 'dijkstra':
+                origins[source, weight] = origins.get((source, weight), 0) + 1
+        results = {}
+        grouped = {}
+        for position, (source, destination, weight, method) in enumerate(queries):
+            if (method == 'dijkstra' and origins[source, weight] > 1 and graph.has_airport(source)
+                    and graph.has_airport(destination) and not graph.has_hub_tree(source, weight)
+                    and not graph.path_cache.has_path(source, destination, weight)):
+                grouped.setdefault(weight, []).append(position)
+        for weight, positions in grouped.items():
+            matrix = graph.batch_shortest_paths(pairs=[queries[position][:2] for position in positions],
+                                                weight=weight, keep_paths=True)
+            for position in positions:
+                source, destination = queries[position][:2]
+                result = matrix.path(source, destination)
+                graph.path_cache.put_path(source, destination, weight, graph.version, result)
+                results[position] = None if result is None else (list(result[0]), result[1])
+        for position, (source, destination, weight, method) in enumerate(queries):
+            if position in results:
+                continue
+            try:
+                if weight == 'distance':
+                    results[position] = graph.get_shortest_path_dis(source, destination, method)
+                else:
+                    results[position] = graph.get_shortest_path(source, destination, method)
+            except (ValueError, nx.NetworkXException) as error:
+                results[position] = error
+        return [results[position] for position in range(len(queries))]
+
+    async def handle(self, request):
+        # Atender una petición {"op": ..., ...} y devolver la respuesta como diccionario
+        try:
+            op = request.get('op')
+            handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+            if handler is None:
+                raise ValueError(f"Operación desconocida: {op}")
+            response = await handler(request)
+            response['ok'] = True
+        except (ValueError, KeyError, TypeError, AttributeError, nx.NetworkXException) as error:
+            message = f"Falta el campo {error}" if isinstance(error, KeyError) else str(error)
+            response = {'ok': False, 'error': message}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def _op_ping(self, request):
+        return {}
+
+    async def _op_add_airport(self, request):
+        name, location = str(request['name']), str(request['location'])
+        latitude, longitude = request.get('latitude'), request.get('longitude')
+        coordinates = (None, None)
+        # Como en la interfaz: si llega una coordenada, se exigen las dos y dentro de rango
+        if latitude is not None or longitude is not None:
+            try:
+                coordinates = _parse_coordinates(latitude, longitude)
+            except (ValueError, TypeError):
+                raise ValueError("Latitud y longitud deben ser números válidos en grados.") from None
+
+        def add():
+            if self.graph.has_airport_name(name):
+                raise ValueError("Ya existe un aeropuerto con este nombre.")
+            return self.graph.add_airport(name, location, *coordinates)
+        return {'code': await self.call(add)}
+
+    async def _op_add_route(self, request):
+        route = (int(request['source']), int(request['destination']),
+                 float(request['distance']), float(request['flight_time']))
+        await self.call(self.graph.add_route, *route)
+        return {}
+
+    async def _op_update_route(self, request):
+        route = (int(request['source']), int(request['destination']),
+                 float(request['distance']), float(request['flight_time']))
+        return {'updated': await self.call(self.graph.update_route, *route)}
+
+    async def _op_shortest_path(self, request):
+        result = await self.shortest_path(int(request['source']), int(request['destination']),
+                                          request.get('weight', 'distance'), request.get('method', 'dijkstra'))
+        if result is None:
+            return {'path': None, 'cost': None}
+        return {'path': result[0], 'cost': result[1]}
+
+    async def _op_pareto(self, request):
+        # Rutas no dominadas por distancia y tiempo de vuelo, de la más corta a la más rápida
+        source, destination = int(request['source']), int(request['destination'])
+        routes = await self.call(self.graph.get_pareto_routes, source, destination)
+        return {'routes': [{'path': path, 'distance': distance, 'flight_time': flight_time}
+                           for path, distance, flight_time in routes]}
+
+    async def _op_alternatives(self, request):
+        # Las k rutas sin ciclos más cortas según un peso
+        source, destination = int(request['source']), int(request['destination'])
+        weight = request.get('weight', 'distance')
+        if weight not in WEIGHTS:
+            raise ValueError(f"Peso desconocido: {weight}")
+        k = min(int(request.get('k', 3)), MAX_ALTERNATIVES)
+        routes = await self.call(self.graph.get_k_shortest_paths, source, destination, k, weight)
+        return {'routes': [{'path': path, 'cost': cost} for path, cost in routes]}
+
+    async def _op_add_flights(self, request):
+        # Vuelos del horario: [{"source", "destination", "departure", "arrival"?, "flight"?}], con las
+        # horas en minutos desde las 00:00 o como "HH:MM"
+        flights = [(int(flight['source']), int(flight['destination']), _parse_clock(flight['departure']),
+                    None if flight.get('arrival') is None else _parse_clock(flight['arrival']), flight.get('flight'))
+                   for flight in request['flights']]
+        await self.call(self.graph.timetable.add_flights, flights)
+        return {'flights': len(flights)}
+
+    async def _op_earliest_arrival(self, request):
+        source, destination = int(request['source']), int(request['destination'])
+        departure = _parse_clock(request.get('departure', 0))
+        result = await self.call(self.graph.timetable.earliest_arrival, source, destination, departure)
+        if result is None:
+            return {'arrival': None, 'legs': None}
+        arrival, legs = result
+        return {'arrival': arrival,
+                'legs': [{'flight': flight, 'source': origin, 'destination': target, 'departure': leg_departure,
+                          'arrival': leg_arrival} for flight, origin, target, leg_departure, leg_arrival in legs]}
+
+    async def _op_profile(self, request):
+        # Todas las salidas útiles entre dos aeropuertos a partir de una hora
+        source, destination = int(request['source']), int(request['destination'])
+        departure = _parse_clock(request.get('departure', 0))
+        until = _parse_clock(request['until']) if request.get('until') is not None else float('inf')
+        profile = await self.call(self.graph.timetable.profile, source, destination, departure, until)
+        return {'profile': [{'departure': leg_departure, 'arrival': arrival} for leg_departure, arrival in profile]}
+
+    async def _op_batch(self, request):
+        # Consultas por lotes explícitas: lista de pares o matriz de orígenes por destinos
+        weight = request.get('weight', 'distance')
+        if weight not in WEIGHTS:
+            raise ValueError(f"Peso desconocido: {weight}")
+        paths = bool(request.get('paths', False))
+        pairs = request.get('pairs')
+        if pairs is not None:
+            pairs = [(int(source), int(destination)) for source, destination in pairs]
+            cells = pairs
+        else:
+            origins = [int(code) for code in request['origins']]
+            destinations = [int(code) for code in request['destinations']]
+            cells = [(source, destination) for source in origins for destination in destinations]
+
+        def run():
+            if pairs is not None:
+                matrix = self.graph.batch_shortest_paths(pairs=pairs, weight=weight, processes=self.processes)
+            else:
+                matrix = self.graph.batch_shortest_paths(origins=origins, destinations=destinations,
+                                                         weight=weight, processes=self.processes)
+            if paths:
+                return [matrix.path(source, destination) or (None, None) for source, destination in cells]
+            return [(None, matrix.get(source, destination)) for source, destination in cells]
+
+        results = await self.call(run)
+        return {'results': [{'source': source, 'destination': destination, 'cost': cost, 'path': path}
+                            for (source, destination), (path, cost) in zip(cells, results)]}
+
+    async def _op_metrics(self, request):
+        # Instrumentación del grafo (si el servidor se inició con --metricas)
+        metrics = self.graph.metrics
+        if metrics is None:
+            raise ValueError("La instrumentación no está activada (--metricas).")
+        captures = list(metrics.profiler.captures) if metrics.profiler is not None else []
+        return {'metrics': metrics.snapshot(), 'profiles': captures}
+
+    async def _op_stats(self, request):
+        def stats():
+            return {'airports': self.graph.number_of_airports(),
+                    'routes': self.graph.number_of_routes(),
+                    'version': self.graph.version,
+                    'cache': self.graph.path_cache.stats(),
+                    'hub_trees': self.graph.hub_trees and self.graph.hub_trees.stats(),
+                    'flights': len(self.graph.timetable)}
+        response = await self.call(stats)
+        response['batches'] = self.batches
+        response['batched_queries'] = self.batched_queries
+        return response
+
+
+class RouteServer:
+    # Servidor TCP local. Cada conexión habla JSON por líneas (una petición y una respuesta por
+    # línea; las peticiones de una conexión se atienden a la vez y la respuesta repite su "id")
+    # o HTTP/1.1 con la petición JSON en el cuerpo de un POST (GET /stats y GET /ping también).
+    def __init__(self, service, host='127.0.0.1', port=8765):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._client, self.host, self.port, limit=MAX_BODY)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # readline convierte LimitOverrunError en ValueError: la línea supera MAX_BODY y
+                    # no se sabe dónde empieza la siguiente petición, así que se responde y se cierra
+                    writer.write(self._encode({'ok': False, 'error': "Petición demasiado grande"}) + b'\n')
+                    break
+                if not line:
+                    break
+                if line.startswith((b'GET', b'POST')):
+                    if not await self._http(line, reader, writer):
+                        break
+                elif line.strip():
+                    task = asyncio.ensure_future(self._json_line(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _json_line(self, line, writer):
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            response = {'ok': False, 'error': f"JSON inválido: {error}"}
+        else:
+            response = await self.service.handle(request if isinstance(request, dict) else {})
+        writer.write(self._encode(response) + b'\n')
+        await writer.drain()
+
+    async def _http(self, request_line, reader, writer):
+        # Atender una petición HTTP; devuelve False si la conexión debe cerrarse
+        try:
+            method, target, *_ = request_line.decode('latin-1').split()
+        except ValueError:
+            return await self._http_bad_request(writer, "Línea de petición HTTP mal formada")
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                return await self._http_bad_request(writer, "Cabecera HTTP demasiado larga")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return await self._http_bad_request(writer, "Content-Length inválido")
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if length > MAX_BODY:
+            # El cuerpo no se lee: la conexión se cierra para que no se tome por peticiones nuevas
+            keep_alive = False
+            status, response = '413 Payload Too Large', {'ok': False, 'error': "Petición demasiado grande"}
+        else:
+            body = await reader.readexactly(length) if length else b''
+            status = '200 OK'
+            if method == 'GET' and target == '/metrics' and self.service.graph.metrics is not None:
+                # Texto de Prometheus para que se pueda consultar directamente
+                payload = self.service.graph.metrics.prometheus().encode('utf-8')
+                self._http_response(writer, status, 'text/plain; version=0.0.4', payload, keep_alive)
+                await writer.drain()
+                return keep_alive
+            if method == 'GET':
+                response = await self.service.handle({'op': target.strip('/') or 'ping'})
+            else:
+                try:
+                    request = json.loads(body)
+                except ValueError as error:
+                    request = None
+                    status, response = '400 Bad Request', {'ok': False, 'error': f"JSON inválido: {error}"}
+                if request is not None:
+                    response = await self.service.handle(request if isinstance(request, dict) else {})
+        self._http_response(writer, status, 'application/json', self._encode(response), keep_alive)
+        await writer.drain()
+        return keep_alive
+
+    async def _http_bad_request(self, writer, message):
+        # Sin una petición bien formada no se sabe dónde empieza la siguiente: se cierra la conexión
+        self._http_response(writer, '400 Bad Request', 'application/json',
+                            self._encode({'ok': False, 'error': message}), False)
+        await writer.drain()
+        return False
+
+    @staticmethod
+    def _encode(response):
+        # JSON estricto: Infinity y NaN no son JSON válido y los clientes no los aceptan
+        try:
+            return json.dumps(response, allow_nan=False).encode('utf-8')
+        except ValueError as error:
+            return json.dumps({'ok': False, 'error': f"Respuesta no serializable: {error}"}).encode('utf-8')
+
+    @staticmethod
+    def _http_response(writer, status, content_type, payload, keep_alive):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload)
+
+
+async def serve(args):
+    # El motor compacto proyecta la instantánea en memoria y responde más rápido que NetworkX
+    graph_class = CompactGraph if args.motor == 'compacto' else Graph
+    graph = graph_class.load_snapshot(args.red) if args.red else graph_class()
+    if args.metricas or args.perfil_ms is not None:
+        profiler = QueryProfiler(args.perfil_ms / 1000) if args.perfil_ms is not None else None
+        graph.enable_metrics(Metrics(profiler=profiler))
+    if args.hubs:
+        graph.track_hubs(int(code) for code in args.hubs.split(","))
+    service = RouteService(graph, args.ventana / 1000, args.lote, args.procesos)
+    server = await RouteServer(service, args.host, args.puerto).start()
+    # La línea de arranque la usa benchmark.py para medir el arranque en frío
+    print(f"Servidor escuchando en {server.host}:{server.port} "
+          f"(arranque {(time.perf_counter() - STARTED) * 1000:.0f} ms, "
+          f"{graph.number_of_airports()} aeropuertos)", flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de consultas de rutas (JSON por TCP o HTTP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765, help="0 elige un puerto libre")
+    parser.add_argument("--red", help="instantánea .rutas que se carga al arrancar")
+    parser.add_argument("--motor", choices=("compacto", "networkx"), default="compacto")
+    parser.add_argument("--ventana", type=float, default=BATCH_WINDOW * 1000,
+                        help="espera en ms para agrupar consultas concurrentes")
+    parser.add_argument("--lote", type=int, default=MAX_BATCH, help="consultas máximas por lote")
+    parser.add_argument("--metricas", action="store_true",
+                        help="activar la instrumentación (op metrics y GET /metrics en HTTP)")
+    parser.add_argument("--perfil-ms", type=float,
+                        help="perfilar por muestreo las consultas más lentas que este umbral en ms")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos para las consultas por lotes")
+    parser.add_argument("--hubs", help="códigos separados por comas de los hubs cuyos árboles de caminos "
+                                       "mínimos se mantienen y reparan con cada cambio de ruta")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
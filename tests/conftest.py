@@ -0,0 +1,29 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Los módulos del proyecto están en la raíz del repositorio, sin paquete instalable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Proyecto2 import CompactGraph, Graph  # noqa: E402
+
+
+def build_network(graph_class, airports, routes, seed, coordinates=False):
+    # Red aleatoria con pesos enteros; devuelve (grafo, códigos)
+    rnd = random.Random(seed)
+    graph = graph_class()
+    codes = []
+    for i in range(airports):
+        position = (rnd.uniform(-60, 60), rnd.uniform(-180, 180)) if coordinates else ()
+        codes.append(graph.add_airport(f"A{i}", f"Ciudad {i}", *position))
+    for _ in range(routes):
+        source, destination = rnd.sample(codes, 2)
+        graph.add_route(source, destination, rnd.randint(1, 50), rnd.randint(1, 50))
+    return graph, codes
+
+
+@pytest.fixture(params=[Graph, CompactGraph], ids=['networkx', 'compacto'])
+def graph_class(request):
+    return request.param
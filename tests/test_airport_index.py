@@ -0,0 +1,31 @@
+def test_prefix_search_ignores_case_and_accents(graph_class):
+    graph = graph_class()
+    malaga = graph.add_airport("Málaga", "España")
+    madrid = graph.add_airport("Madrid-Barajas", "España")
+    lima = graph.add_airport("Jorge Chávez", "Lima, Perú")
+    assert graph.search_airports("mal") == [malaga]
+    assert graph.search_airports("MÁLA") == [malaga]
+    assert graph.search_airports("ma") == [madrid, malaga]
+    # La ubicación también se indexa, y cada aeropuerto aparece una sola vez
+    assert sorted(graph.search_airports("espa")) == sorted([malaga, madrid])
+    assert graph.search_airports("lim") == [lima]
+    assert graph.search_airports("chavez") == []
+    assert len(graph.search_airports("")) == 3
+    assert len(graph.search_airports("", limit=2)) == 2
+
+
+def test_indexes_follow_inserts(graph_class):
+    graph = graph_class()
+    first = graph.add_airport("Quito", "Ecuador")
+    # Los índices se construyen aquí; lo que se añade después debe aparecer sin reconstruirlos
+    assert graph.has_airport_name("Quito")
+    assert not graph.has_airport_name("Cusco")
+    cusco = graph.add_airport("Cusco", "Perú")
+    bogota, cali = graph.add_airports([("Bogotá", "Colombia"), ("Cali", "Colombia", 3.5, -76.4)])
+    assert graph.has_airport_name("Cusco") and graph.has_airport_name("Bogotá")
+    assert not graph.has_airport_name("bogota")
+    assert graph.find_airport("Quito") == first
+    assert graph.find_airport("Cali") == cali
+    assert graph.search_airports("cu") == [cusco]
+    assert graph.search_airports("colom") == [bogota, cali]
+    assert graph.search_airports("q") == [first]
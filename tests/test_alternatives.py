@@ -0,0 +1,78 @@
+import itertools
+
+import networkx as nx
+import pytest
+
+from conftest import build_network
+from Proyecto2 import Graph
+
+
+def brute_force_front(graph, source, destination):
+    # Frente de Pareto exacto enumerando todas las rutas sin ciclos
+    costs = set()
+    for path in nx.all_simple_paths(graph.graph, source, destination):
+        legs = [graph.get_route(u, v) for u, v in zip(path, path[1:])]
+        costs.add((sum(distance for distance, _ in legs), sum(flight_time for _, flight_time in legs)))
+    return sorted(cost for cost in costs
+                  if not any(other != cost and other[0] <= cost[0] and other[1] <= cost[1] for other in costs))
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_pareto_front_is_exact(seed):
+    graph, codes = build_network(Graph, 9, 18, seed)
+    for source, destination in itertools.permutations(codes[:4], 2):
+        front = graph.get_pareto_routes(source, destination, max_labels=None)
+        assert [(distance, flight_time) for _, distance, flight_time in front] == \
+            brute_force_front(graph, source, destination)
+        for path, distance, flight_time in front:
+            assert path[0] == source and path[-1] == destination
+            assert len(set(path)) == len(path)
+            legs = [graph.get_route(u, v) for u, v in zip(path, path[1:])]
+            assert (sum(d for d, _ in legs), sum(t for _, t in legs)) == (distance, flight_time)
+
+
+def test_pareto_engines_agree(graph_class):
+    graph, codes = build_network(graph_class, 30, 70, seed=4)
+    reference, _ = build_network(Graph, 30, 70, seed=4)
+    for destination in codes[1:]:
+        assert graph.get_pareto_routes(codes[0], destination) == reference.get_pareto_routes(codes[0], destination)
+
+
+def test_pareto_trivial_cases():
+    graph, codes = build_network(Graph, 5, 0, seed=0)
+    assert graph.get_pareto_routes(codes[0], codes[0]) == [([codes[0]], 0.0, 0.0)]
+    assert graph.get_pareto_routes(codes[0], codes[1]) == []
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('weight', ['distance', 'flight_time'])
+def test_k_shortest_paths_match_networkx(seed, weight):
+    graph, codes = build_network(Graph, 9, 18, seed)
+    for source, destination in itertools.permutations(codes[:4], 2):
+        routes = graph.get_k_shortest_paths(source, destination, 6, weight)
+        if nx.has_path(graph.graph, source, destination):
+            expected = [nx.path_weight(graph.graph, path, weight) for path in
+                        itertools.islice(nx.shortest_simple_paths(graph.graph, source, destination, weight), 6)]
+        else:
+            expected = []
+        assert [cost for _, cost in routes] == expected
+        assert len({tuple(path) for path, _ in routes}) == len(routes)
+        for path, cost in routes:
+            assert path[0] == source and path[-1] == destination and len(set(path)) == len(path)
+            assert nx.path_weight(graph.graph, path, weight) == cost
+
+
+
+
+def test_alternative_searches_can_be_cancelled():
+    graph, codes = build_network(Graph, 3000, 9000, seed=1)
+
+    class Stop(Exception):
+        pass
+
+    def check():
+        raise Stop()
+    with pytest.raises(Stop):
+        graph.get_pareto_routes(codes[0], codes[-1], check=check)
+    with pytest.raises(Stop):
+        graph.get_k_shortest_paths(codes[0], codes[-1], 5, check=check)
@@ -0,0 +1,39 @@
+import random
+
+from Proyecto2 import haversine
+
+
+def test_astar_matches_dijkstra_on_geographic_distances(graph_class):
+    # Con distancias no menores que el círculo máximo la heurística es admisible
+    rnd = random.Random(7)
+    graph = graph_class()
+    points = {}
+    for i in range(60):
+        latitude, longitude = rnd.uniform(-60, 60), rnd.uniform(-180, 180)
+        points[graph.add_airport(f"A{i}", "x", latitude, longitude)] = (latitude, longitude)
+    codes = list(points)
+    for _ in range(200):
+        u, v = rnd.sample(codes, 2)
+        distance = haversine(*points[u], *points[v]) * rnd.uniform(1.0, 1.3)
+        graph.add_route(u, v, distance, distance / 800)
+    for destination in codes[1:30]:
+        expected = graph.get_shortest_path_dis(codes[0], destination)
+        found = graph.get_shortest_path_dis(codes[0], destination, method='astar')
+        assert (found and round(found[1], 6)) == (expected and round(expected[1], 6))
+        expected = graph.get_shortest_path(codes[0], destination)
+        found = graph.get_shortest_path(codes[0], destination, method='astar')
+        assert (found and round(found[1], 6)) == (expected and round(expected[1], 6))
+
+
+def test_astar_does_not_share_cache_with_dijkstra(graph_class):
+    # A-C es más corta en el mapa que A-X-C pero su distancia registrada es mayor: la heurística
+    # geográfica no es admisible y A* da una ruta peor que no debe llegar a las consultas exactas
+    graph = graph_class()
+    a = graph.add_airport("A", "a", 0, 0)
+    c = graph.add_airport("C", "c", 0, 1)
+    x = graph.add_airport("X", "x", 0, 90)
+    graph.add_route(a, x, 10, 1)
+    graph.add_route(x, c, 10, 1)
+    graph.add_route(a, c, 150, 1)
+    assert graph.get_shortest_path_dis(a, c, method='astar') == ([a, c], 150)
+    assert graph.get_shortest_path_dis(a, c) == ([a, x, c], 20)
@@ -0,0 +1,28 @@
+import pytest
+
+import Proyecto2
+from conftest import build_network
+
+
+def test_batch_pairs_answer_only_requested_pairs(graph_class):
+    graph, codes = build_network(graph_class, 60, 150, seed=9)
+    pairs = [(codes[0], codes[5]), (codes[1], codes[6]), (codes[0], codes[7]), (codes[2], codes[2])]
+    matrix = graph.batch_shortest_paths(pairs=pairs, keep_paths=True)
+    for source, destination in pairs:
+        expected = graph.get_shortest_path_dis(source, destination)
+        assert matrix.get(source, destination) == (expected and expected[1])
+        assert (matrix.path(source, destination) or (None, None))[1] == (expected and expected[1])
+    # Los pares no pedidos no forman parte del resultado
+    with pytest.raises(KeyError):
+        matrix.get(codes[1], codes[5])
+    assert {(source, destination) for source, destination, _ in matrix.rows()} <= set(pairs)
+
+
+def test_serial_batch_does_not_use_worker_state(graph_class):
+    graph, codes = build_network(graph_class, 40, 120, seed=3)
+    serial = graph.batch_shortest_paths(origins=codes[:4], destinations=codes[4:12])
+    # El estado global es solo de los procesos de trabajo
+    assert Proyecto2._batch_state is None
+    parallel = graph.batch_shortest_paths(origins=codes[:4], destinations=codes[4:12], processes=2,
+                                          min_parallel=1)
+    assert list(serial.rows()) == list(parallel.rows())
@@ -0,0 +1,63 @@
+import pytest
+
+from Proyecto2 import BulkLoader, Graph
+
+
+def write(tmp_path, name, text, encoding='utf-8'):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return str(path)
+
+
+def test_loaders_accept_utf8_bom(tmp_path):
+    graph = Graph()
+    loader = BulkLoader(graph)
+    airports = write(tmp_path, "aeropuertos.csv", "name,location,code\nMadrid,España,MAD\nLima,Perú,LIM\n",
+                     'utf-8-sig')
+    routes = write(tmp_path, "rutas.csv", "source,destination,distance,flight_time\nMAD,LIM,9500,12\n", 'utf-8-sig')
+    flights = write(tmp_path, "vuelos.csv", "source,destination,departure\nMAD,LIM,10:00\n", 'utf-8-sig')
+    assert loader.load_airports(airports).accepted == 2
+    assert loader.load_routes(routes).accepted == 1
+    assert loader.load_flights(flights).accepted == 1
+
+
+def test_openflights_ids_are_never_internal_codes(tmp_path):
+    graph = Graph()
+    alpha = graph.add_airport("Alpha", "Ciudad", 40.0, -3.0)
+    loader = BulkLoader(graph)
+    airports = write(tmp_path, "airports.dat", '7,"Lima","Lima","Peru","LIM","SPJC",-12.02,-77.11\n'
+                                               '8,"Cusco","Cusco","Peru","CUZ","SPZO",-13.53,-71.93\n')
+    assert loader.load_airports(airports).accepted == 2
+    # El aeropuerto 1 de OpenFlights no se importó: no debe confundirse con el código interno 1
+    routes = write(tmp_path, "routes.dat", 'LA,1,LIM,7,XXX,1,,0,320\nLA,1,LIM,7,CUZ,8,,0,320\n')
+    report = loader.load_routes(routes)
+    assert report.accepted == 1
+    assert not graph.neighbors(alpha)
+
+
+def test_csv_internal_codes(tmp_path):
+    graph = Graph()
+    codes = [graph.add_airport(name, "Ciudad") for name in ("A", "B", "C")]
+    routes = write(tmp_path, "rutas.csv", f"source,destination,distance,flight_time\n{codes[0]},{codes[1]},10,1\n")
+    # Sin códigos externos importados, los números son códigos internos
+    assert BulkLoader(graph).load_routes(routes).accepted == 1
+    loader = BulkLoader(graph)
+    loader.load_airports(write(tmp_path, "aeropuertos.csv", "name,location,code\nD,Ciudad,DDD\n"))
+    assert loader.load_routes(routes).accepted == 0
+    assert BulkLoader(graph, internal_codes=True).load_routes(routes).accepted == 1
+
+
+def test_interrupted_airport_load_can_be_retried(tmp_path):
+    graph = Graph()
+    loader = BulkLoader(graph)
+    rows = "".join(f"Aeropuerto {i},Ciudad,C{i}\n" for i in range(2000))
+    # Un byte que no es UTF-8 detiene la lectura con parte del primer lote ya validada
+    broken = tmp_path / "roto.csv"
+    broken.write_bytes(("name,location,code\n" + rows).encode('utf-8') + b"Otro,Ciudad,X\xff\n")
+    with pytest.raises(UnicodeDecodeError):
+        loader.load_airports(str(broken))
+    assert graph.number_of_airports() == 0
+    # Al reintentar con el fichero corregido no quedan nombres ni códigos reservados
+    report = loader.load_airports(write(tmp_path, "aeropuertos.csv", "name,location,code\n" + rows))
+    assert report.accepted == 2000 and not report.rejected
+    assert graph.number_of_airports() == 2000
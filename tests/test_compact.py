@@ -0,0 +1,27 @@
+from conftest import build_network
+from Proyecto2 import CompactGraph, Graph
+
+
+def cost(result):
+    return result and result[1]
+
+
+def test_compact_engine_matches_networkx():
+    graph, codes = build_network(Graph, 80, 240, seed=8)
+    compact, _ = build_network(CompactGraph, 80, 240, seed=8)
+    for step in range(20):
+        # Las rutas pendientes se mezclan en el CSR entre consultas
+        u, v = codes[step], codes[(step * 13 + 1) % 80]
+        for network in (graph, compact):
+            network.add_route(u, v, 1 + step % 9, 2 + step % 7)
+        for destination in codes[::9]:
+            assert cost(graph.get_shortest_path_dis(codes[step], destination)) == \
+                cost(compact.get_shortest_path_dis(codes[step], destination))
+            assert cost(graph.get_shortest_path(codes[step], destination)) == \
+                cost(compact.get_shortest_path(codes[step], destination))
+    assert sorted(graph.iter_routes()) == sorted(compact.iter_routes())
+    # La réplica compacta del Graph da los mismos resultados que su búsqueda en NetworkX
+    mirror = graph.to_compact()
+    for destination in codes[1:20]:
+        assert cost(mirror._compute_shortest_path(codes[0], destination, 'distance')) == \
+            cost(graph._compute_shortest_path(codes[0], destination, 'distance'))
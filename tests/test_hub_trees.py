@@ -0,0 +1,82 @@
+import random
+
+import Proyecto2
+from conftest import build_network
+from Proyecto2 import INF
+
+
+def assert_trees_exact(graph):
+    # Cada árbol reparado debe coincidir con un Dijkstra nuevo sobre la red actual
+    compact = graph.to_compact()
+    for (hub, weight), tree in graph.hub_trees.trees.items():
+        weights = compact._weight_array(weight)
+        tree.grow(len(compact.codes))
+        dist, _ = Proyecto2._dijkstra_csr(compact.offsets, compact.targets, weights, hub)
+        for v, (expected, repaired) in enumerate(zip(dist, tree.dist)):
+            assert expected == repaired == INF or abs(expected - repaired) < 1e-9
+            parent = tree.pred[v]
+            if parent != -1:
+                k = Proyecto2._position(compact.offsets, compact.targets, parent, v)
+                assert abs(tree.dist[parent] + weights[k] - tree.dist[v]) < 1e-9
+        assert tree.reached == sum(d != INF for d in dist)
+
+
+def test_hub_trees_follow_route_edits(graph_class):
+    rnd = random.Random(7)
+    graph, codes = build_network(graph_class, 50, 80, seed=7)
+    hubs = rnd.sample(codes, 3)
+    graph.track_hubs(hubs)
+    for step in range(150):
+        action = rnd.random()
+        if action < 0.5:
+            source, destination, distance, flight_time = rnd.choice(list(graph.iter_routes()))
+            graph.update_route(source, destination, max(1, distance + rnd.randint(-20, 20)),
+                               max(1, flight_time + rnd.randint(-20, 20)))
+        elif action < 0.75:
+            source, destination = rnd.sample(codes, 2)
+            graph.add_route(source, destination, rnd.randint(1, 50), rnd.randint(1, 50))
+        elif action < 0.85:
+            graph.add_routes([(*rnd.sample(codes, 2), rnd.randint(1, 50), rnd.randint(1, 50)) for _ in range(3)])
+        else:
+            codes.append(graph.add_airport(f"B{step}", "Ciudad"))
+        assert_trees_exact(graph)
+
+
+def test_hub_queries_match_dijkstra(graph_class):
+    graph, codes = build_network(graph_class, 40, 80, seed=11)
+    reference, _ = build_network(graph_class, 40, 80, seed=11)
+    graph.track_hubs(codes[:2])
+    graph.update_route(*next(iter(graph.iter_routes()))[:2], 1, 1)
+    reference.update_route(*next(iter(reference.iter_routes()))[:2], 1, 1)
+    for destination in codes:
+        for hub in codes[:2]:
+            for query in ('get_shortest_path_dis', 'get_shortest_path'):
+                result = getattr(graph, query)(hub, destination)
+                expected = getattr(reference, query)(hub, destination)
+                assert (result and result[1]) == (expected and expected[1])
+    assert graph.hub_trees.stats()['trees'] == 4
+
+
+def test_untrack_hubs(graph_class):
+    graph, codes = build_network(graph_class, 20, 40, seed=2)
+    graph.track_hubs(codes[:2])
+    graph.untrack_hubs([codes[0]])
+    assert {hub for hub, _ in graph.hub_trees.trees} == {graph.to_compact().index[codes[1]]}
+    graph.untrack_hubs()
+    assert graph.hub_trees is None
+
+
+def test_repairs_do_not_merge_the_csr(graph_class):
+    # Las rutas nuevas se reparan desde la lista pendiente; el CSR se fusiona en la siguiente consulta
+    rnd = random.Random(3)
+    graph, codes = build_network(graph_class, 60, 100, seed=3)
+    graph.track_hubs(codes[:2])
+    compact = graph.to_compact()
+    for _ in range(30):
+        source, destination = rnd.sample(codes, 2)
+        graph.add_route(source, destination, rnd.randint(1, 50), rnd.randint(1, 50))
+        if rnd.random() < 0.5:
+            # Cambios sobre rutas que siguen pendientes
+            graph.update_route(source, destination, rnd.randint(1, 50), rnd.randint(1, 50))
+    assert len(compact._pending_src) > 0
+    assert_trees_exact(graph)
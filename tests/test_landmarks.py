@@ -0,0 +1,35 @@
+from conftest import build_network
+from Proyecto2 import CompactGraph, Graph
+
+
+def cost(result):
+    return result and round(result[1], 6)
+
+
+def test_alt_stays_exact_under_edits(graph_class):
+    graph, codes = build_network(graph_class, 50, 160, seed=6)
+    graph.preprocess_landmarks(count=4)
+    for step in range(12):
+        # Aumentos, reducciones y rutas nuevas, seguidos de consultas ALT contra Dijkstra
+        u, v = codes[step], codes[(step * 7 + 5) % 50]
+        if graph.get_route(u, v) is None:
+            graph.add_route(u, v, 3 + step, 3 + step)
+        else:
+            graph.update_route(u, v, 1 + (step * 17) % 60, 1 + (step * 5) % 60)
+        for destination in codes[20:30]:
+            graph.path_cache.clear()
+            exact = graph.get_shortest_path_dis(codes[step], destination)
+            graph.path_cache.clear()
+            assert cost(graph.get_shortest_path_dis(codes[step], destination, method='alt')) == cost(exact)
+
+
+def test_snapshot_keeps_landmarks(tmp_path):
+    graph, codes = build_network(Graph, 30, 70, seed=5)
+    graph.preprocess_landmarks(count=4)
+    path = str(tmp_path / "red.bin")
+    graph.save_snapshot(path)
+    loaded = CompactGraph.load_snapshot(path)
+    assert loaded.landmarks is not None
+    for destination in codes[1:10]:
+        assert loaded.get_shortest_path(codes[0], destination, method='alt')[1] == \
+            graph.get_shortest_path(codes[0], destination)[1]
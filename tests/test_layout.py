@@ -0,0 +1,52 @@
+import math
+
+from Proyecto2 import CompactGraph, Graph
+
+
+def distance(positions, a, b):
+    return math.dist(positions[a], positions[b])
+
+
+def test_new_routes_move_airports_drawn_before(graph_class):
+    # Flujo de la interfaz: primero se registran los aeropuertos y después las rutas
+    graph = graph_class()
+    codes = [graph.add_airport(f"A{i}", "Ciudad") for i in range(12)]
+    before = dict(graph.get_layout())
+    assert set(before) == set(codes)
+    for source, destination in zip(codes, codes[1:]):
+        graph.add_route(source, destination, 100, 1)
+    after = graph.get_layout()
+    assert after != before
+    # Los vecinos de la cadena quedan más cerca que en la disposición aleatoria inicial
+    def relative_length(positions):
+        legs = sum(distance(positions, a, b) for a, b in zip(codes, codes[1:])) / (len(codes) - 1)
+        return legs / max(distance(positions, a, b) for a in codes for b in codes)
+    assert relative_length(after) < relative_length(before)
+
+
+def test_layout_is_cached_until_something_changes(graph_class):
+    graph = graph_class()
+    codes = [graph.add_airport(f"A{i}", "Ciudad") for i in range(5)]
+    graph.add_route(codes[0], codes[1], 10, 1)
+    first = dict(graph.get_layout())
+    assert graph.get_layout() == first
+    # Cambiar solo el peso de una ruta no mueve nada
+    graph.update_route(codes[0], codes[1], 20, 2)
+    assert graph.get_layout() == first
+    new = graph.add_airport("Nuevo", "Ciudad")
+    graph.add_route(new, codes[2], 10, 1)
+    layout = graph.get_layout()
+    assert new in layout
+    if graph_class is CompactGraph:
+        # Sin NetworkX no se refina: solo se recolocan los aeropuertos cuyas rutas cambiaron
+        assert layout[codes[4]] == first[codes[4]] and layout[codes[2]] != first[codes[2]]
+
+
+def test_geographic_airports_keep_their_coordinates():
+    for graph_class in (Graph, CompactGraph):
+        graph = graph_class()
+        a = graph.add_airport("A", "Ciudad", 40.0, -3.0)
+        b = graph.add_airport("B", "Ciudad", -12.0, -77.0)
+        graph.get_layout()
+        graph.add_route(a, b, 9500, 12)
+        assert graph.get_layout() == {a: (-3.0, 40.0), b: (-77.0, -12.0)}
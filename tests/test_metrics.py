@@ -0,0 +1,30 @@
+import json
+
+from conftest import build_network
+from Proyecto2 import Graph, Metrics
+from servidor import RouteServer
+
+
+def test_metrics_snapshot_is_valid_json():
+    graph, codes = build_network(Graph, 10, 20, seed=1)
+    graph.enable_metrics(Metrics())
+    graph.get_shortest_path_dis(codes[0], codes[1])
+    snapshot = json.loads(json.dumps(graph.metrics.snapshot(), allow_nan=False))
+    buckets = snapshot['histograms']['latency_seconds'][0]['buckets']
+    assert buckets[-1] == ['+Inf', 1]
+    assert 'le="+Inf"' in graph.metrics.prometheus()
+    # Una respuesta con un valor no finito se convierte en un error en lugar de JSON inválido
+    assert json.loads(RouteServer._encode({'cost': float('inf')}))['ok'] is False
+
+
+def test_add_route_on_existing_route_counts_once(graph_class):
+    graph = graph_class()
+    graph.enable_metrics(Metrics())
+    a, b = graph.add_airport("A", "a"), graph.add_airport("B", "b")
+    graph.add_route(a, b, 1, 1)
+    graph.add_route(a, b, 2, 2)
+    calls = {dict(labels)['op']: value for (name, labels), value in graph.metrics.counters.items()
+             if name == 'calls'}
+    assert calls.get('add_route') == 2
+    assert 'update_route' not in calls
+    assert graph.get_route(a, b) == (2, 2)
@@ -0,0 +1,59 @@
+from conftest import build_network
+
+
+def line(graph_class):
+    # A-B-C con un atajo directo A-C más largo y D aparte
+    graph = graph_class()
+    a, b, c, d = (graph.add_airport(name, name.lower()) for name in "ABCD")
+    graph.add_route(a, b, 1, 1)
+    graph.add_route(b, c, 1, 1)
+    graph.add_route(a, c, 5, 5)
+    graph.add_route(c, d, 1, 1)
+    return graph, (a, b, c, d)
+
+
+def test_increase_invalidates_only_paths_through_the_route(graph_class):
+    graph, (a, b, c, d) = line(graph_class)
+    assert graph.get_shortest_path_dis(a, c) == ([a, b, c], 2)
+    assert graph.get_shortest_path_dis(c, d) == ([c, d], 1)
+    assert graph.get_shortest_path(a, c) == ([a, b, c], 2)
+    graph.update_route(a, b, 10, 1)
+    hits = graph.path_cache.hits
+    assert graph.get_shortest_path_dis(a, c) == ([a, c], 5)
+    # C-D no usa A-B y el tiempo de vuelo no cambió: siguen en la caché
+    assert graph.get_shortest_path_dis(c, d) == ([c, d], 1)
+    assert graph.get_shortest_path(a, c) == ([a, b, c], 2)
+    assert graph.path_cache.hits == hits + 2
+
+
+def test_decrease_and_insert_invalidate_the_weight(graph_class):
+    graph, (a, b, c, d) = line(graph_class)
+    assert graph.get_shortest_path_dis(a, c) == ([a, b, c], 2)
+    assert graph.get_shortest_path_dis(a, d) == ([a, b, c, d], 3)
+    # Una reducción fuera de la ruta guardada puede crear un camino mejor
+    graph.update_route(a, c, 1, 5)
+    assert graph.get_shortest_path_dis(a, c) == ([a, c], 1)
+    assert graph.get_shortest_path_dis(a, d) == ([a, c, d], 2)
+    graph.add_route(a, d, 0.5, 1)
+    assert graph.get_shortest_path_dis(a, d) == ([a, d], 0.5)
+    assert graph.get_shortest_path(a, d) == ([a, d], 1)
+
+
+def test_cached_answers_match_fresh_searches(graph_class):
+    graph, codes = build_network(graph_class, 40, 120, seed=2)
+    for step in range(30):
+        source, destination = codes[step % 7], codes[(step * 11) % 40]
+        graph.get_shortest_path_dis(source, destination)
+        graph.get_shortest_path_tree(codes[step % 3], 'distance')
+        u, v = codes[step], codes[(step * 7 + 3) % 40]
+        if u == v:
+            continue
+        if graph.get_route(u, v) is None:
+            graph.add_route(u, v, 5 + step, 5)
+        else:
+            graph.update_route(u, v, (step * 13) % 40 + 1, 5)
+        for source in codes[:7]:
+            for destination in codes[::5]:
+                cached = graph.get_shortest_path_dis(source, destination)
+                fresh = graph._compute_shortest_path(source, destination, 'distance')
+                assert (cached and cached[1]) == (fresh and fresh[1])
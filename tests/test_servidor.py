@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from conftest import build_network
+from Proyecto2 import Graph
+from servidor import RouteServer, RouteService
+
+
+def exchange(graph, raw):
+    # Enviar bytes crudos a un servidor nuevo y devolver todo lo que responde hasta cerrar
+    async def run():
+        server = await RouteServer(RouteService(graph), '127.0.0.1', 0).start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            writer.write(raw)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_malformed_http_request_line_gets_400():
+    graph, _ = build_network(Graph, 5, 5, seed=0)
+    assert exchange(graph, b'GET\r\n').startswith(b'HTTP/1.1 400 Bad Request')
+    assert exchange(graph, b'GET / HTTP/1.1\r\nContent-Length: x\r\n\r\n').startswith(b'HTTP/1.1 400 Bad Request')
+    assert exchange(graph, b'GET /ping HTTP/1.1\r\nConnection: close\r\n\r\n').startswith(b'HTTP/1.1 200 OK')
+
+
+def test_oversized_http_body_closes_connection(monkeypatch):
+    monkeypatch.setattr('servidor.MAX_BODY', 1024)
+    graph = Graph()
+    body = b''.join(b'{"op": "add_airport", "name": "X%d", "location": "Y"}\n' % i for i in range(40))
+    response = exchange(graph, b'POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+    assert response.startswith(b'HTTP/1.1 413 Payload Too Large')
+    assert b'Connection: close' in response
+    # Las líneas del cuerpo rechazado no se ejecutan como peticiones
+    assert graph.number_of_airports() == 0
+
+
+def test_overlong_json_line_gets_an_error(monkeypatch):
+    monkeypatch.setattr('servidor.MAX_BODY', 1024)
+    response = exchange(Graph(), b'{"op": "ping", "padding": "' + b'x' * 4096 + b'"}\n')
+    assert json.loads(response)['ok'] is False
+
+
+def test_batch_groups_repeated_origins(graph_class):
+    graph, codes = build_network(graph_class, 60, 240, seed=4)
+    expected = {(codes[0], code): graph.get_shortest_path_dis(codes[0], code) for code in codes[1:20]}
+    graph.path_cache.clear()
+    queries = [(codes[0], code, 'distance', 'dijkstra') for code in codes[1:20]]
+    queries.append((codes[0], -1, 'distance', 'dijkstra'))
+    expected[codes[0], -1] = graph.get_shortest_path_dis(codes[0], -1)
+    service = RouteService(graph)
+    try:
+        results = service._run_batch(queries)
+        for (source, destination, _, _), result in zip(queries, results):
+            assert result == expected[source, destination]
+        # El origen repetido no deja su árbol completo en la caché
+        assert graph.path_cache.get_tree(codes[0], 'distance') is None
+        assert service._run_batch(queries[:2]) == results[:2]
+    finally:
+        service.close()
+
+
+def test_add_airport_validates_coordinates():
+    graph = Graph()
+    service = RouteService(graph)
+
+    def add(**fields):
+        return asyncio.run(service.handle({'op': 'add_airport', 'name': f"A{len(graph.graph)}",
+                                           'location': "x", **fields}))
+    try:
+        assert not add(latitude=1000, longitude=0)['ok']
+        assert not add(latitude=10)['ok']
+        assert not add(longitude="oeste")['ok']
+        assert len(graph.graph) == 0
+        assert add(latitude=10, longitude=-20)['ok']
+        assert add()['ok']
+        assert len(graph.graph) == 2
+    finally:
+        service.close()
@@ -0,0 +1,36 @@
+import pytest
+
+from conftest import build_network
+from Proyecto2 import CompactGraph, Graph
+
+
+def network_contents(graph):
+    airports = {code: graph.get_airport(code) for code in range(1, graph.airport_counter)}
+    routes = {(min(u, v), max(u, v)): (float(d), float(t)) for u, v, d, t in graph.iter_routes()}
+    return airports, routes
+
+
+@pytest.mark.parametrize('loader', [Graph, CompactGraph], ids=['networkx', 'compacto'])
+def test_snapshot_round_trip(tmp_path, graph_class, loader):
+    graph, codes = build_network(graph_class, 40, 90, seed=3, coordinates=True)
+    path = str(tmp_path / "red.bin")
+    graph.save_snapshot(path)
+    loaded = loader.load_snapshot(path)
+    assert network_contents(loaded) == network_contents(graph)
+    assert loaded.airport_counter == graph.airport_counter
+    assert loaded.get_shortest_path_dis(codes[0], codes[-1]) == graph.get_shortest_path_dis(codes[0], codes[-1])
+    # El grafo cargado sigue siendo editable
+    new = loaded.add_airport("Nuevo", "Ciudad")
+    loaded.add_route(codes[0], new, 1, 1)
+    assert loaded.get_shortest_path_dis(codes[0], new) == ([codes[0], new], 1)
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path):
+    graph, _ = build_network(Graph, 10, 20, seed=1)
+    path = tmp_path / "red.bin"
+    graph.save_snapshot(str(path))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Graph.load_snapshot(str(path))
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from conftest import build_network
+from interfaz import TaskCancelled, TaskScheduler
+from Proyecto2 import Graph
+
+
+class FakeWidget:
+    # Sustituye al widget de Tk: after() guarda la revisión y la prueba la ejecuta a mano
+    def __init__(self):
+        self.pending = {}
+        self.errors = []
+        self._next = 0
+
+    def after(self, interval, callback):
+        self._next += 1
+        self.pending[self._next] = callback
+        return self._next
+
+    def after_cancel(self, poll_id):
+        self.pending.pop(poll_id, None)
+
+    def report_callback_exception(self, kind, error, traceback):
+        self.errors.append(error)
+
+    def run_until_idle(self, scheduler, timeout=5):
+        deadline = time.monotonic() + timeout
+        while scheduler.busy():
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+            for poll_id in list(self.pending):
+                self.pending.pop(poll_id)()
+
+
+def test_same_key_supersedes_previous_task():
+    widget = FakeWidget()
+    scheduler = TaskScheduler(widget, max_workers=1)
+    release = threading.Event()
+    results = []
+
+    def slow(task, value):
+        while not release.is_set():
+            task.check()
+            time.sleep(0.001)
+        return value
+
+    first = scheduler.submit("a", slow, 1, key='ruta', on_done=results.append)
+    queued = scheduler.submit("b", slow, 2, key='otra', on_done=results.append)
+    # Con un solo hilo, la tercera reemplaza a la primera (en curso) sin esperar a que termine
+    third = scheduler.submit("c", slow, 3, key='ruta', on_done=results.append)
+    assert first.cancelled and not queued.cancelled and not third.cancelled
+    # La tarea cancelada se detiene en su siguiente comprobación y libera el hilo
+    assert isinstance(first.future.exception(timeout=5), TaskCancelled)
+    release.set()
+    widget.run_until_idle(scheduler)
+    assert sorted(results) == [2, 3]
+    assert widget.errors == []
+    scheduler.shutdown()
+
+
+def test_cancel_discards_queued_and_running_tasks():
+    widget = FakeWidget()
+    scheduler = TaskScheduler(widget, max_workers=1)
+    started = threading.Event()
+    results, errors = [], []
+
+    def forever(task):
+        started.set()
+        while True:
+            task.report("buscando")
+            time.sleep(0.001)
+
+    running = scheduler.submit("larga", forever, on_done=results.append, on_error=errors.append)
+    waiting = scheduler.submit("en cola", lambda task: 1, key='x', on_done=results.append)
+    assert started.wait(5)
+    scheduler.cancel()
+    assert running.cancelled and waiting.cancelled and waiting.future is None
+    widget.run_until_idle(scheduler)
+    # Ni resultados ni errores de lo cancelado llegan a la interfaz
+    assert results == [] and errors == []
+    scheduler.shutdown()
+
+
+def test_searches_can_be_cancelled():
+    # La comprobación se llama durante la búsqueda y puede interrumpirla con una excepción
+    graph, codes = build_network(Graph, 3000, 9000, seed=1)
+
+    class Stop(Exception):
+        pass
+
+    def check():
+        raise Stop()
+    for search in (lambda: graph.get_shortest_path_dis(codes[0], codes[-1], check=check),
+                   lambda: graph.to_compact()._compute_shortest_path(codes[0], codes[-1], 'distance', check)):
+        with pytest.raises(Stop):
+            search()
+    # Una búsqueda interrumpida no deja nada en la caché
+    assert graph.get_shortest_path_dis(codes[0], codes[-1])[1] == \
+        graph.to_compact()._compute_shortest_path(codes[0], codes[-1], 'distance')[1]
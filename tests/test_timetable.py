@@ -0,0 +1,89 @@
+import networkx as nx
+import pytest
+
+from Proyecto2 import Graph
+
+
+@pytest.fixture
+def network(graph_class):
+    # MAD - LIS - GRU y MAD - GRU directo; todos los tiempos de vuelo en horas
+    graph = graph_class()
+    codes = {name: graph.add_airport(name, name) for name in ("MAD", "LIS", "GRU", "BOG")}
+    graph.add_route(codes["MAD"], codes["LIS"], 500, 1)
+    graph.add_route(codes["LIS"], codes["GRU"], 7900, 9)
+    graph.add_route(codes["MAD"], codes["GRU"], 8400, 10)
+    graph.add_route(codes["GRU"], codes["BOG"], 4300, 6)
+    return graph, codes
+
+
+def test_earliest_arrival_with_connection(network):
+    graph, codes = network
+    timetable = graph.timetable
+    timetable.add_flights([
+        (codes["MAD"], codes["LIS"], 8 * 60, None, "IB1"),
+        (codes["LIS"], codes["GRU"], 9 * 60 + 40, None, "TP2"),
+        (codes["MAD"], codes["GRU"], 12 * 60, None, "IB3"),
+    ])
+    arrival, legs = timetable.earliest_arrival(codes["MAD"], codes["GRU"], 7 * 60)
+    assert arrival == (9 * 60 + 40) + 9 * 60
+    assert [leg[0] for leg in legs] == ["IB1", "TP2"]
+    assert legs[0][1] == codes["MAD"] and legs[-1][2] == codes["GRU"]
+    # Saliendo más tarde ya no se alcanza el enlace por Lisboa
+    arrival, legs = timetable.earliest_arrival(codes["MAD"], codes["GRU"], 9 * 60)
+    assert arrival == 22 * 60 and [leg[0] for leg in legs] == ["IB3"]
+    assert timetable.earliest_arrival(codes["GRU"], codes["MAD"], 0) is None
+    assert timetable.earliest_arrival(codes["MAD"], codes["MAD"], 100) == (100, [])
+
+
+def test_minimum_connection_time(network):
+    graph, codes = network
+    timetable = graph.timetable
+    timetable.add_flights([
+        (codes["MAD"], codes["LIS"], 8 * 60, None, "IB1"),
+        (codes["LIS"], codes["GRU"], 9 * 60 + 20, None, "TP2"),
+        (codes["LIS"], codes["GRU"], 11 * 60, None, "TP4"),
+    ])
+    # Veinte minutos bastan con una conexión mínima de 15 pero no con la de 30 por defecto
+    assert timetable.earliest_arrival(codes["MAD"], codes["GRU"], 0)[1][1][0] == "TP4"
+    timetable.set_min_connection_time(codes["LIS"], 15)
+    assert timetable.earliest_arrival(codes["MAD"], codes["GRU"], 0)[1][1][0] == "TP2"
+
+
+def test_same_flight_needs_no_connection(network):
+    graph, codes = network
+    timetable = graph.timetable
+    # Los dos tramos del mismo vuelo se encadenan aunque la escala dure menos que la conexión mínima
+    timetable.add_flights([
+        (codes["MAD"], codes["GRU"], 8 * 60, None, "LA8"),
+        (codes["GRU"], codes["BOG"], 18 * 60 + 10, None, "LA8"),
+        (codes["GRU"], codes["BOG"], 18 * 60 + 5, None, "AV9"),
+    ])
+    # El itinerario muestra un solo tramo por vuelo en el que se viaja a bordo
+    assert timetable.earliest_arrival(codes["MAD"], codes["BOG"], 0) == \
+        (24 * 60 + 10, [("LA8", codes["MAD"], codes["BOG"], 8 * 60, 24 * 60 + 10)])
+
+
+def test_profile_keeps_only_useful_departures(network):
+    graph, codes = network
+    timetable = graph.timetable
+    timetable.add_flights([
+        (codes["MAD"], codes["GRU"], 6 * 60, None, "IB1"),
+        (codes["MAD"], codes["LIS"], 6 * 60 + 30, None, "IB2"),
+        (codes["LIS"], codes["GRU"], 8 * 60, 15 * 60, "TP3"),
+        (codes["MAD"], codes["GRU"], 9 * 60, None, "IB4"),
+        (codes["MAD"], codes["GRU"], 23 * 60, None, "IB5"),
+    ])
+    # IB2 y TP3 llegan a las 15:00 saliendo después de IB1, que llega a las 16:00 y no es útil
+    assert timetable.profile(codes["MAD"], codes["GRU"]) == \
+        [(6 * 60 + 30, 15 * 60), (9 * 60, 19 * 60), (23 * 60, 33 * 60)]
+    assert timetable.profile(codes["MAD"], codes["GRU"], 8 * 60, until=12 * 60) == [(9 * 60, 19 * 60)]
+
+
+def test_invalid_flights_are_rejected(network):
+    graph, codes = network
+    with pytest.raises(ValueError):
+        graph.timetable.add_flight(codes["MAD"], codes["BOG"], 0)
+    with pytest.raises(ValueError):
+        graph.timetable.add_flight(codes["MAD"], codes["LIS"], 100, 50)
+    with pytest.raises(nx.NodeNotFound):
+        Graph().timetable.earliest_arrival(99, 1, 0)